@@ -0,0 +1,149 @@
+"""
+Measures login and API latency against a running server, first at rest and then while a flood
+of failed logins is in progress.
+
+Every flood login reaches bcrypt. By default the flood uses random unknown usernames, which the
+server checks against a throwaway hash just like a wrong password. With --flood-email it sends wrong
+passwords for that existing account instead; use a different account from --email, because the
+probe logs in with that one. Run the server with the throttle raised so the flood, which all
+comes from this machine, actually reaches the hashing pool instead of being turned away, e.g.
+
+    LOGIN_IP_MAX_FAILURES=1000000 LOGIN_ACCOUNT_MAX_FAILURES=1000000 uvicorn project.server:app
+    python benchmarks/login_flood.py --email admin@example.com --password secret \\
+        --flood-email staff@example.com
+
+With the bounded hashing pool both p99s should stay within the same order of magnitude between
+the two phases; excess flood logins get 429/503 instead of queueing without limit.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import List
+
+import httpx
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def timed(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> float:
+    started = time.perf_counter()
+    await client.request(method, url, **kwargs)
+    return (time.perf_counter() - started) * 1000
+
+
+async def probe(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    token: str,
+    login_ms: List[float],
+    api_ms: List[float],
+    stop: asyncio.Event,
+) -> None:
+    while not stop.is_set():
+        login_ms.append(
+            await timed(
+                client,
+                "POST",
+                "/auth/login",
+                params={"username": args.email, "password": args.password},
+            )
+        )
+        api_ms.append(
+            await timed(
+                client,
+                "GET",
+                "/api/staff-directory",
+                params={"limit": 20},
+                headers={"Authorization": "Bearer {}".format(token)},
+            )
+        )
+        await asyncio.sleep(args.probe_interval)
+
+
+async def flood(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    stop: asyncio.Event,
+    codes: dict,
+) -> None:
+    while not stop.is_set():
+        try:
+            response = await client.post(
+                "/auth/login",
+                params={
+                    "username": args.flood_email
+                    or "{}@flood.invalid".format(uuid.uuid4().hex),
+                    "password": uuid.uuid4().hex,
+                },
+            )
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+        except httpx.HTTPError:
+            codes["error"] = codes.get("error", 0) + 1
+
+
+async def phase(args: argparse.Namespace, token: str, flooders: int) -> tuple:
+    login_ms: List[float] = []
+    api_ms: List[float] = []
+    codes: dict = {}
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=flooders + 4)
+    async with httpx.AsyncClient(
+        base_url=args.url, timeout=30.0, limits=limits
+    ) as client:
+        tasks = [
+            asyncio.create_task(probe(client, args, token, login_ms, api_ms, stop))
+        ]
+        tasks += [
+            asyncio.create_task(flood(client, args, stop, codes))
+            for _ in range(flooders)
+        ]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+    return login_ms, api_ms, codes
+
+
+def report(name: str, login_ms: List[float], api_ms: List[float], codes: dict) -> None:
+    print(
+        "{:<8} login p50 {:>8.1f} ms  p99 {:>8.1f} ms | api p50 {:>8.1f} ms  p99 {:>8.1f} ms"
+        " | samples {} | flood responses {}".format(
+            name,
+            statistics.median(login_ms) if login_ms else float("nan"),
+            percentile(login_ms, 0.99),
+            statistics.median(api_ms) if api_ms else float("nan"),
+            percentile(api_ms, 0.99),
+            len(login_ms),
+            codes or "-",
+        )
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with httpx.AsyncClient(base_url=args.url, timeout=30.0) as client:
+        response = await client.post(
+            "/auth/login", params={"username": args.email, "password": args.password}
+        )
+        response.raise_for_status()
+        token = response.json()["jwt"]
+    report("baseline", *await phase(args, token, 0))
+    report("flood", *await phase(args, token, args.concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--flood-email", default=None)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--probe-interval", type=float, default=0.1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,105 @@
+from typing import List, Optional
+
+import prisma
+import prisma.enums
+from pydantic import BaseModel
+
+import project.stockLedger
+
+MAX_COUNT_ENTRIES = 5000
+
+
+class StockCount(BaseModel):
+    """
+    Counted quantity of one inventory item and the reason for any difference.
+    """
+
+    inventoryItemId: int
+    quantity: int
+    reason: Optional[str] = None
+
+
+class StockCountRequest(BaseModel):
+    """
+    Results of a physical count, one entry per counted item.
+    """
+
+    counts: List[StockCount]
+    reference: Optional[str] = None
+
+
+class StatusChange(BaseModel):
+    """
+    An item whose stock status changed because of the count.
+    """
+
+    inventoryItemId: int
+    previous: prisma.enums.InventoryStatus
+    current: prisma.enums.InventoryStatus
+
+
+class StockCountResponse(BaseModel):
+    """
+    Summary of a posted count: how many items changed, the units gained and lost, and the resulting status changes.
+    """
+
+    counted: int
+    adjusted: int
+    unitsAdded: int
+    unitsRemoved: int
+    statusChanges: List[StatusChange]
+
+
+async def adjustStockCounts(request: StockCountRequest) -> StockCountResponse:
+    """
+    Posts the results of a physical stock count in one call. Every item whose counted quantity
+    differs from the system quantity gets an adjustment in the stock ledger with the given reason,
+    and its quantity and status are updated in the same set-based statement; all entries are applied
+    in one transaction, so either the whole count is posted or none of it.
+
+    Args:
+        request (StockCountRequest): Results of a physical count, one entry per counted item.
+
+    Returns:
+        StockCountResponse: Summary of a posted count: how many items changed, the units gained and lost, and the resulting status changes.
+
+    Raises:
+        ValueError: If no entries, more than MAX_COUNT_ENTRIES entries or an item counted twice are
+            given, an item does not exist, or a quantity is negative.
+
+    Example:
+        response = await adjustStockCounts(StockCountRequest(counts=[StockCount(inventoryItemId=3, quantity=40, reason="Damaged in storage")], reference="Count 2024-11-30"))
+        print(response)
+        > StockCountResponse(counted=1, adjusted=1, unitsAdded=0, unitsRemoved=2, statusChanges=[StatusChange(inventoryItemId=3, previous='InStock', current='LowStock')])
+    """
+    if not request.counts:
+        raise ValueError("counts must not be empty")
+    if len(request.counts) > MAX_COUNT_ENTRIES:
+        raise ValueError(
+            "At most {} items can be counted at once".format(MAX_COUNT_ENTRIES)
+        )
+    counts = {
+        entry.inventoryItemId: (entry.quantity, entry.reason)
+        for entry in request.counts
+    }
+    if len(counts) != len(request.counts):
+        raise ValueError("Each item may only be counted once")
+    before, items = await project.stockLedger.set_quantities(
+        counts, reference=request.reference
+    )
+    changes = [item.quantity - before[item.id]["quantity"] for item in items]
+    return StockCountResponse(
+        counted=len(counts),
+        adjusted=len(items),
+        unitsAdded=sum(change for change in changes if change > 0),
+        unitsRemoved=-sum(change for change in changes if change < 0),
+        statusChanges=[
+            StatusChange(
+                inventoryItemId=item.id,
+                previous=before[item.id]["status"],
+                current=item.status,
+            )
+            for item in sorted(items, key=lambda item: item.id)
+            if item.status != before[item.id]["status"]
+        ],
+    )
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from os import getenv
+from typing import Optional, Set
+
+import jwt
+import prisma
+import prisma.enums
+import prisma.models
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+JWT_SECRET_KEY = getenv("JWT_SECRET_KEY", "")
+JWT_ALGORITHM = getenv("JWT_ALGORITHM", "HS256")
+ACCESS_TOKEN_TTL = timedelta(minutes=int(getenv("ACCESS_TOKEN_TTL_MINUTES", "60")))
+
+STREAM_TOKEN_TTL = timedelta(seconds=int(getenv("STREAM_TOKEN_TTL_SECONDS", "60")))
+STREAM_SCOPE = "events"
+
+PUBLIC_PATHS = {"/auth/login", "/auth/refresh"}
+# Routes that also accept a stream token in the ``token`` query parameter, for browser
+# EventSource clients that cannot set an Authorization header.
+STREAM_PATHS = {"/events"}
+
+
+class TokenClaims(BaseModel):
+    """
+    Verified claims of an access token.
+    """
+
+    userId: int
+    role: prisma.enums.Role
+    jti: str
+    exp: int
+    scope: Optional[str] = None
+
+
+def _secret() -> str:
+    if not JWT_SECRET_KEY:
+        raise RuntimeError("JWT_SECRET_KEY is not configured")
+    return JWT_SECRET_KEY
+
+
+def issue_token(
+    user_id: int,
+    role: prisma.enums.Role,
+    scope: Optional[str] = None,
+    ttl: timedelta = ACCESS_TOKEN_TTL,
+) -> str:
+    """
+    Signs an access token for a user with the shared key, algorithm and claim layout. A token with
+    a ``scope`` is only accepted where that scope is expected, never as a bearer token.
+    """
+    now = datetime.now(timezone.utc)
+    payload = {
+        "sub": str(user_id),
+        "role": role.value if isinstance(role, prisma.enums.Role) else role,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + ttl,
+    }
+    if scope is not None:
+        payload["scope"] = scope
+    return jwt.encode(payload, _secret(), algorithm=JWT_ALGORITHM)
+
+
+def decode_token(token: str) -> TokenClaims:
+    """
+    Verifies a token's signature and expiry and returns its claims.
+
+    Raises:
+        HTTPException: 401 if the token is invalid or expired.
+    """
+    try:
+        payload = jwt.decode(
+            token,
+            _secret(),
+            algorithms=[JWT_ALGORITHM],
+            options={"require": ["sub", "exp", "jti"]},
+        )
+        return TokenClaims(
+            userId=int(payload["sub"]),
+            role=payload["role"],
+            jti=payload["jti"],
+            exp=int(payload["exp"]),
+            scope=payload.get("scope"),
+        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except (jwt.InvalidTokenError, KeyError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+class VerifiedTokenCache:
+    """
+    Small LRU of recently verified tokens keyed by the whole token, so clients that call
+    repeatedly skip the HMAC check. Keying by the signature alone would let a token with an edited
+    header or payload reuse a cached signature. Entries are only served until the token's own
+    expiry.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, TokenClaims]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[TokenClaims]:
+        claims = self._entries.get(token)
+        if claims is None:
+            return None
+        if claims.exp <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return claims
+
+    def put(self, token: str, claims: TokenClaims) -> None:
+        self._entries[token] = claims
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class RevocationList:
+    """
+    In-memory set of revoked token IDs, loaded from the RevokedToken table and refreshed
+    periodically so revocations made by other workers are seen within ``interval`` seconds.
+    """
+
+    def __init__(self):
+        self.revoked: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self.revoked
+
+    async def load(self) -> None:
+        rows = await prisma.models.RevokedToken.prisma().find_many(
+            where={"expiresAt": {"gt": datetime.now(timezone.utc)}}
+        )
+        self.revoked = {row.jti for row in rows}
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        await prisma.models.RevokedToken.prisma().upsert(
+            where={"jti": jti},
+            data={
+                "create": {"jti": jti, "expiresAt": expires_at},
+                "update": {},
+            },
+        )
+        self.revoked.add(jti)
+
+    def start(self, interval: float = 30.0) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+                await prisma.models.RevokedToken.prisma().delete_many(
+                    where={"expiresAt": {"lte": datetime.now(timezone.utc)}}
+                )
+            except Exception:
+                logger.exception("Failed to refresh token revocation list")
+
+
+token_cache = VerifiedTokenCache()
+revocation_list = RevocationList()
+
+
+def verify_token(token: str) -> TokenClaims:
+    """
+    Returns the claims of a valid, unrevoked token, using the verified-token cache when possible.
+
+    Raises:
+        HTTPException: 401 if the token is invalid, expired or revoked.
+    """
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        token_cache.put(token, claims)
+    if claims.jti in revocation_list:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return claims
+
+
+def bearer_token(request: Request) -> str:
+    """
+    Extracts the bearer token from the Authorization header.
+
+    Raises:
+        HTTPException: 401 if the header is missing or not a bearer token.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return token
+
+
+async def authenticate(request: Request) -> Optional[TokenClaims]:
+    """
+    FastAPI dependency that verifies the caller's bearer token and records the user ID and role on
+    ``request.state``. Routes in PUBLIC_PATHS are let through without a token; routes in
+    STREAM_PATHS also accept a stream token in the ``token`` query parameter.
+
+    Raises:
+        HTTPException: 401 if the token is missing, invalid, expired or revoked, or has the wrong
+            scope for where it is used.
+    """
+    route = request.scope.get("route")
+    if route is not None and route.path in PUBLIC_PATHS:
+        return None
+    stream_token = None
+    if route is not None and route.path in STREAM_PATHS:
+        stream_token = request.query_params.get("token")
+    if stream_token:
+        claims = verify_token(stream_token)
+        if claims.scope != STREAM_SCOPE:
+            raise HTTPException(status_code=401, detail="Invalid stream token")
+    else:
+        claims = verify_token(bearer_token(request))
+        if claims.scope is not None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+    request.state.user_id = claims.userId
+    request.state.role = claims.role
+    return claims
@@ -1,54 +1,85 @@
-from datetime import datetime, timedelta
+from typing import Optional
 
 import prisma
 import prisma.enums
 import prisma.models
-from jose import jwt
-from passlib.hash import bcrypt
 from pydantic import BaseModel
 
+import project.auth
+import project.passwordHashing
+import project.refreshTokens
+
 
 class LoginResponse(BaseModel):
     """
-    Response payload for a successful login. Contains the JWT, user's role, and user ID.
+    Response payload for a successful login. Contains the JWT, a rotating refresh token, user's role, and user ID.
     """
 
     jwt: str
+    refreshToken: str
     role: prisma.enums.Role
     userId: int
 
 
-async def authenticateUser(username: str, password: str) -> LoginResponse:
+async def authenticateUser(
+    username: str, password: str, client_ip: Optional[str] = None
+) -> LoginResponse:
     """
     Handles user authentication. Expects username and password in the request body.
     Returns a JSON Web Token (JWT) for session handling on successful authentication,
-    along with user role and ID for role-based access throughout the app.
+    a refresh token that starts a new rotation family, and the user role and ID for
+    role-based access throughout the app.
+
+    Failed attempts are throttled per account and per client IP before any password is checked,
+    and the bcrypt check runs on the bounded hashing pool rather than the event loop. Unknown
+    usernames are checked against a throwaway hash, so response times do not reveal which accounts
+    exist. A hash made with an outdated cost is replaced with one at the configured cost after a
+    successful login.
 
     Args:
         username (str): The username of the user trying to log in.
         password (str): The password of the user. This must be handled securely.
+        client_ip (Optional[str]): Address the request came from, used for per-IP throttling.
 
     Returns:
-        LoginResponse: Response payload for a successful login. Contains the JWT, user's role, and user ID.
+        LoginResponse: Response payload for a successful login. Contains the JWT, a rotating refresh token, user's role, and user ID.
 
     Raises:
         ValueError: If authentication fails for any reason, such as wrong password or non-existent user.
+        HTTPException: 429 if the account or IP has too many recent failures, 503 if the hashing pool is saturated.
 
     Example:
         response = authenticateUser('johnDoe', 's3cr3tPassword')
         print(response)
         > {
             'jwt': 'eyJhbGciOiJIUzI1NiIsInR5cCI6IkpX...',
+            'refreshToken': '3f1c...e9.Xk2...',
             'role': prisma.enums.Role.Staff,
             'userId': 15
         }
     """
+    throttle = project.passwordHashing.login_throttle
+    throttle.check(username, client_ip)
     user = await prisma.models.User.prisma().find_unique(where={"email": username})
-    if user is None or not bcrypt.verify(password, user.hashedPassword):
+    if user is None:
+        verified = await project.passwordHashing.reject_unknown_user(password)
+    else:
+        verified = await project.passwordHashing.verify_password(
+            password, user.hashedPassword
+        )
+    if not verified:
+        throttle.failed(username, client_ip)
         raise ValueError("Invalid username or password")
-    expiration_time = datetime.utcnow() + timedelta(days=1)
-    token_data = {"sub": user.id, "role": user.role, "exp": expiration_time}
-    secret_key = "your_secret_key"
-    algorithm = "HS256"
-    jwt_token = jwt.encode(token_data, secret_key, algorithm=algorithm)
-    return LoginResponse(jwt=jwt_token, role=user.role, userId=user.id)
+    throttle.succeeded(username)
+    if project.passwordHashing.needs_rehash(user.hashedPassword):
+        await prisma.models.User.prisma().update_many(
+            where={"id": user.id, "hashedPassword": user.hashedPassword},
+            data={
+                "hashedPassword": await project.passwordHashing.hash_password(password)
+            },
+        )
+    jwt_token = project.auth.issue_token(user.id, user.role)
+    refresh_token = await project.refreshTokens.issue_refresh_token(user.id, user.role)
+    return LoginResponse(
+        jwt=jwt_token, refreshToken=refresh_token, role=user.role, userId=user.id
+    )
@@ -0,0 +1,287 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+import project.getStaffCoverage_service
+
+ACTIVITY_ROLES: Dict[prisma.enums.ActivityType, List[prisma.enums.Role]] = {
+    prisma.enums.ActivityType.Planting: [
+        prisma.enums.Role.FieldWorker,
+        prisma.enums.Role.Staff,
+        prisma.enums.Role.Manager,
+    ],
+    prisma.enums.ActivityType.Harvesting: [
+        prisma.enums.Role.FieldWorker,
+        prisma.enums.Role.Staff,
+        prisma.enums.Role.Manager,
+    ],
+    prisma.enums.ActivityType.Delivery: [
+        prisma.enums.Role.Staff,
+        prisma.enums.Role.Manager,
+    ],
+}
+
+# The solver pool has two processes, so the budget bounds how long two requests can hold up all
+# crew assignment.
+MIN_TIME_BUDGET_MS = 50
+MAX_TIME_BUDGET_MS = 5000
+
+_solver_pool: Optional[ProcessPoolExecutor] = None
+
+
+class OpenSlot(BaseModel):
+    """
+    A slot that needs crew, optionally restricted to specific roles.
+    """
+
+    slotStart: datetime
+    activityType: prisma.enums.ActivityType
+    fieldId: Optional[int] = None
+    requiredCrew: int
+    roles: Optional[List[prisma.enums.Role]] = None
+
+
+class AutoAssignRequest(BaseModel):
+    """
+    Open slots to fill within a date range, the staff to draw from and the solver time budget, from MIN_TIME_BUDGET_MS to MAX_TIME_BUDGET_MS.
+    """
+
+    start: datetime
+    end: datetime
+    slotMinutes: int = 60
+    slots: List[OpenSlot]
+    staffIds: Optional[List[int]] = None
+    timeBudgetMs: int = 500
+    commit: bool = True
+
+
+class CrewAssignment(BaseModel):
+    """
+    A single staff member placed into an open slot.
+    """
+
+    staffDetailsId: int
+    slotStart: datetime
+    activityType: prisma.enums.ActivityType
+    fieldId: Optional[int] = None
+
+
+class AutoAssignResponse(BaseModel):
+    """
+    Assignments chosen by the solver and how much of the requested crew they cover.
+    """
+
+    assignments: List[CrewAssignment]
+    requiredCrew: int
+    assignedCrew: int
+    unfilledCrew: int
+    committed: bool
+    message: str
+
+
+def solve_assignments(
+    slots: List[Tuple[int, int, int]],
+    staff: List[Tuple[int, int, int]],
+    time_budget: float,
+) -> List[List[int]]:
+    """
+    Fills slots with staff without double-booking anyone, maximising the number of filled seats.
+
+    Runs a greedy pass that fills the scarcest slots first with the least-loaded eligible staff,
+    then a local search that frees eligible staff for unfilled seats by moving someone already
+    assigned at the same time to another eligible free worker. Stops when no move improves
+    coverage or the time budget is spent. Only plain tuples are used so the function can run
+    in a worker process.
+
+    Args:
+        slots (List[Tuple[int, int, int]]): (slot index, required crew, eligible role bitmask) per slot.
+        staff (List[Tuple[int, int, int]]): (staff ID, role bit, busy slot bitmap) per staff member.
+        time_budget (float): Seconds the local search may run for.
+
+    Returns:
+        List[List[int]]: Positions into ``staff`` assigned to each slot, in slot order.
+    """
+    deadline = time.monotonic() + time_budget
+    busy = [bitmap for _, _, bitmap in staff]
+    load = [0] * len(staff)
+    eligible = [
+        [pos for pos, (_, role_bit, _) in enumerate(staff) if role_bit & mask]
+        for _, _, mask in slots
+    ]
+    assigned: List[List[int]] = [[] for _ in slots]
+
+    def free_candidates(slot_pos: int) -> List[int]:
+        bit = 1 << slots[slot_pos][0]
+        return [pos for pos in eligible[slot_pos] if not busy[pos] & bit]
+
+    order = sorted(
+        range(len(slots)),
+        key=lambda s: len(free_candidates(s)) - slots[s][1],
+    )
+    for slot_pos in order:
+        index, required, _ = slots[slot_pos]
+        bit = 1 << index
+        for pos in sorted(free_candidates(slot_pos), key=load.__getitem__)[:required]:
+            busy[pos] |= bit
+            load[pos] += 1
+            assigned[slot_pos].append(pos)
+
+    by_index: Dict[int, List[int]] = {}
+    for slot_pos, (index, _, _) in enumerate(slots):
+        by_index.setdefault(index, []).append(slot_pos)
+
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for slot_pos, (index, required, _) in enumerate(slots):
+            if len(assigned[slot_pos]) >= required:
+                continue
+            bit = 1 << index
+            wanted = set(eligible[slot_pos])
+            for other_pos in by_index[index]:
+                if other_pos == slot_pos:
+                    continue
+                movable = [pos for pos in assigned[other_pos] if pos in wanted]
+                if not movable:
+                    continue
+                replacements = [
+                    pos for pos in free_candidates(other_pos) if pos not in wanted
+                ]
+                if not replacements:
+                    continue
+                moved = movable[0]
+                replacement = min(replacements, key=load.__getitem__)
+                assigned[other_pos].remove(moved)
+                assigned[other_pos].append(replacement)
+                assigned[slot_pos].append(moved)
+                busy[replacement] |= bit
+                load[replacement] += 1
+                improved = True
+                break
+            if time.monotonic() >= deadline:
+                break
+    return assigned
+
+
+def _get_solver_pool() -> ProcessPoolExecutor:
+    global _solver_pool
+    if _solver_pool is None:
+        _solver_pool = ProcessPoolExecutor(max_workers=2)
+    return _solver_pool
+
+
+def shutdown_solver_pool() -> None:
+    """
+    Stops the solver worker processes, if any were started.
+    """
+    global _solver_pool
+    if _solver_pool is not None:
+        _solver_pool.shutdown(cancel_futures=True)
+        _solver_pool = None
+
+
+def _role_mask(roles: List[prisma.enums.Role], role_bits: Dict[str, int]) -> int:
+    mask = 0
+    for role in roles:
+        mask |= role_bits[role]
+    return mask
+
+
+async def autoAssignCrew(request: AutoAssignRequest) -> AutoAssignResponse:
+    """
+    Automatically assigns staff to open planting, harvesting and delivery slots. Existing schedules
+    are treated as busy time, eligibility comes from each staff member's role, and the solver runs
+    in a process pool so the API stays responsive. Chosen assignments are written with a single
+    bulk insert.
+
+    Args:
+        request (AutoAssignRequest): Open slots to fill within a date range, the staff to draw from and the solver time budget.
+
+    Returns:
+        AutoAssignResponse: Assignments chosen by the solver and how much of the requested crew they cover.
+
+    Raises:
+        ValueError: If the range or slot length is invalid, or timeBudgetMs is outside
+            MIN_TIME_BUDGET_MS to MAX_TIME_BUDGET_MS.
+    """
+    if not MIN_TIME_BUDGET_MS <= request.timeBudgetMs <= MAX_TIME_BUDGET_MS:
+        raise ValueError(
+            "timeBudgetMs must be between {} and {}".format(
+                MIN_TIME_BUDGET_MS, MAX_TIME_BUDGET_MS
+            )
+        )
+    grid, _ = await project.getStaffCoverage_service.load_schedule_grid(
+        request.start, request.end, request.slotMinutes
+    )
+    staff_where = {"id": {"in": request.staffIds}} if request.staffIds else {}
+    staff_records = await prisma.models.StaffDetails.prisma().find_many(
+        where=staff_where, include={"user": True}
+    )
+    role_bits = {role: 1 << bit for bit, role in enumerate(prisma.enums.Role)}
+    staff = [
+        (record.id, role_bits[record.user.role], grid.busy.get(record.id, 0))
+        for record in staff_records
+        if record.user is not None
+    ]
+    slots: List[Tuple[int, int, int]] = []
+    open_slots: List[OpenSlot] = []
+    for open_slot in request.slots:
+        index = grid.index(open_slot.slotStart)
+        if index is None or open_slot.requiredCrew <= 0:
+            continue
+        roles = open_slot.roles or ACTIVITY_ROLES[open_slot.activityType]
+        slots.append((index, open_slot.requiredCrew, _role_mask(roles, role_bits)))
+        open_slots.append(open_slot)
+    required_crew = sum(required for _, required, _ in slots)
+    loop = asyncio.get_running_loop()
+    solution = await loop.run_in_executor(
+        _get_solver_pool(),
+        solve_assignments,
+        slots,
+        staff,
+        request.timeBudgetMs / 1000,
+    )
+    assignments = [
+        CrewAssignment(
+            staffDetailsId=staff[pos][0],
+            slotStart=grid.slot_start(slots[slot_pos][0]),
+            activityType=open_slots[slot_pos].activityType,
+            fieldId=open_slots[slot_pos].fieldId,
+        )
+        for slot_pos, positions in enumerate(solution)
+        for pos in positions
+    ]
+    committed = False
+    if request.commit and assignments:
+        await prisma.models.Schedule.prisma().create_many(
+            data=[
+                {
+                    "date": assignment.slotStart,
+                    "activityType": assignment.activityType,
+                    "staffDetailsId": assignment.staffDetailsId,
+                    "fieldId": assignment.fieldId,
+                }
+                for assignment in assignments
+            ]
+        )
+        committed = True
+    unfilled = required_crew - len(assignments)
+    return AutoAssignResponse(
+        assignments=assignments,
+        requiredCrew=required_crew,
+        assignedCrew=len(assignments),
+        unfilledCrew=unfilled,
+        committed=committed,
+        message=(
+            "All slots filled."
+            if unfilled == 0
+            else "{} seat(s) could not be filled.".format(unfilled)
+        ),
+    )
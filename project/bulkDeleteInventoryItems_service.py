@@ -0,0 +1,126 @@
+from typing import List
+
+import prisma
+from pydantic import BaseModel
+
+import project.inventorySnapshot
+
+MAX_BULK_DELETE = 1000
+
+
+class BulkDeleteInventoryRequest(BaseModel):
+    """
+    IDs of the inventory items to delete.
+    """
+
+    itemIds: List[int]
+
+
+class BulkDeleteFailure(BaseModel):
+    """
+    An item that was not deleted and why.
+    """
+
+    itemId: int
+    reason: str
+
+
+class BulkDeleteInventoryResponse(BaseModel):
+    """
+    IDs of the items that were actually deleted, the items that could not be, and the inventory version token after the delete.
+    """
+
+    deletedIds: List[int]
+    failed: List[BulkDeleteFailure] = []
+    inventoryVersion: int
+
+
+async def delete_inventory_items(item_ids: List[int]) -> BulkDeleteInventoryResponse:
+    """
+    Deletes the given inventory items and advances the inventory version token in one statement,
+    then drops them from the in-memory snapshot. The token only moves if at least one item was
+    deleted. The items are locked first, so a planting being recorded for one of them either
+    commits before the statement runs or finds the item deleted.
+
+    Items are soft-deleted by setting ``deletedAt``: their transactions, stock movements and
+    snapshots stay, so sales history and past stock levels remain reportable. Items that do not
+    exist, are already deleted or still have saplings planted in a field are reported as failures
+    and left alone, without failing the rest of the request.
+    """
+    item_ids = sorted(set(item_ids))
+    async with prisma.get_client().tx() as transaction:
+        await transaction.query_raw(
+            'SELECT id FROM "InventoryItem" WHERE id = ANY($1::int[]) ORDER BY id FOR UPDATE',
+            item_ids,
+        )
+        rows = await transaction.query_raw(
+            "WITH requested AS (SELECT unnest($1::int[]) AS id), "
+            "blocked AS ("
+            "SELECT r.id, CASE WHEN i.id IS NULL OR i.\"deletedAt\" IS NOT NULL THEN 'not found' "
+            "ELSE 'saplings of this item are still planted' END AS reason "
+            'FROM requested r LEFT JOIN "InventoryItem" i ON i.id = r.id '
+            'WHERE i.id IS NULL OR i."deletedAt" IS NOT NULL OR EXISTS ('
+            'SELECT 1 FROM "SaplingCohort" c WHERE c."inventoryItemId" = r.id AND c."count" > 0)), '
+            "deleted AS ("
+            'UPDATE "InventoryItem" SET "deletedAt" = NOW(), "version" = "version" + 1 '
+            "WHERE id IN (SELECT id FROM requested EXCEPT SELECT id FROM blocked) "
+            'AND "deletedAt" IS NULL RETURNING id), '
+            "bumped AS ("
+            'INSERT INTO "InventoryState" ("id", "version") '
+            "SELECT 1, 1 WHERE EXISTS (SELECT 1 FROM deleted) "
+            'ON CONFLICT ("id") DO UPDATE SET "version" = "InventoryState"."version" + 1 '
+            'RETURNING "version") '
+            "SELECT ARRAY(SELECT id FROM deleted ORDER BY id) AS deleted_ids, "
+            "ARRAY(SELECT id FROM blocked ORDER BY id) AS failed_ids, "
+            "ARRAY(SELECT reason FROM blocked ORDER BY id) AS failed_reasons, "
+            "COALESCE((SELECT version FROM bumped), "
+            '(SELECT "version" FROM "InventoryState" WHERE "id" = 1), 0) AS version',
+            item_ids,
+        )
+    row = rows[0]
+    deleted_ids, version = row["deleted_ids"], row["version"]
+    if deleted_ids:
+        snapshot = project.inventorySnapshot.inventory_snapshot
+        snapshot.remove(deleted_ids)
+        snapshot.advance(version)
+    return BulkDeleteInventoryResponse(
+        deletedIds=deleted_ids,
+        failed=[
+            BulkDeleteFailure(itemId=item_id, reason=reason)
+            for item_id, reason in zip(row["failed_ids"], row["failed_reasons"])
+        ],
+        inventoryVersion=version,
+    )
+
+
+async def bulkDeleteInventoryItems(
+    request: BulkDeleteInventoryRequest,
+) -> BulkDeleteInventoryResponse:
+    """
+    Deletes many inventory items at once, e.g. when a batch of SKUs is discontinued. Everything
+    happens in a single transaction and the response carries only the deleted IDs, the items that
+    could not be deleted and the new inventory version token, so clients can drop those rows from
+    their local copy instead of reloading the whole inventory. Deleted items keep their ledger and
+    transaction history.
+
+    Args:
+        request (BulkDeleteInventoryRequest): IDs of the inventory items to delete.
+
+    Returns:
+        BulkDeleteInventoryResponse: IDs of the items that were actually deleted, the items that could not be, and the inventory version token after the delete.
+
+    Raises:
+        ValueError: If no IDs, or more than MAX_BULK_DELETE IDs, are given.
+
+    Example:
+        response = await bulkDeleteInventoryItems(BulkDeleteInventoryRequest(itemIds=[4, 9, 12]))
+        print(response)
+        > BulkDeleteInventoryResponse(deletedIds=[4, 12], failed=[BulkDeleteFailure(itemId=9, reason='saplings of this item are still planted')], inventoryVersion=318)
+    """
+    if not request.itemIds:
+        raise ValueError("itemIds must not be empty")
+    if len(request.itemIds) > MAX_BULK_DELETE:
+        raise ValueError(
+            "At most {} items can be deleted at once".format(MAX_BULK_DELETE)
+        )
+    return await delete_inventory_items(request.itemIds)
@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+import project.eventStream
+import project.getStaffScorecards_service
+import project.saplingCohorts
+import project.stockLedger
+import project.writeHelpers
+
+
+class CompleteScheduleResponse(BaseModel):
+    """
+    Response after marking a scheduled activity as completed.
+    """
+
+    success: bool
+    completedAt: Optional[datetime] = None
+    message: str
+
+
+async def completeSchedule(
+    scheduleId: int,
+    completedAt: Optional[datetime] = None,
+    inventoryItemId: Optional[int] = None,
+    treeCount: Optional[int] = None,
+    plantedYear: Optional[int] = None,
+) -> CompleteScheduleResponse:
+    """
+    Marks a scheduled activity as completed and counts it towards the assigned staff member's
+    scorecards in the same transaction. Completing an activity twice has no further effect.
+
+    When a tree count is given, a planting adds that many trees of the sapling ``inventoryItemId``
+    to the field's cohort for the year of completion, and a harvesting removes them from the
+    field's cohorts, oldest first unless ``plantedYear`` is given. The cohort change is part of the
+    same transaction, so a harvest exceeding the trees in the field leaves the schedule open.
+
+    Args:
+        scheduleId (int): The ID of the schedule to complete.
+        completedAt (Optional[datetime]): When the activity was completed; defaults to now.
+        inventoryItemId (Optional[int]): The sapling item planted or harvested.
+        treeCount (Optional[int]): Number of trees planted or harvested.
+        plantedYear (Optional[int]): For a harvest, the planting year of the trees taken.
+
+    Returns:
+        CompleteScheduleResponse: Response after marking a scheduled activity as completed.
+
+    Raises:
+        ValueError: If a tree count is given without a sapling item, for a delivery or for a
+            schedule without a field, or if a harvest exceeds the trees in the field.
+    """
+    completedAt = completedAt or datetime.utcnow()
+    if treeCount is not None and inventoryItemId is None:
+        raise ValueError("inventoryItemId is required with treeCount")
+    cohorts = []
+    async with prisma.get_client().tx() as transaction:
+        schedule = await project.writeHelpers.update_returning(
+            prisma.models.Schedule,
+            where={"id": scheduleId, "completedAt": None},
+            data={"completedAt": completedAt},
+            client=transaction,
+        )
+        if schedule is None:
+            existing = await project.writeHelpers.explain_miss(
+                prisma.models.Schedule, scheduleId, client=transaction
+            )
+            if existing is None:
+                return CompleteScheduleResponse(
+                    success=False, message="Schedule not found."
+                )
+            return CompleteScheduleResponse(
+                success=False,
+                completedAt=existing.completedAt,
+                message="Schedule already completed.",
+            )
+        await project.getStaffScorecards_service.record_performance(
+            transaction,
+            schedule.staffDetailsId,
+            project.stockLedger.as_utc(completedAt).date(),
+            activity_type=schedule.activityType,
+        )
+        if treeCount is not None:
+            if schedule.fieldId is None:
+                raise ValueError("Schedule {} has no field".format(scheduleId))
+            if schedule.activityType == prisma.enums.ActivityType.Planting:
+                cohorts = await project.saplingCohorts.record_planting(
+                    transaction,
+                    schedule.fieldId,
+                    inventoryItemId,
+                    completedAt.year,
+                    treeCount,
+                )
+            elif schedule.activityType == prisma.enums.ActivityType.Harvesting:
+                cohorts = await project.saplingCohorts.record_harvest(
+                    transaction,
+                    schedule.fieldId,
+                    inventoryItemId,
+                    treeCount,
+                    plantedYear,
+                )
+            else:
+                raise ValueError("Only plantings and harvests change tree counts")
+    project.saplingCohorts.cohort_table.apply(cohorts)
+    project.eventStream.publish(
+        "schedules",
+        "completed",
+        {
+            "scheduleId": scheduleId,
+            "completedAt": completedAt,
+            "activityType": schedule.activityType,
+            "staffDetailsId": schedule.staffDetailsId,
+            "fieldId": schedule.fieldId,
+        },
+    )
+    return CompleteScheduleResponse(
+        success=True, completedAt=completedAt, message="Schedule completed."
+    )
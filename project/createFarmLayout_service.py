@@ -0,0 +1,121 @@
+from typing import List, Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+import project.fieldConditions
+import project.fieldLocator
+
+
+class Dimension(BaseModel):
+    """
+    Overall extent of the farm drawing, in metres.
+    """
+
+    width: float
+    length: float
+
+
+class Path(BaseModel):
+    """
+    A named track or road across the farm, as a line through GPS points.
+    """
+
+    name: str
+    points: List[project.fieldLocator.GeoPoint]
+
+
+class FieldArea(BaseModel):
+    """
+    A field of the layout with its boundary polygon. The area is computed from the boundary when not given.
+    """
+
+    name: str
+    boundary: List[project.fieldLocator.GeoPoint]
+    areaSize: Optional[float] = None
+    mapUrl: str = ""
+    condition: prisma.enums.FieldCondition = prisma.enums.FieldCondition.Healthy
+
+
+class CreateFarmLayoutResponse(BaseModel):
+    """
+    The fields created for the new layout.
+    """
+
+    layoutName: str
+    fieldIds: List[int]
+    success: bool
+
+
+async def createFarmLayout(
+    layout_name: str,
+    dimensions: Dimension,
+    paths: List[Path],
+    fields: List[FieldArea],
+) -> CreateFarmLayoutResponse:
+    """
+    Creates a new farm layout. Each field area becomes a Field with its boundary polygon, all in
+    one transaction, and the worker's field locator is rebuilt so GPS lookups see the new fields
+    immediately. Dimensions and paths describe the drawing for display and are validated but not
+    stored.
+
+    Args:
+        layout_name (str): Name of the layout.
+        dimensions (Dimension): Overall extent of the farm drawing, in metres.
+        paths (List[Path]): Tracks and roads across the farm.
+        fields (List[FieldArea]): The fields of the layout with their boundaries.
+
+    Returns:
+        CreateFarmLayoutResponse: The fields created for the new layout.
+
+    Raises:
+        ValueError: If no fields are given, the dimensions are not positive, a path has fewer than
+            two points or a boundary is invalid.
+
+    Example:
+        response = await createFarmLayout("North farm", Dimension(width=800, length=600), [], [FieldArea(name="Block A", boundary=[GeoPoint(lat=35.501, lon=-82.502), GeoPoint(lat=35.501, lon=-82.498), GeoPoint(lat=35.504, lon=-82.498)])])
+        print(response)
+        > CreateFarmLayoutResponse(layoutName='North farm', fieldIds=[12], success=True)
+    """
+    if not fields:
+        raise ValueError("A layout needs at least one field")
+    if dimensions.width <= 0 or dimensions.length <= 0:
+        raise ValueError("Layout dimensions must be positive")
+    if any(len(path.points) < 2 for path in paths):
+        raise ValueError("A path needs at least two points")
+    for area in fields:
+        project.fieldLocator.validate_boundary(
+            [point.lat for point in area.boundary],
+            [point.lon for point in area.boundary],
+        )
+    field_ids = []
+    async with prisma.get_client().tx() as transaction:
+        for area in fields:
+            lats = [point.lat for point in area.boundary]
+            lons = [point.lon for point in area.boundary]
+            field = await prisma.models.Field.prisma(transaction).create(
+                data={
+                    "name": area.name,
+                    "areaSize": (
+                        area.areaSize
+                        if area.areaSize is not None
+                        else round(
+                            project.fieldLocator.polygon_area_acres(lats, lons), 2
+                        )
+                    ),
+                    "mapUrl": area.mapUrl,
+                    "condition": area.condition,
+                    "boundaryLats": lats,
+                    "boundaryLons": lons,
+                }
+            )
+            await project.fieldConditions.record_observation(
+                transaction, field.id, area.condition, source="farm-layout"
+            )
+            field_ids.append(field.id)
+    await project.fieldLocator.field_locator.load()
+    return CreateFarmLayoutResponse(
+        layoutName=layout_name, fieldIds=field_ids, success=True
+    )
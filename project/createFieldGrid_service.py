@@ -0,0 +1,97 @@
+from typing import Optional
+
+import prisma
+import prisma.models
+from pydantic import BaseModel
+
+import project.fieldGrid
+
+
+class CreateFieldGridRequest(BaseModel):
+    """
+    Dimensions of a field's tree grid and, optionally, the species it is planted with.
+    """
+
+    rows: int
+    columns: int
+    inventoryItemId: Optional[int] = None
+    heightClass: int = 0
+
+
+class CreateFieldGridResponse(BaseModel):
+    """
+    The new tree grid of a field.
+    """
+
+    fieldId: int
+    rows: int
+    columns: int
+    trees: int
+    version: int
+
+
+async def createFieldGrid(
+    fieldId: int, request: CreateFieldGridRequest
+) -> CreateFieldGridResponse:
+    """
+    Creates the row/position tree grid of a field. With ``inventoryItemId`` every position starts
+    as a healthy tree of that sapling item and ``heightClass``; otherwise the grid starts empty and
+    is filled with region updates.
+
+    Args:
+        fieldId (int): The field to create the grid for.
+        request (CreateFieldGridRequest): Dimensions of a field's tree grid and, optionally, the species it is planted with.
+
+    Returns:
+        CreateFieldGridResponse: The new tree grid of a field.
+
+    Raises:
+        ValueError: If the field does not exist or already has a grid, the dimensions are not
+            positive or exceed MAX_GRID_CELLS positions, the height class is not 0-255 or the
+            inventory item is not a sapling.
+
+    Example:
+        response = await createFieldGrid(2, CreateFieldGridRequest(rows=200, columns=400, inventoryItemId=4, heightClass=1))
+        print(response)
+        > CreateFieldGridResponse(fieldId=2, rows=200, columns=400, trees=80000, version=0)
+    """
+    project.fieldGrid.check_dimensions(request.rows, request.columns)
+    if not 0 <= request.heightClass <= 255:
+        raise ValueError("heightClass must be between 0 and 255")
+    field = await prisma.models.Field.prisma().find_unique(where={"id": fieldId})
+    if field is None:
+        raise ValueError("No field found with ID {}".format(fieldId))
+    existing = await prisma.models.FieldGrid.prisma().find_unique(
+        where={"fieldId": fieldId}
+    )
+    if existing is not None:
+        raise ValueError("Field {} already has a tree grid".format(fieldId))
+    if request.inventoryItemId is not None:
+        await project.fieldGrid.check_sapling(request.inventoryItemId)
+    grid = project.fieldGrid.TreeGrid.empty(request.rows, request.columns)
+    if request.inventoryItemId is not None:
+        grid.update_region(
+            0,
+            grid.rows - 1,
+            0,
+            grid.columns - 1,
+            {
+                "status": project.fieldGrid.TreeStatus.Healthy,
+                "species_index": grid.species_slot(request.inventoryItemId, add=True),
+                "height": request.heightClass,
+            },
+        )
+    grid = await project.fieldGrid.grid_store.create(fieldId, grid)
+    return CreateFieldGridResponse(
+        fieldId=fieldId,
+        rows=grid.rows,
+        columns=grid.columns,
+        trees=grid.count(
+            statuses=[
+                status
+                for status in project.fieldGrid.TreeStatus
+                if status != project.fieldGrid.TreeStatus.Empty
+            ]
+        ),
+        version=grid.version,
+    )
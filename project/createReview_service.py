@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import List, Optional
+
+import prisma
+import prisma.models
+from pydantic import BaseModel
+
+import project.getStaffScorecards_service
+
+
+class ObjectiveScore(BaseModel):
+    """
+    Score given for one objective set for the staff member.
+    """
+
+    objective: str
+    score: float
+
+
+class CreateReviewRequest(BaseModel):
+    """
+    A performance review of a staff member, with a score for each objective reviewed.
+    """
+
+    date: datetime
+    performance: str
+    feedback: str
+    objectives: List[ObjectiveScore]
+
+
+class CreateReviewResponse(BaseModel):
+    """
+    Response after recording a performance review, with the overall score derived from the objective scores.
+    """
+
+    success: bool
+    reviewId: Optional[int] = None
+    score: Optional[float] = None
+    message: str
+
+
+async def createReview(id: int, request: CreateReviewRequest) -> CreateReviewResponse:
+    """
+    Records a performance review for a staff member with structured objective scores. The review's
+    overall score is the mean of its objective scores, and the staff member's scorecards are
+    updated in the same transaction.
+
+    Args:
+        id (int): Unique identifier of the staff member being reviewed.
+        request (CreateReviewRequest): A performance review of a staff member, with a score for each objective reviewed.
+
+    Returns:
+        CreateReviewResponse: Response after recording a performance review, with the overall score derived from the objective scores.
+    """
+    staff_details = await prisma.models.StaffDetails.prisma().find_unique(
+        where={"id": id}
+    )
+    if staff_details is None:
+        return CreateReviewResponse(
+            success=False, message="Staff details not found for provided ID."
+        )
+    objectives = request.objectives
+    score = (
+        sum(objective.score for objective in objectives) / len(objectives)
+        if objectives
+        else None
+    )
+    async with prisma.get_client().tx() as transaction:
+        review = await prisma.models.Review.prisma(transaction).create(
+            data={
+                "date": request.date,
+                "performance": request.performance,
+                "feedback": request.feedback,
+                "score": score,
+                "staffDetailsId": id,
+                "objectives": {
+                    "create": [
+                        {"objective": objective.objective, "score": objective.score}
+                        for objective in objectives
+                    ]
+                },
+            }
+        )
+        await project.getStaffScorecards_service.record_performance(
+            transaction, id, request.date.date(), review_score=score, reviewed=True
+        )
+    return CreateReviewResponse(
+        success=True,
+        reviewId=review.id,
+        score=score,
+        message="Review recorded successfully.",
+    )
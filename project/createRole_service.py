@@ -0,0 +1,64 @@
+from typing import List
+
+import prisma
+import prisma.enums
+from pydantic import BaseModel
+
+from project.permissions import permission_store
+
+
+class CreateRoleResponse(BaseModel):
+    """
+    Response after defining a role's permissions, listing everything the role now holds.
+    """
+
+    success: bool
+    role: str
+    permissions: List[str]
+    message: str
+
+
+async def createRole(
+    role_name: str,
+    permissions: str,
+    caller_role: prisma.enums.Role,
+    createPermissions: bool = False,
+) -> CreateRoleResponse:
+    """
+    Creates a new staff role with specific permissions. Roles are the fixed set in
+    ``prisma.enums.Role``, so this grants the comma-separated permissions to one of them. Permission
+    names that do not exist yet are rejected unless ``createPermissions`` is set, so a typo cannot
+    define a new permission. Callers cannot grant to their own role. The in-memory permission store
+    is reloaded afterwards.
+
+    Args:
+        role_name (str): Name of the role, which must be a member of prisma.enums.Role.
+        permissions (str): Comma-separated permission names to grant to the role.
+        caller_role (prisma.enums.Role): Role of the user making the change.
+        createPermissions (bool): Define permission names that do not exist yet.
+
+    Returns:
+        CreateRoleResponse: Response after defining a role's permissions, listing everything the role now holds.
+
+    Raises:
+        HTTPException: 403 for the caller's own role, 400 for unknown permissions without ``createPermissions``.
+    """
+    if role_name not in prisma.enums.Role.__members__:
+        return CreateRoleResponse(
+            success=False,
+            role=role_name,
+            permissions=[],
+            message="Unknown role. Valid roles are: {}".format(
+                ", ".join(prisma.enums.Role.__members__)
+            ),
+        )
+    role = prisma.enums.Role(role_name)
+    granted = await permission_store.grant(
+        role, permissions.split(","), caller_role=caller_role, create=createPermissions
+    )
+    return CreateRoleResponse(
+        success=True,
+        role=role_name,
+        permissions=granted,
+        message="Role permissions saved successfully.",
+    )
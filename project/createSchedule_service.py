@@ -7,6 +7,8 @@ import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+import project.eventStream
+
 
 class ScheduleCreationResponse(BaseModel):
     """
@@ -56,8 +58,8 @@ async def createSchedule(
                 success=False, message="Staff details not found for provided ID."
             )
     if inventoryItemId is not None:
-        inventory_item = await prisma.models.InventoryItem.prisma().find_unique(
-            where={"id": inventoryItemId}
+        inventory_item = await prisma.models.InventoryItem.prisma().find_first(
+            where={"id": inventoryItemId, "deletedAt": None}
         )
         if inventory_item is None:
             return ScheduleCreationResponse(
@@ -74,6 +76,17 @@ async def createSchedule(
         "fieldId": fieldId,
     }
     new_schedule = await prisma.models.Schedule.prisma().create(data=schedule_data)
+    project.eventStream.publish(
+        "schedules",
+        "created",
+        {
+            "scheduleId": new_schedule.id,
+            "date": new_schedule.date,
+            "activityType": new_schedule.activityType,
+            "staffDetailsId": new_schedule.staffDetailsId,
+            "fieldId": new_schedule.fieldId,
+        },
+    )
     return ScheduleCreationResponse(
         success=True,
         scheduleId=new_schedule.id,
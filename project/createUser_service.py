@@ -1,11 +1,12 @@
 from enum import Enum
 
-import bcrypt
 import prisma
 import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+import project.passwordHashing
+
 
 class CreateUserResponse(BaseModel):
     """
@@ -45,8 +46,7 @@ async def createUser(username: str, email: str, password: str) -> CreateUserResp
         print(response)
         > CreateUserResponse(userId=1, username='john_doe', email='john.doe@example.com', role='Staff')
     """
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+    hashed_password = await project.passwordHashing.hash_password(password)
     user = await prisma.models.User.prisma().create(
         data={
             "email": email,
@@ -4,6 +4,8 @@ import prisma
 import prisma.models
 from pydantic import BaseModel
 
+import project.writeHelpers
+
 
 class DeleteCustomerResponse(BaseModel):
     """
@@ -39,8 +41,9 @@ async def deleteCustomer(id: int, user_role: Role) -> DeleteCustomerResponse:
     """
     if user_role != Role.Admin:
         raise PermissionError("Only Admins are allowed to delete customer records.")
-    customer = await prisma.models.Customer.prisma().find_unique(where={"id": id})
+    customer = await project.writeHelpers.delete_returning(
+        prisma.models.Customer, where={"id": id}
+    )
     if not customer:
         raise ValueError(f"No customer found with ID {id}.")
-    await prisma.models.Customer.prisma().delete(where={"id": id})
     return DeleteCustomerResponse(status="prisma.models.Customer successfully deleted.")
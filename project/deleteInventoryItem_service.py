@@ -1,34 +1,37 @@
 from typing import List
 
-import prisma
-import prisma.models
 from pydantic import BaseModel
 
+import project.bulkDeleteInventoryItems_service
+
 
 class DeleteInventoryItemResponse(BaseModel):
     """
-    Response model that provides confirmation of deletion and details of the updated inventory list.
+    Response model that confirms the deletion with the deleted ID and the new inventory version token, or says why the item could not be deleted.
     """
 
     success: bool
-    remainingItems: List[prisma.models.InventoryItem]
+    deletedIds: List[int]
+    failed: List[project.bulkDeleteInventoryItems_service.BulkDeleteFailure] = []
+    inventoryVersion: int
 
 
 async def deleteInventoryItem(itemId: int) -> DeleteInventoryItemResponse:
     """
-    Deletes an item from inventory when it is no longer available or needed. This endpoint needs the item ID. A successful deletion will be confirmed along with an updated list of remaining inventory items.
+    Deletes an item from inventory when it is no longer available or needed. This endpoint needs the item ID. A successful deletion is confirmed with the deleted ID and the new inventory version token, so clients can update their copy of the inventory without reloading it. The item's transactions and stock history are kept; an item with saplings still planted is not deleted and the response says why.
 
     Args:
     itemId (int): The unique identifier for the inventory item to be deleted.
 
     Returns:
-    DeleteInventoryItemResponse: Response model that provides confirmation of deletion and details of the updated inventory list.
+    DeleteInventoryItemResponse: Response model that confirms the deletion with the deleted ID and the new inventory version token, or says why the item could not be deleted.
     """
-    inventory_item = await prisma.models.InventoryItem.prisma().delete(
-        where={"id": itemId}
+    result = await project.bulkDeleteInventoryItems_service.delete_inventory_items(
+        [itemId]
+    )
+    return DeleteInventoryItemResponse(
+        success=bool(result.deletedIds),
+        deletedIds=result.deletedIds,
+        failed=result.failed,
+        inventoryVersion=result.inventoryVersion,
     )
-    if inventory_item:
-        remaining_items = await prisma.models.InventoryItem.prisma().find_many()
-        return DeleteInventoryItemResponse(success=True, remainingItems=remaining_items)
-    else:
-        return DeleteInventoryItemResponse(success=False, remainingItems=[])
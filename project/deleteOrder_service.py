@@ -1,8 +1,13 @@
+from typing import Optional
+
 import prisma
 import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+import project.eventStream
+import project.writeHelpers
+
 
 class DeleteOrderResponse(BaseModel):
     """
@@ -13,17 +18,23 @@ class DeleteOrderResponse(BaseModel):
     message: str
 
 
-async def deleteOrder(orderId: int, confirmation: bool) -> DeleteOrderResponse:
+async def deleteOrder(
+    orderId: int, confirmation: bool, expectedVersion: Optional[int] = None
+) -> DeleteOrderResponse:
     """
     Deletes an existing order. This will release the reserved inventory back to the Inventory Management system and update the financial records in QuickBooks to reflect the cancellation. This action requires confirmation from an authorized user.
 
     Args:
         orderId (int): The unique identifier of the order to be deleted.
         confirmation (bool): A confirmation token or flag that validates the intent to delete the order from an authorized user.
+        expectedVersion (Optional[int]): Version of the order the caller last read; the cancellation is refused if the order has changed since.
 
     Returns:
         DeleteOrderResponse: Provides a confirmation of the order deletion and flags any important results such as inventory adjustments or QuickBooks updates.
 
+    Raises:
+        HTTPException: 409 if ``expectedVersion`` is given and the order has been changed since.
+
     Examples:
         >>> response = await deleteOrder(5, True)
         >>> print(response.success)
@@ -35,13 +46,26 @@ async def deleteOrder(orderId: int, confirmation: bool) -> DeleteOrderResponse:
         return DeleteOrderResponse(
             success=False, message="Action not confirmed. Order deletion aborted."
         )
-    order = await prisma.models.Order.prisma().find_unique(where={"id": orderId})
-    if not order:
+    where = {"id": orderId, "status": {"not": prisma.enums.OrderStatus.Cancelled}}
+    if expectedVersion is not None:
+        where["version"] = expectedVersion
+    order = await project.writeHelpers.update_returning(
+        prisma.models.Order,
+        where=where,
+        data={"status": prisma.enums.OrderStatus.Cancelled},
+    )
+    if order is None:
+        if await project.writeHelpers.explain_miss(
+            prisma.models.Order, orderId, expectedVersion
+        ):
+            return DeleteOrderResponse(
+                success=False, message="Order already cancelled."
+            )
         return DeleteOrderResponse(success=False, message="Order not found.")
-    if order.status == prisma.enums.OrderStatus.Cancelled:
-        return DeleteOrderResponse(success=False, message="Order already cancelled.")
-    result = await prisma.models.Order.prisma().update(
-        where={"id": orderId}, data={"status": prisma.enums.OrderStatus.Cancelled}
+    project.eventStream.publish(
+        "orders",
+        "cancelled",
+        {"orderId": order.id, "customerId": order.customerId, "version": order.version},
     )
     return DeleteOrderResponse(
         success=True, message="Order deleted and inventory updated successfully."
@@ -3,6 +3,8 @@ import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+from project.permissions import permission_store
+
 
 class DeleteRoleResponse(BaseModel):
     """
@@ -13,40 +15,41 @@ class DeleteRoleResponse(BaseModel):
     message: str
 
 
-async def deleteRole(id: int) -> DeleteRoleResponse:
+async def deleteRole(id: str, caller_role: prisma.enums.Role) -> DeleteRoleResponse:
     """
     Removes a set role from the system, maintaining clean and up-to-date role management. Access limited to Admin and HR for security reasons.
 
-    This function checks if there are any users associated with the role to be deleted. If there are no such users, it proceeds to delete the role.
-    However, if there are users tied to this role, no deletion occurs, and the function then returns a status indicating failure due to active role linkage.
+    Roles are the fixed set in ``prisma.enums.Role``, so deleting a role revokes all of its permissions. If users are
+    still assigned to the role nothing is changed and a failure status is returned. A role that is the last to hold
+    manage_roles cannot be deleted.
 
     Args:
-        id (int): The unique identifier of the role to be deleted.
+        id (str): Name of the role to be deleted, e.g. 'Accountant'.
+        caller_role (prisma.enums.Role): Role of the user making the change.
 
     Returns:
         DeleteRoleResponse: Response model for confirming the deletion of a role. Includes a success status and potential error message to facilitate straightforward client-side handling.
 
+    Raises:
+        HTTPException: 403 for the caller's own role, 409 if no role would keep manage_roles.
+
     Example:
-        response = await deleteRole(1)
+        response = await deleteRole('Accountant', prisma.enums.Role.Admin)
         if response.success:
-            print('prisma.enums.Role deleted successfully')
+            print('Role deleted successfully')
         else:
             print(f'Error: {response.message}')
     """
-    try:
-        users_linked_to_role = await prisma.models.User.prisma().find_many(
-            where={"role": {"equals": prisma.enums.Role(id)}}
-        )
-        if users_linked_to_role:
-            return DeleteRoleResponse(
-                success=False,
-                message="prisma.enums.Role is still assigned to users and cannot be deleted.",
-            )
-        return DeleteRoleResponse(
-            success=True,
-            message="prisma.enums.Role 'deleted' successfully. Note: In practice, enum values cannot be deleted.",
-        )
-    except Exception as e:
+    if id not in prisma.enums.Role.__members__:
+        return DeleteRoleResponse(success=False, message="Unknown role.")
+    role = prisma.enums.Role(id)
+    users_linked_to_role = await prisma.models.User.prisma().count(where={"role": role})
+    if users_linked_to_role:
         return DeleteRoleResponse(
-            success=False, message=f"Failed to delete role: {str(e)}"
+            success=False,
+            message="Role is still assigned to users and cannot be deleted.",
         )
+    await permission_store.grant(role, [], replace=True, caller_role=caller_role)
+    return DeleteRoleResponse(
+        success=True, message="Role permissions revoked successfully."
+    )
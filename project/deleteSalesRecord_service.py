@@ -3,6 +3,8 @@ import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+import project.writeHelpers
+
 
 class DeleteSalesResponse(BaseModel):
     """
@@ -27,12 +29,12 @@ async def deleteSalesRecord(salesId: int) -> DeleteSalesResponse:
         response = await deleteSalesRecord(salesId)
         > DeleteSalesResponse(message='Sales record with ID 101 deleted successfully.')
     """
-    transaction = await prisma.models.Transaction.prisma().find_unique(
-        where={"id": salesId, "type": prisma.enums.TransactionType.Sale}
+    transaction = await project.writeHelpers.delete_returning(
+        prisma.models.Transaction,
+        where={"id": salesId, "type": prisma.enums.TransactionType.Sale},
     )
     if not transaction:
         return DeleteSalesResponse(message=f"Sales record with ID {salesId} not found.")
-    await prisma.models.Transaction.prisma().delete(where={"id": salesId})
     return DeleteSalesResponse(
         message=f"Sales record with ID {salesId} deleted successfully."
     )
@@ -1,9 +1,16 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 
 import prisma
+import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+import project.eventStream
+import project.fieldConditions
+import project.getStaffScorecards_service
+import project.writeHelpers
+
 
 class DeleteScheduleResponse(BaseModel):
     """
@@ -15,36 +22,72 @@ class DeleteScheduleResponse(BaseModel):
     message: str
 
 
-async def deleteSchedule(scheduleId: int) -> DeleteScheduleResponse:
+async def deleteSchedule(
+    scheduleId: int, expectedVersion: Optional[int] = None
+) -> DeleteScheduleResponse:
     """
     Deletes a schedule identified by the scheduleId. This action removes the schedule from the system and updates related resource allocations and field statuses accordingly.
+    The delete, the field update and the field's condition observation run as one statement. If the schedule was
+    completed, its completion is taken back out of the staff member's performance buckets and scorecards in the same
+    transaction.
 
     Args:
         scheduleId (int): Unique identifier for the schedule to be deleted. Must exist in the schedules database table.
+        expectedVersion (Optional[int]): Version of the schedule the caller last read; the delete is refused if the schedule has changed since.
 
     Returns:
         DeleteScheduleResponse: Response model following the deletion of a schedule. Primarily indicates success of the deletion process and potentially could return details of resources updated due to deletion.
+
+    Raises:
+        HTTPException: 409 if ``expectedVersion`` is given and the schedule has been changed since.
     """
-    schedule = await prisma.models.Schedule.prisma().find_unique(
-        where={"id": scheduleId}, include={"field": True}
-    )
-    if schedule is None:
+    async with prisma.get_client().tx() as transaction:
+        rows = await transaction.query_raw(
+            "WITH deleted AS ("
+            'DELETE FROM "Schedule" WHERE id = $1::int AND ($2::int IS NULL OR "version" = $2) '
+            'RETURNING "fieldId", "completedAt", "staffDetailsId", "activityType"::text), '
+            "flagged AS ("
+            'UPDATE "Field" f SET "condition" = \'NeedsAttention\' FROM deleted d '
+            'WHERE f.id = d."fieldId" RETURNING f.id), '
+            "observed AS ("
+            'INSERT INTO "FieldObservation" ("fieldId", "condition", "score", "source") '
+            "SELECT id, 'NeedsAttention', $3::float, 'schedule-deleted' FROM flagged) "
+            "SELECT (SELECT COUNT(*) FROM deleted)::int AS deleted, "
+            'to_char(d."completedAt", \'YYYY-MM-DD\') AS "completedDay", '
+            'd."staffDetailsId", d."activityType", '
+            "ARRAY(SELECT id FROM flagged) AS field_ids "
+            "FROM (SELECT 1) AS one LEFT JOIN deleted d ON TRUE",
+            scheduleId,
+            expectedVersion,
+            project.fieldConditions.CONDITION_SCORES[
+                prisma.enums.FieldCondition.NeedsAttention
+            ],
+        )
+        deleted = rows[0]
+        if deleted["completedDay"] is not None:
+            await project.getStaffScorecards_service.record_performance(
+                transaction,
+                deleted["staffDetailsId"],
+                date.fromisoformat(deleted["completedDay"]),
+                activity_type=prisma.enums.ActivityType(deleted["activityType"]),
+                retract=True,
+            )
+    if rows[0]["deleted"] == 0:
+        await project.writeHelpers.explain_miss(
+            prisma.models.Schedule, scheduleId, expectedVersion
+        )
         return DeleteScheduleResponse(
             success=False,
             updated_field_ids=[],
             message="Schedule with the provided ID does not exist.",
         )
-    field_update_ids = []
-    if schedule.field:
-        field_id = schedule.field.id
-        await prisma.models.Schedule.prisma().update(
-            where={"id": scheduleId},
-            data={"field": {"update": {"condition": "NeedsAttention"}}},
-        )
-        field_update_ids.append(field_id)
-    await prisma.models.Schedule.prisma().delete(where={"id": scheduleId})
+    project.eventStream.publish(
+        "schedules",
+        "deleted",
+        {"scheduleId": scheduleId, "flaggedFieldIds": rows[0]["field_ids"]},
+    )
     return DeleteScheduleResponse(
         success=True,
-        updated_field_ids=field_update_ids,
+        updated_field_ids=rows[0]["field_ids"],
         message="Successfully deleted the schedule and updated associated resources.",
     )
@@ -1,25 +1,19 @@
 from typing import List
 
-import prisma
-import prisma.models
 from pydantic import BaseModel
 
+import project.bulkDeleteInventoryItems_service
+
 
 class DeleteInventoryItemResponse(BaseModel):
     """
-    Response model that provides confirmation of deletion and details of the updated inventory list.
+    Response model that confirms the deletion with the deleted ID and the new inventory version token, or says why the item could not be deleted.
     """
 
     success: bool
-    remainingItems: List[prisma.models.InventoryItem]
-
-
-class InventoryItem(BaseModel):
-    id: int
-    name: str
-    quantity: int
-    status: str
-    type: str
+    deletedIds: List[int]
+    failed: List[project.bulkDeleteInventoryItems_service.BulkDeleteFailure] = []
+    inventoryVersion: int
 
 
 async def deleteSupplyChainItem(itemId: int) -> DeleteInventoryItemResponse:
@@ -27,26 +21,22 @@ async def deleteSupplyChainItem(itemId: int) -> DeleteInventoryItemResponse:
     Removes an item from the supply chain. This endpoint is used when an item is
     no longer needed or if the order was cancelled. It ensures the Supply Chain Management
     system remains clean and up-to-date, also reflecting changes in the Inventory Management
-    system to keep stock levels accurate.
+    system to keep stock levels accurate. The item's transactions and stock history are kept; an
+    item with saplings still planted is not deleted and the response says why.
 
     Args:
         itemId (int): The unique identifier for the inventory item to be deleted.
 
     Returns:
-        DeleteInventoryItemResponse: Response model that provides confirmation of deletion
-        and details of the updated inventory list.
+        DeleteInventoryItemResponse: Response model that confirms the deletion with the deleted
+        ID and the new inventory version token, or says why the item could not be deleted.
     """
-    item_to_delete = await prisma.models.InventoryItem.prisma().delete(
-        where={"id": itemId}
+    result = await project.bulkDeleteInventoryItems_service.delete_inventory_items(
+        [itemId]
     )
-    remaining_items = await prisma.models.InventoryItem.prisma().find_many()
-    if item_to_delete is None:
-        return DeleteInventoryItemResponse(
-            success=False, remainingItems=remaining_items
-        )
     return DeleteInventoryItemResponse(
-        success=True,
-        remainingItems=[
-            prisma.models.InventoryItem.from_orm(i) for i in remaining_items
-        ],
+        success=bool(result.deletedIds),
+        deletedIds=result.deletedIds,
+        failed=result.failed,
+        inventoryVersion=result.inventoryVersion,
     )
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import uuid
+from collections import deque
+from os import getenv
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+TOPIC_BACKLOG = int(getenv("EVENT_TOPIC_BACKLOG", "512"))
+MAX_SUBSCRIBERS = int(getenv("EVENT_MAX_SUBSCRIBERS", "1000"))
+
+TOPICS = ("inventory", "orders", "schedules")
+
+
+class TopicLog:
+    """
+    Bounded log of the most recent events of one topic, already encoded as SSE frames.
+
+    Subscribers do not get a queue of their own: each keeps a cursor into the topic logs and reads
+    whatever has been appended past it. Publishing is therefore a single append however many
+    clients are connected, and a client that stops reading never holds up the publisher. When a
+    client falls more than ``capacity`` events behind, the oldest events are dropped and the client
+    is told to resynchronise instead.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.events: Deque[Tuple[int, str]] = deque(maxlen=capacity)
+        self.evicted_through = 0
+
+    def append(self, seq: int, frame: str) -> None:
+        if len(self.events) == self.events.maxlen:
+            self.evicted_through = self.events[0][0]
+        self.events.append((seq, frame))
+
+    def read_after(self, cursor: int) -> Tuple[List[Tuple[int, str]], bool]:
+        """
+        Returns the events with a sequence number above ``cursor`` and whether any were dropped
+        before they could be read.
+        """
+        missed = cursor < self.evicted_through
+        if not self.events or self.events[-1][0] <= cursor:
+            return [], missed
+        fresh = []
+        for seq, frame in reversed(self.events):
+            if seq <= cursor:
+                break
+            fresh.append((seq, frame))
+        fresh.reverse()
+        return fresh, missed
+
+
+class EventBroker:
+    """
+    Per-worker fan-out of change events from the write services to streaming clients.
+
+    Sequence numbers are shared by all topics and prefixed with a random ``epoch`` when sent as
+    SSE ids, so a client reconnecting with a ``Last-Event-ID`` from another worker or from before a
+    restart is recognised and told to resynchronise.
+    """
+
+    def __init__(self, capacity: int = TOPIC_BACKLOG):
+        self.topics: Dict[str, TopicLog] = {
+            name: TopicLog(name, capacity) for name in TOPICS
+        }
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+
+    def publish(self, topic: str, event: str, data: Dict[str, Any]) -> None:
+        """
+        Appends an event to a topic and wakes waiting subscribers. Never blocks; the payload is
+        encoded once and shared by every subscriber.
+        """
+        self.seq += 1
+        frame = "id: {}-{}\nevent: {}.{}\ndata: {}\n\n".format(
+            self.epoch,
+            self.seq,
+            topic,
+            event,
+            json.dumps(data, default=str, separators=(",", ":")),
+        )
+        self.topics[topic].append(self.seq, frame)
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def cursor_from(self, last_event_id: Optional[str]) -> Optional[int]:
+        """
+        Translates a client's ``Last-Event-ID`` into a cursor, or None if it was not issued by
+        this worker since it started.
+        """
+        if not last_event_id:
+            return self.seq
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self.seq:
+            return None
+        return int(seq)
+
+    def read(self, topics: Iterable[str], cursor: int) -> Tuple[List[str], List[str]]:
+        """
+        Returns the frames published on ``topics`` after ``cursor`` in publication order, and the
+        topics on which events were dropped.
+        """
+        events: List[Tuple[int, str]] = []
+        missed = []
+        for name in topics:
+            fresh, dropped = self.topics[name].read_after(cursor)
+            events.extend(fresh)
+            if dropped:
+                missed.append(name)
+        events.sort()
+        return [frame for _, frame in events], missed
+
+    async def wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+broker = EventBroker()
+
+
+def publish(topic: str, event: str, data: Dict[str, Any]) -> None:
+    broker.publish(topic, event, data)
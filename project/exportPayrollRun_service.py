@@ -0,0 +1,85 @@
+import csv
+import io
+from typing import AsyncIterator, Optional
+
+import prisma
+import prisma.models
+
+EXPORT_PAGE_SIZE = 500
+
+CSV_COLUMNS = [
+    "staffDetailsId",
+    "firstName",
+    "lastName",
+    "taxCode",
+    "grossPay",
+    "withholding",
+    "netPay",
+]
+
+
+def _csv_line(row: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+
+async def exportPayrollRun(runId: int) -> AsyncIterator[str]:
+    """
+    Streams the entries of a payroll run as CSV, one page of rows at a time, so large runs are
+    never held in memory or built into a single response body.
+
+    Args:
+        runId (int): The ID of the payroll run to export.
+
+    Returns:
+        AsyncIterator[str]: CSV text chunks, starting with the header line.
+
+    Raises:
+        ValueError: If no payroll run exists with the given ID.
+    """
+    run = await prisma.models.PayrollRun.prisma().find_unique(where={"id": runId})
+    if run is None:
+        raise ValueError("No payroll run found for ID: {}".format(runId))
+
+    async def rows() -> AsyncIterator[str]:
+        yield _csv_line(CSV_COLUMNS)
+        cursor: Optional[int] = None
+        while True:
+            page = await prisma.models.PayrollEntry.prisma().find_many(
+                where={"payrollRunId": runId},
+                include={
+                    "staffDetails": {
+                        "include": {"user": {"include": {"profile": True}}}
+                    }
+                },
+                order={"id": "asc"},
+                take=EXPORT_PAGE_SIZE,
+                skip=1 if cursor is not None else 0,
+                cursor={"id": cursor} if cursor is not None else None,
+            )
+            if not page:
+                return
+            chunk = io.StringIO()
+            writer = csv.writer(chunk)
+            for entry in page:
+                profile = (
+                    entry.staffDetails.user.profile
+                    if entry.staffDetails and entry.staffDetails.user
+                    else None
+                )
+                writer.writerow(
+                    [
+                        entry.staffDetailsId,
+                        profile.firstName if profile else "",
+                        profile.lastName if profile else "",
+                        entry.taxCode,
+                        "{:.2f}".format(entry.grossPay),
+                        "{:.2f}".format(entry.withholding),
+                        "{:.2f}".format(entry.netPay),
+                    ]
+                )
+            yield chunk.getvalue()
+            cursor = page[-1].id
+
+    return rows()
@@ -0,0 +1,188 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+
+import project.maintenance
+import project.stockLedger
+
+logger = logging.getLogger(__name__)
+
+# Raw observations older than this are folded into one FieldConditionDaily row per field and day.
+ROLLUP_AFTER = timedelta(days=90)
+# Observations may be backdated, e.g. when a scouting walk is typed up later, but not future-dated
+# beyond clock skew between tablets and the server.
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+BUCKETS = ("day", "week", "month", "year")
+
+# Health score recorded for an observation that gives only a condition, from 1 (all healthy) to 0.
+CONDITION_SCORES: Dict[prisma.enums.FieldCondition, float] = {
+    prisma.enums.FieldCondition.Healthy: 1.0,
+    prisma.enums.FieldCondition.NeedsAttention: 0.5,
+    prisma.enums.FieldCondition.Critical: 0.0,
+}
+
+
+def _naive_utc(value: Optional[datetime]) -> str:
+    value = project.stockLedger.as_utc(value or datetime.now(timezone.utc))
+    return value.replace(tzinfo=None).isoformat()
+
+
+async def record_observation(
+    client: prisma.Prisma,
+    field_id: int,
+    condition: prisma.enums.FieldCondition,
+    score: Optional[float] = None,
+    source: Optional[str] = None,
+    note: Optional[str] = None,
+    observed_at: Optional[datetime] = None,
+) -> prisma.models.FieldObservation:
+    """
+    Appends an observation to a field's condition history and, unless a later observation already
+    exists, makes its condition the field's current one. Call it inside the transaction that
+    changes the field so the history never disagrees with ``Field.condition``.
+
+    Raises:
+        ValueError: If ``score`` is outside 0 to 1 or ``observed_at`` is in the future.
+    """
+    if score is not None and not 0 <= score <= 1:
+        raise ValueError("score must be between 0 and 1")
+    if observed_at is not None:
+        observed_at = project.stockLedger.as_utc(observed_at)
+        if observed_at > datetime.now(timezone.utc) + MAX_CLOCK_SKEW:
+            raise ValueError("observedAt must not be in the future")
+    data: Dict[str, Any] = {
+        "fieldId": field_id,
+        "condition": condition,
+        "score": CONDITION_SCORES[condition] if score is None else score,
+        "source": source,
+        "note": note,
+    }
+    if observed_at is not None:
+        data["observedAt"] = observed_at
+    observation = await prisma.models.FieldObservation.prisma(client).create(data=data)
+    await client.execute_raw(
+        'UPDATE "Field" SET "condition" = $2::"FieldCondition" WHERE id = $1::int '
+        'AND NOT EXISTS (SELECT 1 FROM "FieldObservation" o WHERE o."fieldId" = $1 '
+        'AND o."observedAt" > $3::timestamp) '
+        'AND NOT EXISTS (SELECT 1 FROM "FieldConditionDaily" d WHERE d."fieldId" = $1 '
+        'AND d."lastObservedAt" > $3::timestamp)',
+        field_id,
+        condition,
+        _naive_utc(observation.observedAt),
+    )
+    return observation
+
+
+async def roll_up(
+    before: Optional[datetime] = None, client: Optional[prisma.Prisma] = None
+) -> int:
+    """
+    Moves raw observations from whole days before ``before`` (default: ROLLUP_AFTER ago) into
+    daily rollups, in one statement, with ``client`` or the default client. Backdated
+    observations that land on an already rolled-up day are merged into its row on the next run.
+
+    Returns:
+        int: Number of raw observations rolled up.
+    """
+    rows = await (client or prisma.get_client()).query_raw(
+        "WITH moved AS ("
+        'DELETE FROM "FieldObservation" '
+        "WHERE \"observedAt\" < date_trunc('day', $1::timestamp) "
+        'RETURNING "fieldId", "observedAt", "condition", "score"), '
+        "days AS ("
+        'SELECT "fieldId", "observedAt"::date AS "day", COUNT(*)::int AS "observations", '
+        'COUNT(*) FILTER (WHERE "condition" = \'Healthy\')::int AS "healthy", '
+        'COUNT(*) FILTER (WHERE "condition" = \'NeedsAttention\')::int AS "needsAttention", '
+        'COUNT(*) FILTER (WHERE "condition" = \'Critical\')::int AS "critical", '
+        'SUM("score") AS "scoreSum", MIN("score") AS "scoreMin", MAX("score") AS "scoreMax", '
+        '(array_agg("condition" ORDER BY "observedAt" DESC))[1] AS "lastCondition", '
+        'MAX("observedAt") AS "lastObservedAt" '
+        "FROM moved GROUP BY 1, 2), "
+        "merged AS ("
+        'INSERT INTO "FieldConditionDaily" AS d ("fieldId", "day", "observations", "healthy", '
+        '"needsAttention", "critical", "scoreSum", "scoreMin", "scoreMax", "lastCondition", '
+        '"lastObservedAt") SELECT * FROM days '
+        'ON CONFLICT ("fieldId", "day") DO UPDATE SET '
+        '"observations" = d."observations" + EXCLUDED."observations", '
+        '"healthy" = d."healthy" + EXCLUDED."healthy", '
+        '"needsAttention" = d."needsAttention" + EXCLUDED."needsAttention", '
+        '"critical" = d."critical" + EXCLUDED."critical", '
+        '"scoreSum" = d."scoreSum" + EXCLUDED."scoreSum", '
+        '"scoreMin" = LEAST(d."scoreMin", EXCLUDED."scoreMin"), '
+        '"scoreMax" = GREATEST(d."scoreMax", EXCLUDED."scoreMax"), '
+        '"lastCondition" = CASE WHEN EXCLUDED."lastObservedAt" >= d."lastObservedAt" '
+        'THEN EXCLUDED."lastCondition" ELSE d."lastCondition" END, '
+        '"lastObservedAt" = GREATEST(d."lastObservedAt", EXCLUDED."lastObservedAt")) '
+        "SELECT COUNT(*)::int AS moved FROM moved",
+        _naive_utc(before or datetime.now(timezone.utc) - ROLLUP_AFTER),
+    )
+    return rows[0]["moved"]
+
+
+# Rolled-up days and recent raw observations, each raw row standing in for a one-observation day,
+# bucketed per field. Fields without observations in the range yield a single row with a NULL
+# bucket so every field appears in the result.
+_SERIES_QUERY = (
+    "WITH series AS ("
+    'SELECT "fieldId", "day"::timestamp AS at, "observations", "healthy", "needsAttention", '
+    '"critical", "scoreSum", "scoreMin", "scoreMax", "lastCondition", "lastObservedAt" '
+    'FROM "FieldConditionDaily" '
+    'WHERE "day" >= $1::timestamp::date AND "day" < $2::timestamp '
+    'AND ($4::int IS NULL OR "fieldId" = $4) '
+    "UNION ALL "
+    'SELECT "fieldId", "observedAt", 1, ("condition" = \'Healthy\')::int, '
+    "(\"condition\" = 'NeedsAttention')::int, (\"condition\" = 'Critical')::int, "
+    '"score", "score", "score", "condition", "observedAt" '
+    'FROM "FieldObservation" '
+    'WHERE "observedAt" >= $1::timestamp AND "observedAt" < $2::timestamp '
+    'AND ($4::int IS NULL OR "fieldId" = $4)) '
+    'SELECT f.id AS "fieldId", f.name, date_trunc($3::text, s.at) AS bucket, '
+    'SUM(s."observations")::int AS observations, SUM(s."healthy")::int AS healthy, '
+    'SUM(s."needsAttention")::int AS "needsAttention", SUM(s."critical")::int AS critical, '
+    'SUM(s."scoreSum") / SUM(s."observations") AS "meanScore", '
+    'MIN(s."scoreMin") AS "minScore", MAX(s."scoreMax") AS "maxScore", '
+    '(array_agg(s."lastCondition" ORDER BY s."lastObservedAt" DESC))[1]::text AS condition '
+    'FROM "Field" f LEFT JOIN series s ON s."fieldId" = f.id '
+    "WHERE ($4::int IS NULL OR f.id = $4) "
+    "GROUP BY f.id, f.name, bucket ORDER BY f.id, bucket"
+)
+
+
+async def condition_series(
+    start: datetime, end: datetime, bucket: str, field_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Returns condition counts and health scores per field and ``bucket`` between ``start`` and
+    ``end``, for one field or all of them, in one query. Ranges older than ROLLUP_AFTER are read
+    from the daily rollups and so resolve to whole days.
+
+    Raises:
+        ValueError: If ``bucket`` is not one of BUCKETS or the range is empty.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError("bucket must be one of {}".format(", ".join(BUCKETS)))
+    start = project.stockLedger.as_utc(start)
+    end = project.stockLedger.as_utc(end)
+    if end <= start:
+        raise ValueError("end must be after start")
+    return await prisma.get_client().query_raw(
+        _SERIES_QUERY, _naive_utc(start), _naive_utc(end), bucket, field_id
+    )
+
+
+async def roll_up_observations(transaction: prisma.Prisma) -> None:
+    """
+    Rolls up observations older than ROLLUP_AFTER inside the maintenance job's transaction.
+    """
+    moved = await roll_up(client=transaction)
+    if moved:
+        logger.info("Rolled up %d field observations", moved)
+
+
+observation_rollup = project.maintenance.PeriodicJob(
+    "field-observation-rollup", roll_up_observations, interval=86400.0
+)
@@ -0,0 +1,364 @@
+import enum
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import prisma
+import prisma.enums
+import prisma.fields
+import prisma.models
+from fastapi import HTTPException
+
+MAX_GRID_CELLS = 250_000
+MAX_CACHED_GRIDS = 64
+MAX_WRITE_ATTEMPTS = 3
+
+T = TypeVar("T")
+
+
+class TreeStatus(enum.IntEnum):
+    """
+    State of one grid position, stored as one byte.
+    """
+
+    Empty = 0
+    Healthy = 1
+    Sick = 2
+    Dead = 3
+    Harvested = 4
+
+
+def _table(values: Iterable[int], hit: int = 1) -> bytes:
+    """
+    Builds a ``bytes.translate`` table turning each byte into ``hit`` if it is one of ``values``
+    and into zero otherwise.
+    """
+    selected = set(values)
+    return bytes(hit if value in selected else 0 for value in range(256))
+
+
+class TreeGrid:
+    """
+    Trees of one field as a rows x columns grid with four bytes per position: status, species,
+    height class and tag.
+
+    Each attribute is its own byte plane, stored row-major, so a query is a few C-level passes over
+    whole planes: ``bytes.translate`` turns a plane into a 0/1 mask of matching positions, masks
+    are combined with a single big-integer AND, and the popcount of the result is the answer. An
+    80k-tree field is 320 KB and is stored as one row rather than one row per tree.
+
+    Species are stored as an index into ``species``, the list of sapling inventory item IDs used
+    in the field; index 0 means no species. Height classes are whole feet. Tags are free for the
+    caller, e.g. to reserve trees for an order; 0 means untagged.
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        columns: int,
+        species: List[int],
+        planes: List[bytearray],
+        version: int = 0,
+    ):
+        self.rows = rows
+        self.columns = columns
+        self.species = species
+        self.status, self.species_index, self.height, self.tag = planes
+        self.version = version
+
+    @classmethod
+    def empty(cls, rows: int, columns: int) -> "TreeGrid":
+        size = rows * columns
+        return cls(rows, columns, [0], [bytearray(size) for _ in range(4)])
+
+    @classmethod
+    def from_record(cls, record: prisma.models.FieldGrid) -> "TreeGrid":
+        cells = record.cells.decode()
+        size = record.rows * record.columns
+        planes = [bytearray(cells[i * size : (i + 1) * size]) for i in range(4)]
+        return cls(
+            record.rows, record.columns, list(record.species), planes, record.version
+        )
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.status + self.species_index + self.height + self.tag)
+
+    def copy(self) -> "TreeGrid":
+        return TreeGrid(
+            self.rows,
+            self.columns,
+            list(self.species),
+            [bytearray(plane) for plane in self.planes()],
+            self.version,
+        )
+
+    def planes(self) -> Tuple[bytearray, bytearray, bytearray, bytearray]:
+        return self.status, self.species_index, self.height, self.tag
+
+    def species_slot(self, inventory_item_id: int, add: bool = False) -> Optional[int]:
+        """
+        Returns the byte under which a sapling item is stored, adding it to the field's species
+        list if ``add`` is set.
+        """
+        if inventory_item_id in self.species[1:]:
+            return self.species.index(inventory_item_id, 1)
+        if not add:
+            return None
+        if len(self.species) >= 256:
+            raise ValueError("A field can hold at most 255 species")
+        self.species.append(inventory_item_id)
+        return len(self.species) - 1
+
+    def mask(
+        self,
+        statuses: Optional[Iterable[TreeStatus]] = None,
+        species_id: Optional[int] = None,
+        min_height: Optional[int] = None,
+        max_height: Optional[int] = None,
+        tags: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Returns the positions matching every given condition as an integer with one set bit in the
+        low bit of each position's byte.
+        """
+        size = self.rows * self.columns
+        mask = int.from_bytes(b"\x01" * size, "little")
+        if statuses is not None:
+            mask &= self._plane_mask(self.status, statuses)
+        if species_id is not None:
+            slot = self.species_slot(species_id)
+            if slot is None:
+                return 0
+            mask &= self._plane_mask(self.species_index, [slot])
+        if min_height is not None or max_height is not None:
+            low = max(min_height or 0, 0)
+            high = min(255 if max_height is None else max_height, 255)
+            mask &= self._plane_mask(self.height, range(low, high + 1))
+        if tags is not None:
+            mask &= self._plane_mask(self.tag, tags)
+        return mask
+
+    @staticmethod
+    def _plane_mask(plane: bytearray, values: Iterable[int]) -> int:
+        return int.from_bytes(plane.translate(_table(values)), "little")
+
+    def count(self, **conditions) -> int:
+        return self.mask(**conditions).bit_count()
+
+    def histogram(self, plane: bytearray) -> Dict[int, int]:
+        """
+        Counts positions per byte value of a plane, skipping empty positions.
+        """
+        occupied = self._plane_mask(self.status, range(1, 256))
+        counts: Dict[int, int] = {}
+        for value in set(plane):
+            matching = self._plane_mask(plane, [value]) & occupied
+            if matching:
+                counts[value] = matching.bit_count()
+        return counts
+
+    def positions(self, mask: int, limit: Optional[int] = None) -> List[int]:
+        """
+        Returns the row-major indexes set in ``mask``, in order, up to ``limit``.
+        """
+        size = self.rows * self.columns
+        flags = mask.to_bytes(size, "little")
+        found = []
+        index = flags.find(1)
+        while index != -1 and (limit is None or len(found) < limit):
+            found.append(index)
+            index = flags.find(1, index + 1)
+        return found
+
+    def clusters(self, mask: int, min_size: int = 1) -> List[List[int]]:
+        """
+        Groups the positions set in ``mask`` into clusters of touching positions, including
+        diagonal neighbours, largest first.
+        """
+        remaining = set(self.positions(mask))
+        columns = self.columns
+        found = []
+        while remaining:
+            start = remaining.pop()
+            cluster = [start]
+            frontier = [start]
+            while frontier:
+                index = frontier.pop()
+                row, column = divmod(index, columns)
+                for d_row in (-1, 0, 1):
+                    for d_column in (-1, 0, 1):
+                        r, c = row + d_row, column + d_column
+                        if 0 <= r < self.rows and 0 <= c < columns:
+                            neighbour = r * columns + c
+                            if neighbour in remaining:
+                                remaining.discard(neighbour)
+                                cluster.append(neighbour)
+                                frontier.append(neighbour)
+            if len(cluster) >= min_size:
+                found.append(cluster)
+        found.sort(key=len, reverse=True)
+        return found
+
+    def update_region(
+        self,
+        first_row: int,
+        last_row: int,
+        first_column: int,
+        last_column: int,
+        values: Dict[str, int],
+        only_statuses: Optional[Iterable[TreeStatus]] = None,
+    ) -> int:
+        """
+        Sets plane values for every position in the inclusive rectangle, or only for positions
+        whose status is in ``only_statuses``. ``values`` maps "status", "species_index", "height"
+        or "tag" to a byte value.
+
+        Returns:
+            int: Number of positions updated.
+        """
+        if not (
+            0 <= first_row <= last_row < self.rows
+            and 0 <= first_column <= last_column < self.columns
+        ):
+            raise ValueError("Region lies outside the field grid")
+        width = last_column - first_column + 1
+        only = _table(only_statuses, hit=0xFF) if only_statuses is not None else None
+        updated = 0
+        for row in range(first_row, last_row + 1):
+            start = row * self.columns + first_column
+            end = start + width
+            if only is None:
+                for name, value in values.items():
+                    getattr(self, name)[start:end] = bytes([value]) * width
+                updated += width
+                continue
+            keep = int.from_bytes(self.status[start:end].translate(only), "little")
+            if not keep:
+                continue
+            updated += (keep & int.from_bytes(b"\x01" * width, "little")).bit_count()
+            for name, value in values.items():
+                plane = getattr(self, name)
+                old = int.from_bytes(plane[start:end], "little")
+                fill = int.from_bytes(bytes([value]) * width, "little")
+                plane[start:end] = ((old & ~keep) | (fill & keep)).to_bytes(
+                    width, "little"
+                )
+        return updated
+
+
+def check_dimensions(rows: int, columns: int) -> None:
+    """
+    Raises:
+        ValueError: If the dimensions are not positive or exceed MAX_GRID_CELLS positions.
+    """
+    if rows <= 0 or columns <= 0:
+        raise ValueError("rows and columns must be positive")
+    if rows * columns > MAX_GRID_CELLS:
+        raise ValueError(
+            "A field grid can hold at most {} positions".format(MAX_GRID_CELLS)
+        )
+
+
+async def check_sapling(inventory_item_id: int) -> None:
+    """
+    Raises:
+        ValueError: If the inventory item does not exist or is not a sapling.
+    """
+    item = await prisma.models.InventoryItem.prisma().find_first(
+        where={"id": inventory_item_id, "deletedAt": None}
+    )
+    if item is None or item.type != prisma.enums.InventoryType.Sapling:
+        raise ValueError("Inventory item {} is not a sapling".format(inventory_item_id))
+
+
+class GridStore:
+    """
+    Loads field grids from the FieldGrid table and keeps the most recently used ones in memory.
+
+    Reads check the stored version with a one-column query and reuse the cached grid if it is
+    current, so the blob is only fetched after another request or worker changed it. Writes modify
+    a copy and store it only if the version is unchanged, retrying on a concurrent write.
+    """
+
+    def __init__(self, max_grids: int = MAX_CACHED_GRIDS):
+        self.max_grids = max_grids
+        self._grids: "OrderedDict[int, TreeGrid]" = OrderedDict()
+
+    def _cache(self, field_id: int, grid: TreeGrid) -> None:
+        self._grids[field_id] = grid
+        self._grids.move_to_end(field_id)
+        while len(self._grids) > self.max_grids:
+            self._grids.popitem(last=False)
+
+    async def get(self, field_id: int) -> TreeGrid:
+        """
+        Raises:
+            ValueError: If the field has no grid.
+        """
+        rows = await prisma.get_client().query_raw(
+            'SELECT "version" FROM "FieldGrid" WHERE "fieldId" = $1::int', field_id
+        )
+        if not rows:
+            self._grids.pop(field_id, None)
+            raise ValueError("Field {} has no tree grid".format(field_id))
+        cached = self._grids.get(field_id)
+        if cached is not None and cached.version == rows[0]["version"]:
+            self._grids.move_to_end(field_id)
+            return cached
+        record = await prisma.models.FieldGrid.prisma().find_unique(
+            where={"fieldId": field_id}
+        )
+        if record is None:
+            raise ValueError("Field {} has no tree grid".format(field_id))
+        grid = TreeGrid.from_record(record)
+        self._cache(field_id, grid)
+        return grid
+
+    async def create(self, field_id: int, grid: TreeGrid) -> TreeGrid:
+        check_dimensions(grid.rows, grid.columns)
+        await prisma.models.FieldGrid.prisma().create(
+            data={
+                "fieldId": field_id,
+                "rows": grid.rows,
+                "columns": grid.columns,
+                "species": grid.species,
+                "cells": prisma.fields.Base64.encode(grid.to_bytes()),
+            }
+        )
+        self._cache(field_id, grid)
+        return grid
+
+    async def modify(
+        self, field_id: int, change: Callable[[TreeGrid], T]
+    ) -> Tuple[T, int]:
+        """
+        Applies ``change`` to the field's grid and stores the result. Returns what ``change``
+        returned and the new grid version.
+
+        Raises:
+            HTTPException: 409 if concurrent writes kept winning for MAX_WRITE_ATTEMPTS attempts.
+        """
+        for _ in range(MAX_WRITE_ATTEMPTS):
+            current = await self.get(field_id)
+            grid = current.copy()
+            result = change(grid)
+            stored = await prisma.models.FieldGrid.prisma().update_many(
+                where={"fieldId": field_id, "version": current.version},
+                data={
+                    "species": grid.species,
+                    "cells": prisma.fields.Base64.encode(grid.to_bytes()),
+                    "version": {"increment": 1},
+                },
+            )
+            if stored:
+                grid.version = current.version + 1
+                self._cache(field_id, grid)
+                return result, grid.version
+        raise HTTPException(
+            status_code=409,
+            detail="Tree grid of field {} is being changed concurrently".format(
+                field_id
+            ),
+        )
+
+
+grid_store = GridStore()
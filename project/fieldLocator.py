@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import math
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import prisma
+import prisma.models
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6_371_008.8
+SQUARE_METRES_PER_ACRE = 4046.8564224
+MIN_CELL_SIZE_M = 10.0
+
+
+class FieldShape:
+    """
+    Boundary of one field in local metres, with its bounding box.
+    """
+
+    __slots__ = ("field_id", "name", "xs", "ys", "min_x", "min_y", "max_x", "max_y")
+
+    def __init__(self, field_id: int, name: str, xs: List[float], ys: List[float]):
+        self.field_id = field_id
+        self.name = name
+        self.xs = xs
+        self.ys = ys
+        self.min_x, self.max_x = min(xs), max(xs)
+        self.min_y, self.max_y = min(ys), max(ys)
+
+    def contains(self, x: float, y: float) -> bool:
+        if not (self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y):
+            return False
+        inside = False
+        xs, ys = self.xs, self.ys
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            if (ys[i] > y) != (ys[j] > y) and x < (xs[j] - xs[i]) * (y - ys[i]) / (
+                ys[j] - ys[i]
+            ) + xs[i]:
+                inside = not inside
+            j = i
+        return inside
+
+    def box_distance(self, x: float, y: float) -> float:
+        dx = max(self.min_x - x, 0.0, x - self.max_x)
+        dy = max(self.min_y - y, 0.0, y - self.max_y)
+        return math.hypot(dx, dy)
+
+    def distance(self, x: float, y: float) -> float:
+        """
+        Distance in metres from a point to the field, zero inside it.
+        """
+        if self.contains(x, y):
+            return 0.0
+        best = math.inf
+        xs, ys = self.xs, self.ys
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            ax, ay, bx, by = xs[j], ys[j], xs[i], ys[i]
+            dx, dy = bx - ax, by - ay
+            length = dx * dx + dy * dy
+            t = 0.0 if not length else ((x - ax) * dx + (y - ay) * dy) / length
+            t = min(1.0, max(0.0, t))
+            best = min(best, math.hypot(x - ax - t * dx, y - ay - t * dy))
+            j = i
+        return best
+
+
+class GeoPoint(BaseModel):
+    """
+    A WGS84 position in decimal degrees.
+    """
+
+    lat: float
+    lon: float
+
+
+def polygon_area_acres(lats: Sequence[float], lons: Sequence[float]) -> float:
+    """
+    Area of a boundary given in degrees, in acres.
+    """
+    ref_lat = sum(lats) / len(lats)
+    scale = math.cos(math.radians(ref_lat))
+    xs = [math.radians(lon) * EARTH_RADIUS_M * scale for lon in lons]
+    ys = [math.radians(lat) * EARTH_RADIUS_M for lat in lats]
+    twice = sum(xs[i - 1] * ys[i] - xs[i] * ys[i - 1] for i in range(len(xs)))
+    return abs(twice) / 2 / SQUARE_METRES_PER_ACRE
+
+
+def validate_boundary(lats: Sequence[float], lons: Sequence[float]) -> None:
+    """
+    Raises:
+        ValueError: If the boundary has fewer than three points or a coordinate is out of range.
+    """
+    if len(lats) != len(lons) or len(lats) < 3:
+        raise ValueError("A boundary needs at least three points")
+    if any(not -90 <= lat <= 90 for lat in lats) or any(
+        not -180 <= lon <= 180 for lon in lons
+    ):
+        raise ValueError("Boundary coordinates are out of range")
+
+
+class FieldLocator:
+    """
+    Per-worker spatial index of field boundaries for GPS lookups from crew tablets.
+
+    Boundaries are projected to metres on a plane tangent at the farm's mean latitude, which is
+    accurate to well under a metre at farm scale, and bucketed into a uniform grid of cells sized to
+    the typical field. A point lookup tests only the fields whose bounding box overlaps the point's
+    cell; nearest and within-radius lookups widen the search ring by ring and stop as soon as no
+    unvisited cell can hold a closer field. The index is rebuilt after layout changes on this worker
+    and every ``interval`` seconds to pick up changes made by others.
+    """
+
+    def __init__(self):
+        self.shapes: List[FieldShape] = []
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.cell_size = MIN_CELL_SIZE_M
+        self.ref_lat = 0.0
+        self.ref_lon = 0.0
+        self.scale = 1.0
+        self.bounds = (0, 0, 0, 0)
+        self.loaded = False
+        self._task: Optional[asyncio.Task] = None
+
+    def project(self, lat: float, lon: float) -> Tuple[float, float]:
+        return (
+            math.radians(lon - self.ref_lon) * EARTH_RADIUS_M * self.scale,
+            math.radians(lat - self.ref_lat) * EARTH_RADIUS_M,
+        )
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def build(self, fields: List[prisma.models.Field]) -> None:
+        fields = [field for field in fields if len(field.boundaryLats) >= 3]
+        if fields:
+            lats = [lat for field in fields for lat in field.boundaryLats]
+            lons = [lon for field in fields for lon in field.boundaryLons]
+            self.ref_lat, self.ref_lon = sum(lats) / len(lats), sum(lons) / len(lons)
+            self.scale = math.cos(math.radians(self.ref_lat))
+        shapes = []
+        for field in fields:
+            points = [
+                self.project(lat, lon)
+                for lat, lon in zip(field.boundaryLats, field.boundaryLons)
+            ]
+            shapes.append(
+                FieldShape(
+                    field.id,
+                    field.name,
+                    [x for x, _ in points],
+                    [y for _, y in points],
+                )
+            )
+        if shapes:
+            box_area = sum(
+                (shape.max_x - shape.min_x) * (shape.max_y - shape.min_y)
+                for shape in shapes
+            )
+            self.cell_size = max(math.sqrt(box_area / len(shapes)), MIN_CELL_SIZE_M)
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for position, shape in enumerate(shapes):
+            first_x, first_y = self._cell(shape.min_x, shape.min_y)
+            last_x, last_y = self._cell(shape.max_x, shape.max_y)
+            for cell_x in range(first_x, last_x + 1):
+                for cell_y in range(first_y, last_y + 1):
+                    cells.setdefault((cell_x, cell_y), []).append(position)
+        self.bounds = (
+            min((x for x, _ in cells), default=0),
+            min((y for _, y in cells), default=0),
+            max((x for x, _ in cells), default=0),
+            max((y for _, y in cells), default=0),
+        )
+        self.shapes, self.cells = shapes, cells
+        self.loaded = True
+
+    def at(self, lat: float, lon: float) -> List[FieldShape]:
+        """
+        Returns the fields containing a point; usually one, more where boundaries overlap.
+        """
+        x, y = self.project(lat, lon)
+        return [
+            self.shapes[position]
+            for position in self.cells.get(self._cell(x, y), ())
+            if self.shapes[position].contains(x, y)
+        ]
+
+    def _ring(self, center: Tuple[int, int], ring: int) -> List[Tuple[int, int]]:
+        cx, cy = center
+        if ring == 0:
+            return [center]
+        cells = [(cx + d, cy - ring) for d in range(-ring, ring + 1)]
+        cells += [(cx + d, cy + ring) for d in range(-ring, ring + 1)]
+        cells += [(cx - ring, cy + d) for d in range(-ring + 1, ring)]
+        cells += [(cx + ring, cy + d) for d in range(-ring + 1, ring)]
+        return cells
+
+    def nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius: Optional[float] = None,
+        limit: int = 10,
+    ) -> List[Tuple[float, FieldShape]]:
+        """
+        Returns up to ``limit`` fields nearest to a point, closest first, with their distance in
+        metres, optionally only those within ``radius`` metres.
+        """
+        if not self.shapes:
+            return []
+        x, y = self.project(lat, lon)
+        center = self._cell(x, y)
+        min_x, min_y, max_x, max_y = self.bounds
+        last_ring = max(
+            abs(center[0] - min_x),
+            abs(center[0] - max_x),
+            abs(center[1] - min_y),
+            abs(center[1] - max_y),
+        )
+        if radius is not None:
+            last_ring = min(last_ring, math.ceil(radius / self.cell_size))
+        if (2 * last_ring + 1) ** 2 > 4 * len(self.cells):
+            # Far from the farm, walking empty rings costs more than checking every field.
+            found = [(shape.distance(x, y), shape) for shape in self.shapes]
+            found = [match for match in found if radius is None or match[0] <= radius]
+            found.sort(key=lambda match: match[0])
+            return found[:limit]
+        seen: Set[int] = set()
+        found = []
+        for ring in range(last_ring + 1):
+            for cell in self._ring(center, ring):
+                for position in self.cells.get(cell, ()):
+                    if position in seen:
+                        continue
+                    seen.add(position)
+                    shape = self.shapes[position]
+                    if radius is not None and shape.box_distance(x, y) > radius:
+                        continue
+                    distance = shape.distance(x, y)
+                    if radius is None or distance <= radius:
+                        found.append((distance, shape))
+            found.sort(key=lambda match: match[0])
+            del found[limit:]
+            # Every cell beyond this ring is at least ``ring`` cells away from the point.
+            if len(found) == limit and found[-1][0] <= ring * self.cell_size:
+                break
+        return found
+
+    async def load(self) -> None:
+        fields = await prisma.models.Field.prisma().find_many(order={"id": "asc"})
+        self.build(fields)
+
+    def start(self, interval: float = 60.0) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Failed to refresh field locator")
+
+
+field_locator = FieldLocator()
@@ -0,0 +1,48 @@
+from typing import Optional
+
+import project.fieldLocator
+import project.locateField_service
+
+MAX_LIMIT = 100
+
+
+async def findNearbyFields(
+    lat: float, lon: float, radiusM: Optional[float] = None, limit: int = 10
+) -> project.locateField_service.LocateFieldResponse:
+    """
+    Finds the fields nearest to a GPS position, closest first, e.g. "which fields are within 500 m
+    of the shed". Distances are measured to the field boundary and are zero for a field containing
+    the point. Answered from the worker's in-memory field locator.
+
+    Args:
+        lat (float): Latitude in decimal degrees.
+        lon (float): Longitude in decimal degrees.
+        radiusM (Optional[float]): Only return fields within this many metres.
+        limit (int): Maximum number of fields to return, at most MAX_LIMIT.
+
+    Returns:
+        LocateFieldResponse: The fields found, closest first, with their distance in metres.
+
+    Raises:
+        ValueError: If ``radiusM`` is negative or ``limit`` is not between 1 and MAX_LIMIT.
+
+    Example:
+        response = await findNearbyFields(35.5, -82.5, radiusM=500)
+        print(response)
+        > LocateFieldResponse(fields=[LocatedField(fieldId=12, name='Block A', distanceM=0.0), LocatedField(fieldId=14, name='Block C', distanceM=212.4)])
+    """
+    if radiusM is not None and radiusM < 0:
+        raise ValueError("radiusM must not be negative")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError("limit must be between 1 and {}".format(MAX_LIMIT))
+    locator = project.fieldLocator.field_locator
+    if not locator.loaded:
+        await locator.load()
+    return project.locateField_service.LocateFieldResponse(
+        fields=[
+            project.locateField_service.LocatedField(
+                fieldId=shape.field_id, name=shape.name, distanceM=round(distance, 1)
+            )
+            for distance, shape in locator.nearby(lat, lon, radiusM, limit)
+        ]
+    )
@@ -0,0 +1,76 @@
+from typing import List
+
+from pydantic import BaseModel
+
+import project.fieldGrid
+
+
+class SickCluster(BaseModel):
+    """
+    A group of touching sick trees, with its bounding rows and columns and its centre.
+    """
+
+    size: int
+    firstRow: int
+    lastRow: int
+    firstColumn: int
+    lastColumn: int
+    centerRow: float
+    centerColumn: float
+
+
+class SickClustersResponse(BaseModel):
+    """
+    Clusters of sick trees in a field, largest first.
+    """
+
+    fieldId: int
+    sickTrees: int
+    clusters: List[SickCluster]
+
+
+async def findSickClusters(
+    fieldId: int, minSize: int = 3, limit: int = 50
+) -> SickClustersResponse:
+    """
+    Finds clusters of sick trees in a field's grid, where disease is likely spreading and crews
+    should treat or clear the area. Trees touching, including diagonally, belong to one cluster.
+
+    Args:
+        fieldId (int): The field to search.
+        minSize (int): Smallest number of sick trees reported as a cluster.
+        limit (int): Maximum number of clusters to return.
+
+    Returns:
+        SickClustersResponse: Clusters of sick trees in a field, largest first.
+
+    Raises:
+        ValueError: If the field has no tree grid or ``minSize`` or ``limit`` is not positive.
+
+    Example:
+        response = await findSickClusters(2, minSize=5)
+        print(response.clusters[0])
+        > SickCluster(size=121, firstRow=10, lastRow=20, firstColumn=10, lastColumn=20, centerRow=15.0, centerColumn=15.0)
+    """
+    if minSize <= 0 or limit <= 0:
+        raise ValueError("minSize and limit must be positive")
+    grid = await project.fieldGrid.grid_store.get(fieldId)
+    sick = grid.mask(statuses=[project.fieldGrid.TreeStatus.Sick])
+    clusters = []
+    for cluster in grid.clusters(sick, minSize)[:limit]:
+        rows = [index // grid.columns for index in cluster]
+        columns = [index % grid.columns for index in cluster]
+        clusters.append(
+            SickCluster(
+                size=len(cluster),
+                firstRow=min(rows),
+                lastRow=max(rows),
+                firstColumn=min(columns),
+                lastColumn=max(columns),
+                centerRow=round(sum(rows) / len(rows), 1),
+                centerColumn=round(sum(columns) / len(columns), 1),
+            )
+        )
+    return SickClustersResponse(
+        fieldId=fieldId, sickTrees=sick.bit_count(), clusters=clusters
+    )
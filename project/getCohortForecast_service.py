@@ -0,0 +1,86 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+import project.saplingCohorts
+
+MAX_SEASONS = 30
+
+
+class SeasonTrees(BaseModel):
+    """
+    Trees first reaching the target height in one season, and all trees at that height by then.
+    """
+
+    season: int
+    reaching: int
+    cumulative: int
+
+
+class CohortForecastResponse(BaseModel):
+    """
+    Trees reaching the target height season by season, for harvest planning.
+    """
+
+    heightFt: float
+    alreadyAtHeight: int
+    seasons: List[SeasonTrees]
+
+
+async def getCohortForecast(
+    heightFt: float = 6.0,
+    fromSeason: Optional[int] = None,
+    toSeason: Optional[int] = None,
+    fieldId: Optional[int] = None,
+    inventoryItemId: Optional[int] = None,
+) -> CohortForecastResponse:
+    """
+    Forecasts how many trees reach a target height in each season, to plan harvests years ahead.
+    Every sapling cohort is aged along its species' growth curve; the answer is computed from the
+    worker's in-memory cohort table without querying the database.
+
+    Args:
+        heightFt (float): Target height in feet, e.g. 6 for the common retail size.
+        fromSeason (Optional[int]): First season to report; defaults to the current year.
+        toSeason (Optional[int]): Last season to report; defaults to ten seasons after ``fromSeason``.
+        fieldId (Optional[int]): Only count trees in this field.
+        inventoryItemId (Optional[int]): Only count trees of this sapling item.
+
+    Returns:
+        CohortForecastResponse: Trees reaching the target height season by season, for harvest planning.
+
+    Raises:
+        ValueError: If the height is not positive or the season range is empty or longer than MAX_SEASONS.
+
+    Example:
+        response = await getCohortForecast(heightFt=6, fromSeason=2030, toSeason=2032, fieldId=2)
+        print(response)
+        > CohortForecastResponse(heightFt=6.0, alreadyAtHeight=0, seasons=[SeasonTrees(season=2030, reaching=1200, cumulative=1200), SeasonTrees(season=2031, reaching=0, cumulative=1200), SeasonTrees(season=2032, reaching=2500, cumulative=3700)])
+    """
+    if heightFt <= 0:
+        raise ValueError("heightFt must be positive")
+    fromSeason = fromSeason or date.today().year
+    toSeason = toSeason or fromSeason + 10
+    if not 0 <= toSeason - fromSeason < MAX_SEASONS:
+        raise ValueError(
+            "The season range must cover 1 to {} seasons".format(MAX_SEASONS)
+        )
+    table = project.saplingCohorts.cohort_table
+    if not table.loaded:
+        await table.load()
+    earlier, by_season = table.reaching(
+        heightFt, fromSeason, toSeason, fieldId, inventoryItemId
+    )
+    seasons = []
+    cumulative = earlier
+    for offset, reaching in enumerate(by_season):
+        cumulative += reaching
+        seasons.append(
+            SeasonTrees(
+                season=fromSeason + offset, reaching=reaching, cumulative=cumulative
+            )
+        )
+    return CohortForecastResponse(
+        heightFt=heightFt, alreadyAtHeight=earlier, seasons=seasons
+    )
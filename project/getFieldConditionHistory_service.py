@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import prisma.enums
+from pydantic import BaseModel
+
+import project.fieldConditions
+import project.stockLedger
+
+DEFAULT_HISTORY = timedelta(days=365)
+
+
+class ConditionPoint(BaseModel):
+    """
+    A field's observations within one bucket: how many of each condition, the health score from 0
+    to 1, and the condition last observed.
+    """
+
+    bucket: datetime
+    observations: int
+    healthy: int
+    needsAttention: int
+    critical: int
+    meanScore: float
+    minScore: float
+    maxScore: float
+    condition: prisma.enums.FieldCondition
+
+
+class FieldConditionHistoryResponse(BaseModel):
+    """
+    A field's condition history between two times, one point per bucket with observations.
+    """
+
+    fieldId: int
+    name: str
+    start: datetime
+    end: datetime
+    bucket: str
+    points: List[ConditionPoint]
+
+
+def to_points(rows: List[Dict[str, Any]]) -> List[ConditionPoint]:
+    return [
+        ConditionPoint(
+            bucket=row["bucket"],
+            observations=row["observations"],
+            healthy=row["healthy"],
+            needsAttention=row["needsAttention"],
+            critical=row["critical"],
+            meanScore=row["meanScore"],
+            minScore=row["minScore"],
+            maxScore=row["maxScore"],
+            condition=row["condition"],
+        )
+        for row in rows
+        if row["bucket"] is not None
+    ]
+
+
+async def getFieldConditionHistory(
+    fieldId: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: str = "day",
+) -> FieldConditionHistoryResponse:
+    """
+    Returns a field's condition history. Data older than 90 days comes from the daily rollups, so
+    long ranges read one row per day at most.
+
+    Args:
+        fieldId (int): The field whose history to return.
+        start (Optional[datetime]): Start of the range; defaults to a year before ``end``.
+        end (Optional[datetime]): End of the range, exclusive; defaults to now.
+        bucket (str): Size of each point: day, week, month or year.
+
+    Returns:
+        FieldConditionHistoryResponse: A field's condition history between two times, one point per bucket with observations.
+
+    Raises:
+        ValueError: If the field does not exist, the bucket is unknown or the range is empty.
+
+    Example:
+        response = await getFieldConditionHistory(3, bucket="week")
+        print(response.points[-1])
+        > ConditionPoint(bucket=datetime(2024, 4, 29), observations=4, healthy=3, needsAttention=1, critical=0, meanScore=0.875, minScore=0.5, maxScore=1.0, condition='Healthy')
+    """
+    end = project.stockLedger.as_utc(end or datetime.now(timezone.utc))
+    start = project.stockLedger.as_utc(start or end - DEFAULT_HISTORY)
+    rows = await project.fieldConditions.condition_series(start, end, bucket, fieldId)
+    if not rows:
+        raise ValueError("No field found with ID {}".format(fieldId))
+    return FieldConditionHistoryResponse(
+        fieldId=fieldId,
+        name=rows[0]["name"],
+        start=start,
+        end=end,
+        bucket=bucket,
+        points=to_points(rows),
+    )
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+import project.fieldConditions
+import project.getFieldConditionHistory_service
+import project.stockLedger
+
+DEFAULT_TREND = timedelta(days=3 * 365)
+
+
+class FieldConditionTrend(BaseModel):
+    """
+    One field's condition history, one point per bucket with observations.
+    """
+
+    fieldId: int
+    name: str
+    points: List[project.getFieldConditionHistory_service.ConditionPoint]
+
+
+class FieldConditionTrendsResponse(BaseModel):
+    """
+    Condition history of every field between two times, for multi-year health trend charts.
+    """
+
+    start: datetime
+    end: datetime
+    bucket: str
+    fields: List[FieldConditionTrend]
+
+
+async def getFieldConditionTrends(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: str = "month",
+) -> FieldConditionTrendsResponse:
+    """
+    Returns the condition history of every field in one query over the daily rollups and recent
+    observations. Fields without observations in the range are included with no points.
+
+    Args:
+        start (Optional[datetime]): Start of the range; defaults to three years before ``end``.
+        end (Optional[datetime]): End of the range, exclusive; defaults to now.
+        bucket (str): Size of each point: day, week, month or year.
+
+    Returns:
+        FieldConditionTrendsResponse: Condition history of every field between two times, for multi-year health trend charts.
+
+    Raises:
+        ValueError: If the bucket is unknown or the range is empty.
+
+    Example:
+        response = await getFieldConditionTrends(bucket="year")
+        print(response.fields[0].points[0])
+        > ConditionPoint(bucket=datetime(2022, 1, 1), observations=48, healthy=40, needsAttention=7, critical=1, meanScore=0.9, minScore=0.0, maxScore=1.0, condition='Healthy')
+    """
+    end = project.stockLedger.as_utc(end or datetime.now(timezone.utc))
+    start = project.stockLedger.as_utc(start or end - DEFAULT_TREND)
+    rows = await project.fieldConditions.condition_series(start, end, bucket)
+    fields = []
+    for field_id, field_rows in groupby(rows, key=lambda row: row["fieldId"]):
+        field_rows = list(field_rows)
+        fields.append(
+            FieldConditionTrend(
+                fieldId=field_id,
+                name=field_rows[0]["name"],
+                points=project.getFieldConditionHistory_service.to_points(field_rows),
+            )
+        )
+    return FieldConditionTrendsResponse(
+        start=start, end=end, bucket=bucket, fields=fields
+    )
@@ -0,0 +1,70 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+import project.fieldGrid
+
+
+class FieldGridSummary(BaseModel):
+    """
+    Tree counts of a field's grid by status, species and height class, and the number of trees ready for harvest.
+    """
+
+    fieldId: int
+    rows: int
+    columns: int
+    version: int
+    byStatus: Dict[str, int]
+    bySpecies: Dict[int, int]
+    byHeightClass: Dict[int, int]
+    harvestReady: int
+
+
+async def getFieldGrid(
+    fieldId: int, readyHeight: int = 6, inventoryItemId: Optional[int] = None
+) -> FieldGridSummary:
+    """
+    Summarises the tree grid of a field: how many trees are in each status, of each species
+    (keyed by sapling inventory item ID) and in each height class, and how many healthy, untagged
+    trees are at least ``readyHeight`` feet tall. Every count is a pass over one byte plane of the
+    grid rather than a query over one row per tree.
+
+    Args:
+        fieldId (int): The field whose grid to summarise.
+        readyHeight (int): Height class from which a tree counts as harvest ready.
+        inventoryItemId (Optional[int]): Only count harvest-ready trees of this sapling item.
+
+    Returns:
+        FieldGridSummary: Tree counts of a field's grid by status, species and height class, and the number of trees ready for harvest.
+
+    Raises:
+        ValueError: If the field has no tree grid.
+
+    Example:
+        response = await getFieldGrid(2, readyHeight=6)
+        print(response)
+        > FieldGridSummary(fieldId=2, rows=200, columns=400, version=14, byStatus={'Healthy': 79210, 'Sick': 640, 'Dead': 150}, bySpecies={4: 80000}, byHeightClass={5: 41000, 6: 39000}, harvestReady=38700)
+    """
+    grid = await project.fieldGrid.grid_store.get(fieldId)
+    return FieldGridSummary(
+        fieldId=fieldId,
+        rows=grid.rows,
+        columns=grid.columns,
+        version=grid.version,
+        byStatus={
+            project.fieldGrid.TreeStatus(value).name: count
+            for value, count in sorted(grid.histogram(grid.status).items())
+        },
+        bySpecies={
+            grid.species[slot]: count
+            for slot, count in sorted(grid.histogram(grid.species_index).items())
+            if slot
+        },
+        byHeightClass=dict(sorted(grid.histogram(grid.height).items())),
+        harvestReady=grid.count(
+            statuses=[project.fieldGrid.TreeStatus.Healthy],
+            species_id=inventoryItemId,
+            min_height=readyHeight,
+            tags=[0],
+        ),
+    )
@@ -34,8 +34,8 @@ async def getInventoryItemDetails(itemId: int) -> InventoryItemResponse:
         print(inventory_item_details)
         > InventoryItemResponse(id=1, name='Sapling', quantity=100, status=prisma.enums.InventoryStatus.InStock, type=prisma.enums.InventoryType.Sapling, lastUpdated=datetime.datetime(2023, 12, 5, 10, 15))
     """
-    inventory_item = await prisma.models.InventoryItem.prisma().find_unique(
-        where={"id": itemId}
+    inventory_item = await prisma.models.InventoryItem.prisma().find_first(
+        where={"id": itemId, "deletedAt": None}
     )
     if inventory_item is None:
         raise ValueError("No inventory item found with the given ID.")
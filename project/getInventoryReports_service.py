@@ -0,0 +1,231 @@
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import prisma
+import prisma.enums
+from pydantic import BaseModel
+
+import project.inventoryVersion
+
+FORECAST_HORIZON_DAYS = 30
+LEAD_TIME_DAYS = 14
+COVER_DAYS = 30
+CACHE_MAX_AGE = 3600.0
+
+# Blend of the 7, 30 and 90-day usage rates: recent usage counts most, the longer windows smooth
+# out single busy days.
+RATE_WEIGHTS = ((7, 0.5), (30, 0.3), (90, 0.2))
+
+# Units of each inventory type consumed by one scheduled planting.
+PLANTING_DEMAND: Dict[prisma.enums.InventoryType, int] = {
+    prisma.enums.InventoryType.Sapling: 100,
+    prisma.enums.InventoryType.Fertilizer: 5,
+}
+
+
+class InventoryForecast(BaseModel):
+    """
+    Usage, stockout projection and reorder recommendation for one inventory item.
+    """
+
+    inventoryItemId: int
+    name: str
+    type: prisma.enums.InventoryType
+    status: prisma.enums.InventoryStatus
+    quantity: int
+    reorderThreshold: int
+    dailyUsage: float
+    scheduledDemand: float
+    daysUntilStockout: Optional[float] = None
+    recommendedReorderQuantity: int
+    needsReorder: bool
+
+
+class InventoryReportResponse(BaseModel):
+    """
+    Reorder forecast for the inventory catalogue, most urgent items first.
+    """
+
+    generatedAt: datetime
+    inventoryVersion: int
+    horizonDays: int
+    items: List[InventoryForecast]
+
+
+class ForecastCache:
+    """
+    Holds the last catalogue forecast together with the inventory version token it was computed
+    from. Any stock movement advances the token, which invalidates the forecast; CACHE_MAX_AGE also
+    lets newly scheduled plantings show up without a movement.
+    """
+
+    def __init__(self):
+        self.version = -1
+        self.computed_at = 0.0
+        self.report: Optional[InventoryReportResponse] = None
+
+    def get(self, version: int) -> Optional[InventoryReportResponse]:
+        if (
+            self.report is None
+            or self.version != version
+            or time.monotonic() - self.computed_at > CACHE_MAX_AGE
+        ):
+            return None
+        return self.report
+
+    def put(self, version: int, report: InventoryReportResponse) -> None:
+        self.version = version
+        self.computed_at = time.monotonic()
+        self.report = report
+
+
+forecast_cache = ForecastCache()
+
+
+async def load_usage() -> List[dict]:
+    """
+    Reads every item with its outbound quantities over each rate window in one grouped pass over
+    the last 90 days of the stock ledger.
+    """
+    windows = ", ".join(
+        'COALESCE(SUM(-m."delta") FILTER (WHERE m."occurredAt" > NOW() - INTERVAL \'{0} days\'), 0)'
+        "::float8 AS used_{0}".format(days)
+        for days, _ in RATE_WEIGHTS
+    )
+    longest = max(days for days, _ in RATE_WEIGHTS)
+    return await prisma.get_client().query_raw(
+        'SELECT i.id, i."name", i."type", i."status", i."quantity", i."reorderThreshold", '
+        "{} "
+        'FROM "InventoryItem" i LEFT JOIN "StockMovement" m '
+        'ON m."inventoryItemId" = i.id '
+        "AND m.\"kind\" IN ('Sale', 'WriteOff') "
+        "AND m.\"occurredAt\" > NOW() - INTERVAL '{} days' "
+        'WHERE i."deletedAt" IS NULL '
+        "GROUP BY i.id".format(windows, longest)
+    )
+
+
+async def load_planting_count(horizon_days: int) -> int:
+    rows = await prisma.get_client().query_raw(
+        'SELECT COUNT(*)::int AS plantings FROM "Schedule" '
+        'WHERE "activityType" = \'Planting\' AND "completedAt" IS NULL '
+        'AND "date" >= NOW() AND "date" < NOW() + make_interval(days => $1::int)',
+        horizon_days,
+    )
+    return rows[0]["plantings"]
+
+
+def forecast_items(
+    rows: List[dict], plantings: int, horizon_days: int
+) -> List[InventoryForecast]:
+    """
+    Turns usage rows into forecasts. Scheduled planting demand for a type is shared between its
+    items in proportion to their recent usage, or evenly when none of them has been used yet.
+    """
+    rates = [
+        sum(
+            row["used_{}".format(days)] / days * weight for days, weight in RATE_WEIGHTS
+        )
+        for row in rows
+    ]
+    type_rate: Dict[str, float] = {}
+    type_count: Dict[str, int] = {}
+    for row, rate in zip(rows, rates):
+        type_rate[row["type"]] = type_rate.get(row["type"], 0.0) + rate
+        type_count[row["type"]] = type_count.get(row["type"], 0) + 1
+    forecasts = []
+    for row, rate in zip(rows, rates):
+        item_type = prisma.enums.InventoryType(row["type"])
+        planned = plantings * PLANTING_DEMAND.get(item_type, 0)
+        if type_rate[row["type"]] > 0:
+            share = rate / type_rate[row["type"]]
+        else:
+            share = 1.0 / type_count[row["type"]]
+        scheduled = planned * share
+        daily_demand = rate + scheduled / horizon_days
+        quantity = row["quantity"]
+        days_left = quantity / daily_demand if daily_demand > 0 else None
+        target = daily_demand * (LEAD_TIME_DAYS + COVER_DAYS) + row["reorderThreshold"]
+        forecasts.append(
+            InventoryForecast(
+                inventoryItemId=row["id"],
+                name=row["name"],
+                type=item_type,
+                status=row["status"],
+                quantity=quantity,
+                reorderThreshold=row["reorderThreshold"],
+                dailyUsage=round(rate, 3),
+                scheduledDemand=round(scheduled, 3),
+                daysUntilStockout=(
+                    round(days_left, 1) if days_left is not None else None
+                ),
+                recommendedReorderQuantity=max(0, math.ceil(target - quantity)),
+                needsReorder=quantity <= row["reorderThreshold"]
+                or (days_left is not None and days_left <= LEAD_TIME_DAYS),
+            )
+        )
+    forecasts.sort(
+        key=lambda forecast: (
+            not forecast.needsReorder,
+            (
+                forecast.daysUntilStockout
+                if forecast.daysUntilStockout is not None
+                else math.inf
+            ),
+            forecast.inventoryItemId,
+        )
+    )
+    return forecasts
+
+
+async def getInventoryReports(
+    type: Optional[prisma.enums.InventoryType] = None,
+    status: Optional[prisma.enums.InventoryStatus] = None,
+) -> InventoryReportResponse:
+    """
+    Generates detailed inventory reports which provide insights into stock levels, usage trends, and reordering necessities.
+    Daily usage is a weighted blend of the 7, 30 and 90-day outbound rates from the stock ledger; upcoming plantings add
+    their sapling and fertilizer demand. From these the report projects days until stockout and the quantity to reorder
+    to cover the supplier lead time plus COVER_DAYS on top of the reorder threshold.
+
+    The whole catalogue is forecast in one batch and cached until the next stock movement, so filtered requests and
+    repeated requests are served from memory.
+
+    Args:
+        type (Optional[prisma.enums.InventoryType]): Only report items of this type.
+        status (Optional[prisma.enums.InventoryStatus]): Only report items with this stock status.
+
+    Returns:
+        InventoryReportResponse: Reorder forecast for the inventory catalogue, most urgent items first.
+
+    Example:
+        response = await getInventoryReports(type=prisma.enums.InventoryType.Sapling)
+        print(response.items[0])
+        > InventoryForecast(inventoryItemId=4, name='Fraser Fir', type='Sapling', status='LowStock', quantity=180, reorderThreshold=200, dailyUsage=9.4, scheduledDemand=300.0, daysUntilStockout=9.0, recommendedReorderQuantity=1034, needsReorder=True)
+    """
+    version = await project.inventoryVersion.inventory_version()
+    report = forecast_cache.get(version)
+    if report is None:
+        rows = await load_usage()
+        plantings = await load_planting_count(FORECAST_HORIZON_DAYS)
+        report = InventoryReportResponse(
+            generatedAt=datetime.now(timezone.utc),
+            inventoryVersion=version,
+            horizonDays=FORECAST_HORIZON_DAYS,
+            items=forecast_items(rows, plantings, FORECAST_HORIZON_DAYS),
+        )
+        forecast_cache.put(version, report)
+    if type is None and status is None:
+        return report
+    return report.model_copy(
+        update={
+            "items": [
+                item
+                for item in report.items
+                if (type is None or item.type == type)
+                and (status is None or item.status == status)
+            ]
+        }
+    )
@@ -1,9 +1,12 @@
 from typing import List, Optional
 
 import prisma
+import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+import project.inventorySnapshot
+
 
 class InventoryItemDetails(BaseModel):
     """
@@ -28,7 +31,7 @@ async def getInventory(
     type: Optional[str] = None, status: Optional[str] = None
 ) -> InventoryListResponse:
     """
-    Retrieves the current stock levels of all inventory items including trees, fertilizers, and other related items. This function uses queries to filter data based on item type, status, and other parameters. Expected to respond with a list of items, their quantities, and statuses.
+    Retrieves the current stock levels of all inventory items including trees, fertilizers, and other related items. Filters on item type and status are answered from the worker's in-memory inventory snapshot rather than the database. Expected to respond with a list of items, their quantities, and statuses.
 
     Args:
         type (Optional[str]): Filter inventory items by type. This refers to whether the item is a tree, fertilizer, etc.
@@ -44,12 +47,17 @@ async def getInventory(
             InventoryItemDetails(name='Spruce', quantity=15, status='LowStock', type='Tree')
           ])
     """
-    filters = {}
-    if type:
-        filters["type"] = {"equals": type}
-    if status:
-        filters["status"] = {"equals": status}
-    items = await prisma.models.InventoryItem.prisma().find_many(where=filters)
+    snapshot = project.inventorySnapshot.inventory_snapshot
+    if not snapshot.loaded:
+        await snapshot.load()
+    if (type and type not in prisma.enums.InventoryType.__members__) or (
+        status and status not in prisma.enums.InventoryStatus.__members__
+    ):
+        return InventoryListResponse(item=[])
+    items = snapshot.find(
+        type=prisma.enums.InventoryType[type] if type else None,
+        status=prisma.enums.InventoryStatus[status] if status else None,
+    )
     details = [
         InventoryItemDetails(
             name=item.name, quantity=item.quantity, status=item.status, type=item.type
@@ -0,0 +1,203 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+
+class CrewRequirement(BaseModel):
+    """
+    Number of workers required for an activity at a field during one time slot.
+    """
+
+    slotStart: datetime
+    activityType: prisma.enums.ActivityType
+    fieldId: Optional[int] = None
+    requiredCrew: int
+
+
+class StaffCoverageRequest(BaseModel):
+    """
+    Date range, slot length and crew requirements to evaluate staff coverage against.
+    """
+
+    start: datetime
+    end: datetime
+    slotMinutes: int = 60
+    requirements: List[CrewRequirement]
+
+
+class CoverageSlot(BaseModel):
+    """
+    Coverage of a single activity/field/time-slot, with the number of staff still free in that slot.
+    """
+
+    slotStart: datetime
+    activityType: prisma.enums.ActivityType
+    fieldId: Optional[int] = None
+    requiredCrew: int
+    assignedCrew: int
+    gap: int
+    availableStaff: int
+
+
+class StaffCoverageResponse(BaseModel):
+    """
+    Under- and over-staffed slots for the requested range, plus staff booked twice in the same slot.
+    """
+
+    totalStaff: int
+    slotCount: int
+    understaffed: List[CoverageSlot]
+    overstaffed: List[CoverageSlot]
+    doubleBookedStaffIds: List[int]
+
+
+SlotKey = Tuple[int, prisma.enums.ActivityType, Optional[int]]
+
+
+class SlotGrid:
+    """
+    Splits a date range into fixed-length slots and tracks which staff are busy in each one.
+
+    Each staff member gets an int bitmap with one bit per slot, and ``busy_count`` keeps the
+    number of distinct busy staff per slot so free capacity is a subtraction, not a scan.
+    """
+
+    def __init__(self, start: datetime, end: datetime, slot_minutes: int):
+        if slot_minutes <= 0:
+            raise ValueError("slotMinutes must be positive")
+        self.start = as_utc(start)
+        self.end = as_utc(end)
+        if self.end <= self.start:
+            raise ValueError("end must be after start")
+        self.slot = timedelta(minutes=slot_minutes)
+        self.slot_count = -(-(self.end - self.start) // self.slot)
+        self.busy: Dict[int, int] = {}
+        self.busy_count = [0] * self.slot_count
+        self.double_booked: set[int] = set()
+
+    def index(self, when: datetime) -> Optional[int]:
+        """
+        Returns the slot index containing ``when``, or None when it falls outside the range.
+        """
+        when = as_utc(when)
+        if when < self.start or when >= self.end:
+            return None
+        return (when - self.start) // self.slot
+
+    def slot_start(self, index: int) -> datetime:
+        return self.start + index * self.slot
+
+    def is_busy(self, staff_id: int, index: int) -> bool:
+        return bool(self.busy.get(staff_id, 0) >> index & 1)
+
+    def mark_busy(self, staff_id: int, index: int) -> None:
+        """
+        Sets the slot bit for a staff member, recording a double booking if it was already set.
+        """
+        bitmap = self.busy.get(staff_id, 0)
+        bit = 1 << index
+        if bitmap & bit:
+            self.double_booked.add(staff_id)
+            return
+        self.busy[staff_id] = bitmap | bit
+        self.busy_count[index] += 1
+
+    def free_staff(self, total_staff: int, index: int) -> int:
+        return max(total_staff - self.busy_count[index], 0)
+
+
+def as_utc(value: datetime) -> datetime:
+    """
+    Treats naive datetimes as UTC so request values compare with database timestamps.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+async def load_schedule_grid(
+    start: datetime, end: datetime, slot_minutes: int
+) -> Tuple[SlotGrid, Counter]:
+    """
+    Loads every schedule in the range once and folds it into a SlotGrid and per-slot crew counts.
+
+    Args:
+        start (datetime): Start of the range, inclusive.
+        end (datetime): End of the range, exclusive.
+        slot_minutes (int): Length of each slot in minutes.
+
+    Returns:
+        Tuple[SlotGrid, Counter]: The busy bitmaps and a Counter of assigned crew keyed by
+        (slot index, activity type, field ID).
+    """
+    grid = SlotGrid(start, end, slot_minutes)
+    schedules = await prisma.models.Schedule.prisma().find_many(
+        where={"date": {"gte": grid.start, "lt": grid.end}}
+    )
+    assigned: Counter = Counter()
+    for schedule in schedules:
+        index = grid.index(schedule.date)
+        if index is None:
+            continue
+        assigned[(index, schedule.activityType, schedule.fieldId)] += 1
+        grid.mark_busy(schedule.staffDetailsId, index)
+    return grid, assigned
+
+
+async def getStaffCoverage(request: StaffCoverageRequest) -> StaffCoverageResponse:
+    """
+    Computes staffing coverage over a date range by comparing required crew sizes per
+    activity/field/time-slot against the schedules already assigned to staff.
+
+    Args:
+        request (StaffCoverageRequest): Date range, slot length and crew requirements to evaluate.
+
+    Returns:
+        StaffCoverageResponse: Under- and over-staffed slots for the requested range, plus staff booked twice in the same slot.
+
+    Raises:
+        ValueError: If the range or slot length is invalid.
+    """
+    grid, assigned = await load_schedule_grid(
+        request.start, request.end, request.slotMinutes
+    )
+    total_staff = await prisma.models.StaffDetails.prisma().count()
+    required: Counter = Counter()
+    for requirement in request.requirements:
+        index = grid.index(requirement.slotStart)
+        if index is None:
+            continue
+        required[
+            (index, requirement.activityType, requirement.fieldId)
+        ] += requirement.requiredCrew
+    understaffed: List[CoverageSlot] = []
+    overstaffed: List[CoverageSlot] = []
+    for key in sorted(
+        set(required) | set(assigned), key=lambda k: (k[0], k[1], k[2] or 0)
+    ):
+        index, activity_type, field_id = key
+        gap = assigned[key] - required[key]
+        if gap == 0:
+            continue
+        slot = CoverageSlot(
+            slotStart=grid.slot_start(index),
+            activityType=activity_type,
+            fieldId=field_id,
+            requiredCrew=required[key],
+            assignedCrew=assigned[key],
+            gap=gap,
+            availableStaff=grid.free_staff(total_staff, index),
+        )
+        (understaffed if gap < 0 else overstaffed).append(slot)
+    return StaffCoverageResponse(
+        totalStaff=total_staff,
+        slotCount=grid.slot_count,
+        understaffed=understaffed,
+        overstaffed=overstaffed,
+        doubleBookedStaffIds=sorted(grid.double_booked),
+    )
@@ -1,4 +1,5 @@
-from datetime import datetime
+import asyncio
+from datetime import date, datetime, timedelta
 from typing import List, Optional
 
 import prisma
@@ -6,6 +7,10 @@ import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+RECENT_HOURS_DAYS = 14
+
+LATEST_ITEMS = 5
+
 
 class Schedule(BaseModel):
     """
@@ -19,20 +24,34 @@ class Schedule(BaseModel):
     fieldId: Optional[int] = None
 
 
+class DailyHours(BaseModel):
+    """
+    Hours worked by the staff member on one day, taken from the time clock aggregate.
+    """
+
+    day: date
+    hours: float
+
+
 class StaffMemberDetailedInfo(BaseModel):
     """
-    Detailed data model encapsulating user, payroll, schedule, and reviews data.
+    Summary data model encapsulating user, payroll, schedule and review counts with the latest of each, and time clock data.
+    Full schedule and review history is served by the paginated staff sub-resources.
     """
 
     user: prisma.models.User
-    payroll: prisma.models.Payroll
-    schedules: List[Schedule]
-    reviews: List[prisma.models.Review]
+    payroll: Optional[prisma.models.Payroll] = None
+    scheduleCount: int
+    reviewCount: int
+    latestSchedules: List[Schedule]
+    latestReviews: List[prisma.models.Review]
+    clockedInAt: Optional[datetime] = None
+    recentHours: List[DailyHours]
 
 
 class StaffDetailsResponse(BaseModel):
     """
-    Response model returning the detailed information of a staff member including linked payroll, schedules, and performance reviews.
+    Response model returning the detailed information of a staff member including linked payroll and a summary of schedules and performance reviews.
     """
 
     staffDetails: StaffMemberDetailedInfo
@@ -47,15 +66,32 @@ async def getStaffDetails(id: int) -> StaffDetailsResponse:
         id (int): Unique identifier of the staff member to fetch the details for.
 
     Returns:
-        StaffDetailsResponse: Response model returning the detailed information of a staff member including linked payroll,
-                              schedules, and performance reviews.
+        StaffDetailsResponse: Response model returning the detailed information of a staff member including linked payroll
+                              and a summary of schedules and performance reviews.
 
     Raises:
         ValueError: If no staff details or associated user is found for the given ID.
     """
-    staff_details = await prisma.models.StaffDetails.prisma().find_unique(
-        where={"id": id},
-        include={"user": True, "payroll": True, "reviews": True, "schedules": True},
+    latest = {"take": LATEST_ITEMS, "order_by": [{"date": "desc"}, {"id": "desc"}]}
+    staff_details, schedule_count, review_count, daily_hours = await asyncio.gather(
+        prisma.models.StaffDetails.prisma().find_unique(
+            where={"id": id},
+            include={
+                "user": True,
+                "payroll": True,
+                "reviews": latest,
+                "schedules": latest,
+            },
+        ),
+        prisma.models.Schedule.prisma().count(where={"staffDetailsId": id}),
+        prisma.models.Review.prisma().count(where={"staffDetailsId": id}),
+        prisma.models.StaffDailyHours.prisma().find_many(
+            where={
+                "staffDetailsId": id,
+                "day": {"gte": datetime.utcnow() - timedelta(days=RECENT_HOURS_DAYS)},
+            },
+            order={"day": "desc"},
+        ),
     )
     if staff_details is None:
         raise ValueError("No staff details found for ID: {}".format(id))
@@ -66,7 +102,14 @@ async def getStaffDetails(id: int) -> StaffDetailsResponse:
     detailed_info = StaffMemberDetailedInfo(
         user=staff_details.user,
         payroll=staff_details.payroll,
-        schedules=staff_details.schedules,
-        reviews=staff_details.reviews,
+        scheduleCount=schedule_count,
+        reviewCount=review_count,
+        latestSchedules=staff_details.schedules or [],
+        latestReviews=staff_details.reviews or [],
+        clockedInAt=staff_details.clockedInAt,
+        recentHours=[
+            DailyHours(day=row.day.date(), hours=row.workedSeconds / 3600)
+            for row in daily_hours
+        ],
     )
     return StaffDetailsResponse(staffDetails=detailed_info)
@@ -0,0 +1,65 @@
+from typing import List, Optional
+
+import prisma
+import prisma.enums
+from pydantic import BaseModel
+
+MAX_PAGE_SIZE = 200
+
+
+class StaffDirectoryEntry(BaseModel):
+    """
+    One row of the staff directory: just enough to identify and contact a staff member.
+    """
+
+    id: int
+    firstName: Optional[str] = None
+    lastName: Optional[str] = None
+    role: prisma.enums.Role
+    phone: Optional[str] = None
+
+
+class StaffDirectoryResponse(BaseModel):
+    """
+    A page of the staff directory and the cursor to pass for the next page, if there is one.
+    """
+
+    staff: List[StaffDirectoryEntry]
+    nextCursor: Optional[int] = None
+
+
+async def getStaffDirectory(
+    roles: Optional[List[prisma.enums.Role]] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+) -> StaffDirectoryResponse:
+    """
+    Lists staff for the HR directory, selecting only ID, name, role and phone in a single joined
+    query. Pages are keyed on the staff ID, so every page costs the same no matter how many
+    historical staff records exist.
+
+    Args:
+        roles (Optional[List[prisma.enums.Role]]): Only include staff with one of these roles.
+        cursor (Optional[int]): The ``nextCursor`` from the previous page; omit for the first page.
+        limit (int): Maximum number of staff to return, capped at MAX_PAGE_SIZE.
+
+    Returns:
+        StaffDirectoryResponse: A page of the staff directory and the cursor to pass for the next page, if there is one.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = await prisma.get_client().query_raw(
+        'SELECT s.id, p."firstName", p."lastName", u.role::text AS role, p.phone '
+        'FROM "StaffDetails" s '
+        'JOIN "User" u ON u.id = s."userId" '
+        'LEFT JOIN "Profile" p ON p."userId" = u.id '
+        "WHERE s.id > $1 AND ($2::text[] IS NULL OR u.role::text = ANY($2::text[])) "
+        "ORDER BY s.id LIMIT $3",
+        cursor or 0,
+        [role.value for role in roles] if roles else None,
+        limit + 1,
+    )
+    has_more = len(rows) > limit
+    entries = [StaffDirectoryEntry(**row) for row in rows[:limit]]
+    return StaffDirectoryResponse(
+        staff=entries, nextCursor=entries[-1].id if has_more else None
+    )
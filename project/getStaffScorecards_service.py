@@ -0,0 +1,219 @@
+import logging
+from datetime import date
+from typing import List, Optional
+
+import prisma
+import prisma.enums
+from pydantic import BaseModel
+
+import project.maintenance
+
+logger = logging.getLogger(__name__)
+
+SCORECARD_WINDOWS = (30, 90, 365)
+
+ACTIVITY_COLUMNS = {
+    prisma.enums.ActivityType.Planting: "plantingCount",
+    prisma.enums.ActivityType.Harvesting: "harvestingCount",
+    prisma.enums.ActivityType.Delivery: "deliveryCount",
+}
+
+SORT_COLUMNS = {
+    "averageScore": '"averageScore" DESC NULLS LAST',
+    "completedCount": '"completedCount" DESC',
+    "reviewCount": '"reviewCount" DESC',
+}
+
+# How often workers check whether scorecards need to roll over to a new day. Rollover can lag
+# midnight by up to this long.
+ROLLOVER_INTERVAL = 3600.0
+
+
+class StaffScorecard(BaseModel):
+    """
+    Rolling performance metrics of one staff member over a window of days.
+    """
+
+    staffDetailsId: int
+    windowDays: int
+    reviewCount: int
+    averageScore: Optional[float] = None
+    plantingCount: int
+    harvestingCount: int
+    deliveryCount: int
+    completedCount: int
+    rank: int
+
+
+class StaffScorecardsResponse(BaseModel):
+    """
+    Staff scorecards for one window, ranked by the requested metric.
+    """
+
+    windowDays: int
+    asOf: Optional[date] = None
+    scorecards: List[StaffScorecard]
+
+
+async def record_performance(
+    client: prisma.Prisma,
+    staff_id: int,
+    day: date,
+    review_score: Optional[float] = None,
+    reviewed: bool = False,
+    activity_type: Optional[prisma.enums.ActivityType] = None,
+    retract: bool = False,
+) -> None:
+    """
+    Adds one review or one completed activity to the staff member's daily performance bucket and
+    refreshes their scorecards, so each write keeps the precomputed table current. With
+    ``retract`` the event is taken back out instead, e.g. when a completed schedule is deleted.
+
+    Args:
+        client (prisma.Prisma): Client or transaction to write with.
+        staff_id (int): The staff member the event belongs to.
+        day (date): Day the review or activity happened.
+        review_score (Optional[float]): Score of the review, if it was scored.
+        reviewed (bool): Whether the event is a review.
+        activity_type (Optional[prisma.enums.ActivityType]): Type of the completed activity, if the event is a completion.
+        retract (bool): Remove the event from the bucket instead of adding it.
+    """
+    step = -1 if retract else 1
+    counts = {column: 0 for column in ACTIVITY_COLUMNS.values()}
+    if activity_type is not None:
+        counts[ACTIVITY_COLUMNS[activity_type]] = step
+    await client.execute_raw(
+        'INSERT INTO "StaffDailyPerformance" AS t ("staffDetailsId", "day", "reviewCount", '
+        '"scoredReviewCount", "scoreSum", "plantingCount", "harvestingCount", "deliveryCount") '
+        "VALUES ($1::int, $2::date, $3::int, $4::int, $5::float8, $6::int, $7::int, $8::int) "
+        'ON CONFLICT ("staffDetailsId", "day") DO UPDATE SET '
+        '"reviewCount" = t."reviewCount" + EXCLUDED."reviewCount", '
+        '"scoredReviewCount" = t."scoredReviewCount" + EXCLUDED."scoredReviewCount", '
+        '"scoreSum" = t."scoreSum" + EXCLUDED."scoreSum", '
+        '"plantingCount" = t."plantingCount" + EXCLUDED."plantingCount", '
+        '"harvestingCount" = t."harvestingCount" + EXCLUDED."harvestingCount", '
+        '"deliveryCount" = t."deliveryCount" + EXCLUDED."deliveryCount"',
+        staff_id,
+        day.isoformat(),
+        step if reviewed else 0,
+        step if review_score is not None else 0,
+        step * (review_score or 0.0),
+        counts["plantingCount"],
+        counts["harvestingCount"],
+        counts["deliveryCount"],
+    )
+    await refresh_scorecards(client, [staff_id])
+
+
+async def refresh_scorecards(
+    client: prisma.Prisma, staff_ids: Optional[List[int]] = None
+) -> int:
+    """
+    Recomputes the 30/90/365-day scorecards from the daily performance buckets in one statement.
+
+    Buckets hold at most one row per staff member per day, so this reads at most a year of rows
+    per staff member rather than their raw review and schedule history.
+
+    Args:
+        client (prisma.Prisma): Client or transaction to write with.
+        staff_ids (Optional[List[int]]): Only refresh these staff members; all staff when omitted.
+
+    Returns:
+        int: Number of scorecard rows written.
+    """
+    windows = ", ".join("({})".format(days) for days in SCORECARD_WINDOWS)
+    return await client.execute_raw(
+        'INSERT INTO "StaffScorecard" ("staffDetailsId", "windowDays", "asOf", "reviewCount", '
+        '"averageScore", "plantingCount", "harvestingCount", "deliveryCount", "completedCount") '
+        "SELECT s.id, w.days, CURRENT_DATE, "
+        'COALESCE(SUM(p."reviewCount"), 0), '
+        'SUM(p."scoreSum") / NULLIF(SUM(p."scoredReviewCount"), 0), '
+        'COALESCE(SUM(p."plantingCount"), 0), '
+        'COALESCE(SUM(p."harvestingCount"), 0), '
+        'COALESCE(SUM(p."deliveryCount"), 0), '
+        'COALESCE(SUM(p."plantingCount" + p."harvestingCount" + p."deliveryCount"), 0) '
+        'FROM "StaffDetails" s '
+        "CROSS JOIN (VALUES {}) AS w(days) "
+        'LEFT JOIN "StaffDailyPerformance" p '
+        'ON p."staffDetailsId" = s.id AND p."day" > CURRENT_DATE - w.days '
+        "WHERE $1::int[] IS NULL OR s.id = ANY($1::int[]) "
+        "GROUP BY s.id, w.days "
+        'ON CONFLICT ("staffDetailsId", "windowDays") DO UPDATE SET '
+        '"asOf" = EXCLUDED."asOf", '
+        '"reviewCount" = EXCLUDED."reviewCount", '
+        '"averageScore" = EXCLUDED."averageScore", '
+        '"plantingCount" = EXCLUDED."plantingCount", '
+        '"harvestingCount" = EXCLUDED."harvestingCount", '
+        '"deliveryCount" = EXCLUDED."deliveryCount", '
+        '"completedCount" = EXCLUDED."completedCount"'.format(windows),
+        staff_ids,
+    )
+
+
+async def roll_over_scorecards(transaction: prisma.Prisma) -> None:
+    """
+    Refreshes the scorecards that were last computed on an earlier day, so expired days drop out
+    of the windows. Only those staff are recomputed; writes keep everyone else current.
+    """
+    rows = await transaction.query_raw(
+        'SELECT DISTINCT "staffDetailsId" AS id FROM "StaffScorecard" '
+        'WHERE "asOf" < CURRENT_DATE'
+    )
+    if rows:
+        refreshed = await refresh_scorecards(transaction, [row["id"] for row in rows])
+        logger.info("Rolled over %d staff scorecards", refreshed)
+
+
+scorecard_rollover = project.maintenance.PeriodicJob(
+    "staff-scorecards", roll_over_scorecards, interval=ROLLOVER_INTERVAL
+)
+
+
+async def getStaffScorecards(
+    windowDays: int = 30, sortBy: str = "averageScore", limit: int = 500
+) -> StaffScorecardsResponse:
+    """
+    Ranks every staff member by a rolling performance metric for the manager dashboard. Only reads
+    the precomputed scorecard table: reviews and completed activities refresh their staff member's
+    scorecards as they are written, and scorecard_rollover moves stale ones to the current day.
+    Staff without a scorecard yet are listed with empty metrics.
+
+    Args:
+        windowDays (int): Window to rank by: 30, 90 or 365 days.
+        sortBy (str): Metric to rank by: averageScore, completedCount or reviewCount.
+        limit (int): Maximum number of staff to return.
+
+    Returns:
+        StaffScorecardsResponse: Staff scorecards for one window, ranked by the requested metric.
+
+    Raises:
+        ValueError: If the window or sort metric is not supported.
+    """
+    if windowDays not in SCORECARD_WINDOWS:
+        raise ValueError("windowDays must be one of {}".format(SCORECARD_WINDOWS))
+    if sortBy not in SORT_COLUMNS:
+        raise ValueError("sortBy must be one of {}".format(sorted(SORT_COLUMNS)))
+    rows = await prisma.get_client().query_raw(
+        'SELECT s.id AS "staffDetailsId", $1::int AS "windowDays", c."asOf", '
+        'COALESCE(c."reviewCount", 0) AS "reviewCount", c."averageScore", '
+        'COALESCE(c."plantingCount", 0) AS "plantingCount", '
+        'COALESCE(c."harvestingCount", 0) AS "harvestingCount", '
+        'COALESCE(c."deliveryCount", 0) AS "deliveryCount", '
+        'COALESCE(c."completedCount", 0) AS "completedCount" '
+        'FROM "StaffDetails" s LEFT JOIN "StaffScorecard" c '
+        'ON c."staffDetailsId" = s.id AND c."windowDays" = $1 '
+        'ORDER BY {}, "staffDetailsId" LIMIT $2'.format(SORT_COLUMNS[sortBy]),
+        windowDays,
+        limit,
+    )
+    scorecards = [
+        StaffScorecard(
+            rank=position + 1, **{k: v for k, v in row.items() if k != "asOf"}
+        )
+        for position, row in enumerate(rows)
+    ]
+    return StaffScorecardsResponse(
+        windowDays=windowDays,
+        asOf=max((row["asOf"] for row in rows if row["asOf"]), default=None),
+        scorecards=scorecards,
+    )
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+import project.stockLedger
+
+
+class StockLevel(BaseModel):
+    """
+    Quantity of one inventory item at the requested point in time.
+    """
+
+    inventoryItemId: int
+    quantity: int
+
+
+class StockAsOfResponse(BaseModel):
+    """
+    Quantities of inventory items at a past point in time, reconstructed from the stock ledger.
+    """
+
+    asOf: datetime
+    items: List[StockLevel]
+
+
+async def getStockAsOf(
+    asOf: datetime, itemIds: Optional[List[int]] = None
+) -> StockAsOfResponse:
+    """
+    Reports what stock was on hand at a past date and time. Each item is read from its nearest
+    ledger snapshot at or before ``asOf`` plus the movements recorded after that snapshot, so a
+    year-old date costs about the same as yesterday.
+
+    Args:
+        asOf (datetime): Point in time to report; movements at exactly this time are included.
+        itemIds (Optional[List[int]]): Only report these items; the whole catalogue when omitted.
+
+    Returns:
+        StockAsOfResponse: Quantities of inventory items at a past point in time, reconstructed from the stock ledger.
+    """
+    quantities = await project.stockLedger.quantities_as_of(asOf, itemIds)
+    return StockAsOfResponse(
+        asOf=asOf,
+        items=[
+            StockLevel(inventoryItemId=item_id, quantity=quantity)
+            for item_id, quantity in sorted(quantities.items())
+        ],
+    )
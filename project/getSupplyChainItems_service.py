@@ -60,7 +60,9 @@ async def getSupplyChainItems(
     Returns:
         GetSupplyChainItemsResponse: Outputs detailed information about each item in the supply chain, including current stock levels, source details, and anticipated reordering needs based on schedules.
     """
-    inventory_items = await prisma.models.InventoryItem.prisma().find_many()
+    inventory_items = await prisma.models.InventoryItem.prisma().find_many(
+        where={"deletedAt": None}
+    )
     detailed_items = []
     for item in inventory_items:
         schedules = await prisma.models.Schedule.prisma().find_many(
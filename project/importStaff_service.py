@@ -0,0 +1,261 @@
+import codecs
+import csv
+import re
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+import project.passwordHashing
+
+IMPORT_BATCH_SIZE = 100
+REQUIRED_COLUMNS = ("firstName", "lastName", "email", "password")
+MIN_PASSWORD_LENGTH = 8
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+class ImportedStaff(BaseModel):
+    """
+    A CSV row that was imported, with the IDs created for it.
+    """
+
+    row: int
+    email: str
+    userId: int
+    staffId: int
+
+
+class ImportRowError(BaseModel):
+    """
+    A CSV row that was rejected and why.
+    """
+
+    row: int
+    email: Optional[str] = None
+    message: str
+
+
+class ImportStaffResponse(BaseModel):
+    """
+    Outcome of a staff CSV import, listing every imported and rejected row.
+    """
+
+    totalRows: int
+    importedCount: int
+    failedCount: int
+    imported: List[ImportedStaff]
+    errors: List[ImportRowError]
+
+
+class StaffRow(BaseModel):
+    """
+    A validated CSV row waiting to be inserted.
+    """
+
+    row: int
+    firstName: str
+    lastName: str
+    email: str
+    phone: Optional[str] = None
+    role: prisma.enums.Role
+    password: str
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """
+    Parses CSV records from a stream of byte chunks without buffering the whole upload. Lines are
+    held back only while a quoted field spans a line break. Records end only at ``\n`` (``\r\n``
+    included), as in csv, so other characters ``str.splitlines`` treats as breaks, such as form
+    feeds, stay inside their field.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    record = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            record += line + "\n"
+            if record.count('"') % 2 == 0:
+                if record.strip():
+                    yield next(csv.reader([record]))
+                record = ""
+    record += pending + decoder.decode(b"", final=True)
+    if record.strip():
+        yield next(csv.reader([record]))
+
+
+def validate_row(
+    row_number: int, values: Dict[str, str], seen_emails: Set[str]
+) -> StaffRow:
+    """
+    Checks one CSV row and returns it as a StaffRow.
+
+    Raises:
+        ValueError: With a message describing the first problem found in the row.
+    """
+    for column in REQUIRED_COLUMNS:
+        if not values.get(column):
+            raise ValueError("{} is required".format(column))
+    email = values["email"]
+    if not _EMAIL.match(email):
+        raise ValueError("email is not a valid address")
+    if email in seen_emails:
+        raise ValueError("email appears more than once in the file")
+    if len(values["password"]) < MIN_PASSWORD_LENGTH:
+        raise ValueError(
+            "password must be at least {} characters".format(MIN_PASSWORD_LENGTH)
+        )
+    role = values.get("role") or prisma.enums.Role.Staff.value
+    if role not in prisma.enums.Role.__members__:
+        raise ValueError("role must be one of {}".format(", ".join(prisma.enums.Role)))
+    seen_emails.add(email)
+    return StaffRow(
+        row=row_number,
+        firstName=values["firstName"],
+        lastName=values["lastName"],
+        email=email,
+        phone=values.get("phone") or None,
+        role=prisma.enums.Role[role],
+        password=values["password"],
+    )
+
+
+async def insert_batch(
+    batch: List[StaffRow], errors: List[ImportRowError]
+) -> List[ImportedStaff]:
+    """
+    Inserts one batch of validated rows. Emails that already exist are found with a single query
+    and reported as row errors; the rest are written with one statement per table inside one
+    transaction.
+    """
+    existing = await prisma.models.User.prisma().find_many(
+        where={"email": {"in": [staff.email for staff in batch]}}
+    )
+    taken = {user.email for user in existing}
+    for staff in batch:
+        if staff.email in taken:
+            errors.append(
+                ImportRowError(
+                    row=staff.row, email=staff.email, message="Email already in use."
+                )
+            )
+    batch = [staff for staff in batch if staff.email not in taken]
+    if not batch:
+        return []
+    hashes = await project.passwordHashing.hash_passwords(
+        [staff.password for staff in batch]
+    )
+    async with prisma.get_client().tx() as transaction:
+        users = await transaction.query_raw(
+            'INSERT INTO "User" ("email", "hashedPassword", "role") '
+            'SELECT * FROM unnest($1::text[], $2::text[], $3::"Role"[]) '
+            'ON CONFLICT ("email") DO NOTHING RETURNING id, "email"',
+            [staff.email for staff in batch],
+            hashes,
+            [staff.role.value for staff in batch],
+        )
+        user_ids = {user["email"]: user["id"] for user in users}
+        created = [staff for staff in batch if staff.email in user_ids]
+        ids = [user_ids[staff.email] for staff in created]
+        staff_rows = []
+        if created:
+            await transaction.execute_raw(
+                'INSERT INTO "Profile" ("firstName", "lastName", "phone", "userId") '
+                "SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::int[])",
+                [staff.firstName for staff in created],
+                [staff.lastName for staff in created],
+                [staff.phone for staff in created],
+                ids,
+            )
+            staff_rows = await transaction.query_raw(
+                'INSERT INTO "StaffDetails" ("userId") '
+                'SELECT unnest($1::int[]) RETURNING id, "userId"',
+                ids,
+            )
+    staff_ids = {row["userId"]: row["id"] for row in staff_rows}
+    for staff in batch:
+        if staff.email not in user_ids:
+            errors.append(
+                ImportRowError(
+                    row=staff.row, email=staff.email, message="Email already in use."
+                )
+            )
+    return [
+        ImportedStaff(
+            row=staff.row,
+            email=staff.email,
+            userId=user_ids[staff.email],
+            staffId=staff_ids[user_ids[staff.email]],
+        )
+        for staff in created
+    ]
+
+
+async def importStaff(chunks: AsyncIterator[bytes]) -> ImportStaffResponse:
+    """
+    Imports staff members from a CSV upload, creating a User, Profile and StaffDetails for each
+    row. The upload is parsed as it streams in and written in batches of IMPORT_BATCH_SIZE rows,
+    so a season's intake of temporary workers is onboarded in one request. Invalid rows are
+    skipped and reported with their row number; valid rows are still imported.
+
+    The header row must contain firstName, lastName, email and password, and may contain phone and
+    role (defaulting to Staff).
+
+    Args:
+        chunks (AsyncIterator[bytes]): The CSV body as it arrives, e.g. ``request.stream()``.
+
+    Returns:
+        ImportStaffResponse: Outcome of the import, listing every imported and rejected row.
+
+    Raises:
+        ValueError: If the file is empty or the header is missing required columns.
+
+    Example:
+        response = await importStaff(request.stream())
+        print(response.importedCount, response.errors)
+        > 212 [ImportRowError(row=17, email='sam@example', message='email is not a valid address')]
+    """
+    records = iter_csv_records(chunks)
+    try:
+        header = [column.strip() for column in await records.__anext__()]
+    except StopAsyncIteration:
+        raise ValueError("The CSV file is empty")
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValueError("Missing required columns: {}".format(", ".join(missing)))
+    imported: List[ImportedStaff] = []
+    errors: List[ImportRowError] = []
+    seen_emails: Set[str] = set()
+    batch: List[StaffRow] = []
+    total_rows = 0
+    async for record in records:
+        total_rows += 1
+        row_number = total_rows + 1
+        values = {
+            column: value.strip() for column, value in zip(header, record) if column
+        }
+        try:
+            batch.append(validate_row(row_number, values, seen_emails))
+        except ValueError as e:
+            errors.append(
+                ImportRowError(
+                    row=row_number, email=values.get("email"), message=str(e)
+                )
+            )
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            imported += await insert_batch(batch, errors)
+            batch = []
+    if batch:
+        imported += await insert_batch(batch, errors)
+    errors.sort(key=lambda error: error.row)
+    return ImportStaffResponse(
+        totalRows=total_rows,
+        importedCount=len(imported),
+        failedCount=len(errors),
+        imported=imported,
+        errors=errors,
+    )
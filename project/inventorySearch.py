@@ -0,0 +1,184 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Words are runs of letters and digits; joined runs such as "10-10-10" or "1.5m" are indexed
+# both whole and as their parts.
+WORD = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+PART = re.compile(r"[a-z0-9]+")
+
+MIN_SIMILARITY = 0.4
+
+
+def words(text: str) -> List[str]:
+    """
+    Splits a name or query into lower-case search words.
+    """
+    found = []
+    for word in WORD.findall(text.lower()):
+        found.append(word)
+        parts = PART.findall(word)
+        if len(parts) > 1:
+            found.extend(parts)
+    return found
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = "  {} ".format(word)
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrieNode:
+    """
+    One character of the prefix trie, holding the IDs of every item with a word below it.
+    """
+
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.ids: Set[int] = set()
+
+
+class NameIndex:
+    """
+    In-memory search index over inventory item names.
+
+    A prefix trie answers typeahead lookups in time proportional to the length of the typed word:
+    each node keeps the IDs of all items with a word starting with that prefix, so a lookup is one
+    walk and no subtree scan. Words that match no prefix fall back to trigram similarity against
+    the indexed vocabulary, which tolerates typos such as "frasr". The inventory snapshot keeps the
+    index current as items are written, removed or reloaded.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.words_of: Dict[int, Tuple[str, ...]] = {}
+        self.word_ids: Dict[str, Set[int]] = {}
+        self.by_trigram: Dict[str, Set[str]] = {}
+        self.gram_counts: Dict[str, int] = {}
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def add(self, item_id: int, name: str) -> None:
+        item_words = tuple(dict.fromkeys(words(name)))
+        if self.words_of.get(item_id) == item_words:
+            return
+        self.remove(item_id)
+        self.words_of[item_id] = item_words
+        for word in item_words:
+            node = self.root
+            for char in word:
+                node = node.children.setdefault(char, TrieNode())
+                node.ids.add(item_id)
+            ids = self.word_ids.get(word)
+            if ids is None:
+                ids = self.word_ids[word] = set()
+                grams = trigrams(word)
+                self.gram_counts[word] = len(grams)
+                for gram in grams:
+                    self.by_trigram.setdefault(gram, set()).add(word)
+            ids.add(item_id)
+
+    def remove(self, item_id: int) -> None:
+        for word in self.words_of.pop(item_id, ()):
+            # Words of one item can share a prefix, whose nodes an earlier word may have pruned.
+            path = [self.root]
+            for char in word:
+                node = path[-1].children.get(char)
+                if node is None:
+                    break
+                node.ids.discard(item_id)
+                path.append(node)
+            for parent, char, node in zip(
+                reversed(path[:-1]), reversed(word[: len(path) - 1]), reversed(path[1:])
+            ):
+                if node.ids:
+                    break
+                del parent.children[char]
+            ids = self.word_ids[word]
+            ids.discard(item_id)
+            if not ids:
+                del self.word_ids[word]
+                del self.gram_counts[word]
+                for gram in trigrams(word):
+                    self.by_trigram[gram].discard(word)
+                    if not self.by_trigram[gram]:
+                        del self.by_trigram[gram]
+
+    def prefixed(self, prefix: str) -> Set[int]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    def similar(self, word: str) -> Dict[int, float]:
+        """
+        Returns the items having a word whose trigram similarity to ``word`` is at least
+        MIN_SIMILARITY, with the best similarity per item.
+        """
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self.by_trigram.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        scores: Dict[int, float] = {}
+        for candidate, count in shared.items():
+            similarity = count / (len(grams) + self.gram_counts[candidate] - count)
+            if similarity < MIN_SIMILARITY:
+                continue
+            for item_id in self.word_ids[candidate]:
+                if similarity > scores.get(item_id, 0.0):
+                    scores[item_id] = similarity
+        return scores
+
+    def search(
+        self, query: str, candidates: Optional[Iterable[int]] = None
+    ) -> List[Tuple[float, int]]:
+        """
+        Returns ``(score, item_id)`` for items matching every word of ``query``, unordered. Each
+        query word is matched as a prefix of a name word; a word without prefix matches is matched
+        by similarity instead, at a lower score. ``candidates`` restricts the result.
+        """
+        query_words = list(dict.fromkeys(words(query)))
+        if not query_words:
+            return []
+        matches: List[Tuple[str, Optional[Dict[int, float]], Set[int]]] = []
+        for word in query_words:
+            ids = self.prefixed(word)
+            if ids:
+                matches.append((word, None, ids))
+                continue
+            fuzzy = self.similar(word) if len(word) >= 3 else {}
+            if not fuzzy:
+                return []
+            matches.append((word, fuzzy, set(fuzzy)))
+        matches.sort(key=lambda match: len(match[2]))
+        found = set(matches[0][2])
+        for _, _, ids in matches[1:]:
+            found &= ids
+            if not found:
+                return []
+        if candidates is not None:
+            found &= set(candidates)
+        results = []
+        for item_id in found:
+            item_words = self.words_of[item_id]
+            score = 0.0
+            for word, fuzzy, _ in matches:
+                if fuzzy is not None:
+                    score += fuzzy[item_id]
+                elif word in item_words:
+                    score += 3.0
+                else:
+                    score += 1.0 + max(
+                        len(word) / len(name_word)
+                        for name_word in item_words
+                        if name_word.startswith(word)
+                    )
+            if item_words and item_words[0].startswith(query_words[0]):
+                score += 0.5
+            results.append((score, item_id))
+        return results
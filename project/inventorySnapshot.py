@@ -0,0 +1,216 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+import prisma
+import prisma.enums
+import prisma.models
+
+import project.eventStream
+import project.inventorySearch
+import project.inventoryVersion
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryRow:
+    """
+    Compact in-memory copy of one inventory item.
+    """
+
+    __slots__ = ("id", "name", "quantity", "status", "type", "version")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        quantity: int,
+        status: prisma.enums.InventoryStatus,
+        type: prisma.enums.InventoryType,
+        version: int,
+    ):
+        self.id = id
+        self.name = name
+        self.quantity = quantity
+        self.status = status
+        self.type = type
+        self.version = version
+
+
+class InventorySnapshot:
+    """
+    Per-worker copy of the InventoryItem table answering inventory list queries without touching
+    the database, including name search through ``names``.
+
+    Rows live in one list; removed rows leave a hole that the next insert reuses, so positions stay
+    stable and the type and status indexes can hold plain position sets. Inventory services write
+    through to the snapshot after each successful write and advance ``version`` to the inventory
+    version token they produced. A background task compares that token with the database every
+    ``interval`` seconds and reloads when another worker has changed the inventory.
+    """
+
+    def __init__(self):
+        self.rows: List[Optional[InventoryRow]] = []
+        self.positions: Dict[int, int] = {}
+        self.by_type: Dict[prisma.enums.InventoryType, Set[int]] = {
+            item_type: set() for item_type in prisma.enums.InventoryType
+        }
+        self.by_status: Dict[prisma.enums.InventoryStatus, Set[int]] = {
+            status: set() for status in prisma.enums.InventoryStatus
+        }
+        self.free: List[int] = []
+        self.names = project.inventorySearch.NameIndex()
+        self.version = -1
+        self.loaded = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _clear(self) -> None:
+        self.rows = []
+        self.positions = {}
+        self.free = []
+        self.names.clear()
+        for positions in self.by_type.values():
+            positions.clear()
+        for positions in self.by_status.values():
+            positions.clear()
+
+    def _unindex(self, position: int) -> None:
+        row = self.rows[position]
+        self.by_type[row.type].discard(position)
+        self.by_status[row.status].discard(position)
+
+    def _index(self, position: int) -> None:
+        row = self.rows[position]
+        self.by_type[row.type].add(position)
+        self.by_status[row.status].add(position)
+
+    def upsert(self, item: prisma.models.InventoryItem) -> None:
+        """
+        Inserts or replaces the row of an item written by an inventory service, publishing an
+        ``inventory.status`` event if its stock status changed.
+        """
+        row = InventoryRow(
+            item.id, item.name, item.quantity, item.status, item.type, item.version
+        )
+        position = self.positions.get(item.id)
+        if position is not None:
+            self._publish_transition(self.rows[position].status, row)
+            self._unindex(position)
+        elif self.free:
+            position = self.free.pop()
+            self.positions[item.id] = position
+        else:
+            position = len(self.rows)
+            self.rows.append(None)
+            self.positions[item.id] = position
+        self.rows[position] = row
+        self._index(position)
+        self.names.add(item.id, item.name)
+
+    @staticmethod
+    def _publish_transition(
+        previous: prisma.enums.InventoryStatus, row: InventoryRow
+    ) -> None:
+        if previous != row.status:
+            project.eventStream.publish(
+                "inventory",
+                "status",
+                {
+                    "inventoryItemId": row.id,
+                    "name": row.name,
+                    "type": row.type,
+                    "from": previous,
+                    "to": row.status,
+                    "quantity": row.quantity,
+                },
+            )
+
+    def remove(self, item_ids: Iterable[int]) -> None:
+        for item_id in item_ids:
+            position = self.positions.pop(item_id, None)
+            if position is None:
+                continue
+            self._unindex(position)
+            self.names.remove(item_id)
+            self.rows[position] = None
+            self.free.append(position)
+
+    def advance(self, version: int) -> None:
+        """
+        Records the inventory version token produced by a write that was just applied. If it skips
+        ahead, some other worker wrote in between and the next poll reloads the snapshot.
+        """
+        if version == self.version + 1:
+            self.version = version
+        elif version > self.version:
+            self.version = -1
+
+    def find(
+        self,
+        type: Optional[prisma.enums.InventoryType] = None,
+        status: Optional[prisma.enums.InventoryStatus] = None,
+    ) -> List[InventoryRow]:
+        """
+        Returns the rows matching the filters, ordered by item ID.
+        """
+        if type is not None and status is not None:
+            smaller, larger = sorted(
+                (self.by_type[type], self.by_status[status]), key=len
+            )
+            positions = [p for p in smaller if p in larger]
+        elif type is not None:
+            positions = self.by_type[type]
+        elif status is not None:
+            positions = self.by_status[status]
+        else:
+            positions = self.positions.values()
+        return sorted((self.rows[p] for p in positions), key=lambda row: row.id)
+
+    async def load(self) -> None:
+        """
+        Rebuilds the snapshot from the database together with the version token it reflects. The
+        token is read first, so a write landing in between leaves the snapshot marked older than
+        it is and the next poll simply loads it again. Status changes made by other workers are
+        published as they are picked up here.
+        """
+        async with self._lock:
+            version = await project.inventoryVersion.inventory_version()
+            items = await prisma.models.InventoryItem.prisma().find_many(
+                where={"deletedAt": None}, order={"id": "asc"}
+            )
+            previous = {row.id: row.status for row in self.rows if row is not None}
+            self._clear()
+            for item in items:
+                self.upsert(item)
+                if item.id in previous:
+                    self._publish_transition(
+                        previous[item.id], self.rows[self.positions[item.id]]
+                    )
+            self.version = version
+            self.loaded = True
+
+    def start(self, interval: float = 2.0) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await project.inventoryVersion.inventory_version() != self.version:
+                    await self.load()
+            except Exception:
+                logger.exception("Failed to refresh inventory snapshot")
+
+
+inventory_snapshot = InventorySnapshot()
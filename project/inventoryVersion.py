@@ -0,0 +1,28 @@
+from typing import Optional
+
+import prisma
+
+BUMP_INVENTORY_VERSION = (
+    'INSERT INTO "InventoryState" ("id", "version") VALUES (1, 1) '
+    'ON CONFLICT ("id") DO UPDATE SET "version" = "InventoryState"."version" + 1 '
+    'RETURNING "version"'
+)
+
+
+async def inventory_version(client: Optional[prisma.Prisma] = None) -> int:
+    """
+    Returns the current inventory version token. It changes whenever an inventory item is added,
+    changed or removed, so clients holding an older token know they have to sync.
+    """
+    rows = await (client or prisma.get_client()).query_raw(
+        'SELECT "version" FROM "InventoryState" WHERE "id" = 1'
+    )
+    return rows[0]["version"] if rows else 0
+
+
+async def bump_inventory_version(client: Optional[prisma.Prisma] = None) -> int:
+    """
+    Advances the inventory version token and returns the new value.
+    """
+    rows = await (client or prisma.get_client()).query_raw(BUMP_INVENTORY_VERSION)
+    return rows[0]["version"]
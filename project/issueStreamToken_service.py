@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+
+import project.auth
+
+
+class StreamTokenResponse(BaseModel):
+    """
+    A short-lived token for opening the event stream, and how many seconds it stays valid.
+    """
+
+    token: str
+    expiresIn: int
+
+
+async def issueStreamToken(claims: project.auth.TokenClaims) -> StreamTokenResponse:
+    """
+    Issues a short-lived token for ``/events?token=...``. Browser ``EventSource`` cannot send an
+    Authorization header, so dashboards fetch one of these with their access token first. The
+    token is only accepted by the event stream, and only when the stream is opened, so it is safe
+    for it to appear in a URL. Fetch a new one before reconnecting.
+
+    Args:
+        claims (project.auth.TokenClaims): Verified claims of the caller's access token.
+
+    Returns:
+        StreamTokenResponse: A short-lived token for opening the event stream, and how many seconds it stays valid.
+
+    Example:
+        response = await issueStreamToken(claims)
+        print(response)
+        > StreamTokenResponse(token='eyJhbGciOi...', expiresIn=60)
+    """
+    ttl = project.auth.STREAM_TOKEN_TTL
+    return StreamTokenResponse(
+        token=project.auth.issue_token(
+            claims.userId, claims.role, scope=project.auth.STREAM_SCOPE, ttl=ttl
+        ),
+        expiresIn=int(ttl.total_seconds()),
+    )
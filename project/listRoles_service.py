@@ -2,9 +2,10 @@ from typing import List
 
 import prisma
 import prisma.enums
-import prisma.models
 from pydantic import BaseModel
 
+from project.permissions import permission_store
+
 
 class GetRolesRequest(BaseModel):
     """
@@ -34,7 +35,8 @@ class GetRolesResponse(BaseModel):
 async def listRoles(request: GetRolesRequest) -> GetRolesResponse:
     """
     Provides a list of all staff roles and associated permissions, aiding in access control and role assignments.
-    Accessible by Admin and HR for management and oversight.
+    Accessible by Admin and HR for management and oversight. Served from the in-memory permission store, so no
+    database query is made.
 
     Args:
         request (GetRolesRequest): Object to retrieve all available roles and their associated permissions.
@@ -43,15 +45,8 @@ async def listRoles(request: GetRolesRequest) -> GetRolesResponse:
     Returns:
         GetRolesResponse: Object containing a list of all roles within the organization along with their designated permissions.
     """
-    users = await prisma.models.User.prisma().find_many(include={"role": True})
-    role_permissions_mapping = {}
-    for user in users:
-        if user.role not in role_permissions_mapping:
-            role_permissions_mapping[user.role] = set()
-        role_permissions_mapping[user.role].update(["edit_profile", "view_reports"])
     roles_info = [
-        RolePermissions(role=role, permissions=list(permissions))
-        for role, permissions in role_permissions_mapping.items()
+        RolePermissions(role=role, permissions=permission_store.permissions_of(role))
+        for role in prisma.enums.Role
     ]
-    response = GetRolesResponse(roles=roles_info)
-    return response
+    return GetRolesResponse(roles=roles_info)
@@ -0,0 +1,82 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+import project.saplingCohorts
+
+
+class SaplingCohortDetails(BaseModel):
+    """
+    Trees of one species planted in one year in one field, with their estimated height this season.
+    """
+
+    fieldId: int
+    inventoryItemId: int
+    species: str
+    plantedYear: int
+    count: int
+    estimatedHeightFt: float
+
+
+class SaplingCohortsResponse(BaseModel):
+    """
+    Standing sapling cohorts, by field, species and planting year.
+    """
+
+    totalTrees: int
+    cohorts: List[SaplingCohortDetails]
+
+
+async def listSaplingCohorts(
+    fieldId: Optional[int] = None, inventoryItemId: Optional[int] = None
+) -> SaplingCohortsResponse:
+    """
+    Lists how many trees of each species and planting year stand in each field, as kept up to date
+    by completed planting and harvesting schedules, with the height each cohort is estimated to
+    reach this season.
+
+    Args:
+        fieldId (Optional[int]): Only list cohorts in this field.
+        inventoryItemId (Optional[int]): Only list cohorts of this sapling item.
+
+    Returns:
+        SaplingCohortsResponse: Standing sapling cohorts, by field, species and planting year.
+
+    Example:
+        response = await listSaplingCohorts(fieldId=2)
+        print(response.cohorts[0])
+        > SaplingCohortDetails(fieldId=2, inventoryItemId=4, species='Fraser Fir', plantedYear=2019, count=1200, estimatedHeightFt=5.5)
+    """
+    table = project.saplingCohorts.cohort_table
+    if not table.loaded:
+        await table.load()
+    curves = table.curves()
+    season = date.today().year
+    cohorts = []
+    for field, species, planted, count in zip(
+        table.field_ids, table.species_ids, table.planted_years, table.counts
+    ):
+        if not count:
+            continue
+        if fieldId is not None and field != fieldId:
+            continue
+        if inventoryItemId is not None and species != inventoryItemId:
+            continue
+        curve = curves.get(species, project.saplingCohorts.DEFAULT_GROWTH)
+        cohorts.append(
+            SaplingCohortDetails(
+                fieldId=field,
+                inventoryItemId=species,
+                species=table.species_names.get(species, ""),
+                plantedYear=planted,
+                count=count,
+                estimatedHeightFt=round(curve.height(season - planted), 1),
+            )
+        )
+    cohorts.sort(
+        key=lambda cohort: (cohort.fieldId, cohort.plantedYear, cohort.species)
+    )
+    return SaplingCohortsResponse(
+        totalTrees=sum(cohort.count for cohort in cohorts), cohorts=cohorts
+    )
@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import List, Optional
+
+import prisma
+import prisma.models
+from pydantic import BaseModel
+
+MAX_PAGE_SIZE = 200
+
+
+class StaffReview(BaseModel):
+    """
+    A performance review of the staff member.
+    """
+
+    id: int
+    date: datetime
+    performance: str
+    feedback: str
+
+
+class StaffReviewsResponse(BaseModel):
+    """
+    A page of the staff member's reviews, newest first, and the cursor for the next page, if there is one.
+    """
+
+    reviews: List[StaffReview]
+    nextCursor: Optional[int] = None
+
+
+async def listStaffReviews(
+    id: int,
+    fromDate: Optional[datetime] = None,
+    toDate: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+) -> StaffReviewsResponse:
+    """
+    Lists the performance reviews of one staff member, newest first, optionally limited to a date
+    range. Uses cursor pagination on the review ID so each page costs the same regardless of tenure.
+
+    Args:
+        id (int): Unique identifier of the staff member.
+        fromDate (Optional[datetime]): Only include reviews on or after this date.
+        toDate (Optional[datetime]): Only include reviews before this date.
+        cursor (Optional[int]): The ``nextCursor`` from the previous page; omit for the first page.
+        limit (int): Maximum number of reviews to return, capped at MAX_PAGE_SIZE.
+
+    Returns:
+        StaffReviewsResponse: A page of the staff member's reviews, newest first, and the cursor for the next page, if there is one.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    where: dict = {"staffDetailsId": id}
+    date_filter = {}
+    if fromDate:
+        date_filter["gte"] = fromDate
+    if toDate:
+        date_filter["lt"] = toDate
+    if date_filter:
+        where["date"] = date_filter
+    reviews = await prisma.models.Review.prisma().find_many(
+        where=where,
+        order=[{"date": "desc"}, {"id": "desc"}],
+        take=limit + 1,
+        skip=1 if cursor is not None else 0,
+        cursor={"id": cursor} if cursor is not None else None,
+    )
+    has_more = len(reviews) > limit
+    page = [
+        StaffReview(
+            id=review.id,
+            date=review.date,
+            performance=review.performance,
+            feedback=review.feedback,
+        )
+        for review in reviews[:limit]
+    ]
+    return StaffReviewsResponse(
+        reviews=page, nextCursor=page[-1].id if has_more else None
+    )
@@ -0,0 +1,81 @@
+from datetime import datetime
+from typing import List, Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+MAX_PAGE_SIZE = 200
+
+
+class StaffSchedule(BaseModel):
+    """
+    A schedule entry assigned to the staff member.
+    """
+
+    id: int
+    date: datetime
+    activityType: prisma.enums.ActivityType
+    fieldId: Optional[int] = None
+
+
+class StaffSchedulesResponse(BaseModel):
+    """
+    A page of the staff member's schedules, newest first, and the cursor for the next page, if there is one.
+    """
+
+    schedules: List[StaffSchedule]
+    nextCursor: Optional[int] = None
+
+
+async def listStaffSchedules(
+    id: int,
+    fromDate: Optional[datetime] = None,
+    toDate: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+) -> StaffSchedulesResponse:
+    """
+    Lists the schedules of one staff member, newest first, optionally limited to a date range. Uses
+    cursor pagination on the schedule ID so each page costs the same regardless of tenure.
+
+    Args:
+        id (int): Unique identifier of the staff member.
+        fromDate (Optional[datetime]): Only include schedules on or after this date.
+        toDate (Optional[datetime]): Only include schedules before this date.
+        cursor (Optional[int]): The ``nextCursor`` from the previous page; omit for the first page.
+        limit (int): Maximum number of schedules to return, capped at MAX_PAGE_SIZE.
+
+    Returns:
+        StaffSchedulesResponse: A page of the staff member's schedules, newest first, and the cursor for the next page, if there is one.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    where: dict = {"staffDetailsId": id}
+    date_filter = {}
+    if fromDate:
+        date_filter["gte"] = fromDate
+    if toDate:
+        date_filter["lt"] = toDate
+    if date_filter:
+        where["date"] = date_filter
+    schedules = await prisma.models.Schedule.prisma().find_many(
+        where=where,
+        order=[{"date": "desc"}, {"id": "desc"}],
+        take=limit + 1,
+        skip=1 if cursor is not None else 0,
+        cursor={"id": cursor} if cursor is not None else None,
+    )
+    has_more = len(schedules) > limit
+    page = [
+        StaffSchedule(
+            id=schedule.id,
+            date=schedule.date,
+            activityType=schedule.activityType,
+            fieldId=schedule.fieldId,
+        )
+        for schedule in schedules[:limit]
+    ]
+    return StaffSchedulesResponse(
+        schedules=page, nextCursor=page[-1].id if has_more else None
+    )
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+import project.stockLedger
+
+MAX_MOVEMENTS = 1000
+
+
+class StockMovementEntry(BaseModel):
+    """
+    One ledger entry with the item's quantity after it.
+    """
+
+    id: int
+    kind: prisma.enums.MovementKind
+    delta: int
+    occurredAt: datetime
+    reference: Optional[str] = None
+    note: Optional[str] = None
+    balanceAfter: int
+
+
+class StockMovementsResponse(BaseModel):
+    """
+    Audit trail of one item between two points in time: opening quantity, movements and closing quantity.
+    """
+
+    inventoryItemId: int
+    fromDate: datetime
+    toDate: datetime
+    openingQuantity: int
+    closingQuantity: int
+    movements: List[StockMovementEntry]
+    truncated: bool
+
+
+async def listStockMovements(
+    itemId: int,
+    fromDate: Optional[datetime] = None,
+    toDate: Optional[datetime] = None,
+) -> StockMovementsResponse:
+    """
+    Lists the stock movements of an inventory item for an audit. The opening quantity comes from
+    the nearest ledger snapshot plus a short tail of movements, so the cost does not grow with the
+    item's full history.
+
+    Args:
+        itemId (int): The inventory item to audit.
+        fromDate (Optional[datetime]): Start of the period, exclusive; defaults to 30 days before ``toDate``.
+        toDate (Optional[datetime]): End of the period, inclusive; defaults to now.
+
+    Returns:
+        StockMovementsResponse: Audit trail of one item between two points in time: opening quantity, movements and closing quantity.
+
+    Raises:
+        ValueError: If the item does not exist or the period is empty.
+    """
+    toDate = project.stockLedger.as_utc(toDate or datetime.now(timezone.utc))
+    fromDate = project.stockLedger.as_utc(fromDate or toDate - timedelta(days=30))
+    if fromDate >= toDate:
+        raise ValueError("fromDate must be before toDate")
+    opening = await project.stockLedger.quantities_as_of(fromDate, [itemId])
+    if itemId not in opening:
+        raise ValueError("No inventory item found with ID {}".format(itemId))
+    movements = await prisma.models.StockMovement.prisma().find_many(
+        where={
+            "inventoryItemId": itemId,
+            "occurredAt": {"gt": fromDate, "lte": toDate},
+        },
+        order=[{"occurredAt": "asc"}, {"id": "asc"}],
+        take=MAX_MOVEMENTS + 1,
+    )
+    truncated = len(movements) > MAX_MOVEMENTS
+    balance = opening[itemId]
+    entries = []
+    for movement in movements[:MAX_MOVEMENTS]:
+        balance += movement.delta
+        entries.append(
+            StockMovementEntry(
+                id=movement.id,
+                kind=movement.kind,
+                delta=movement.delta,
+                occurredAt=movement.occurredAt,
+                reference=movement.reference,
+                note=movement.note,
+                balanceAfter=balance,
+            )
+        )
+    return StockMovementsResponse(
+        inventoryItemId=itemId,
+        fromDate=fromDate,
+        toDate=toDate,
+        openingQuantity=opening[itemId],
+        closingQuantity=balance,
+        movements=entries,
+        truncated=truncated,
+    )
@@ -0,0 +1,51 @@
+from typing import List
+
+from pydantic import BaseModel
+
+import project.fieldLocator
+
+
+class LocatedField(BaseModel):
+    """
+    A field and the distance to it from the queried point, in metres; zero when the point lies inside.
+    """
+
+    fieldId: int
+    name: str
+    distanceM: float
+
+
+class LocateFieldResponse(BaseModel):
+    """
+    The fields containing the queried point; empty when it lies outside every field.
+    """
+
+    fields: List[LocatedField]
+
+
+async def locateField(lat: float, lon: float) -> LocateFieldResponse:
+    """
+    Finds the field a GPS position lies in, for crew tablets tagging their work to the block they
+    are standing in. Answered from the worker's in-memory field locator in microseconds.
+
+    Args:
+        lat (float): Latitude in decimal degrees.
+        lon (float): Longitude in decimal degrees.
+
+    Returns:
+        LocateFieldResponse: The fields containing the queried point; empty when it lies outside every field.
+
+    Example:
+        response = await locateField(35.5025, -82.4995)
+        print(response)
+        > LocateFieldResponse(fields=[LocatedField(fieldId=12, name='Block A', distanceM=0.0)])
+    """
+    locator = project.fieldLocator.field_locator
+    if not locator.loaded:
+        await locator.load()
+    return LocateFieldResponse(
+        fields=[
+            LocatedField(fieldId=shape.field_id, name=shape.name, distanceM=0.0)
+            for shape in locator.at(lat, lon)
+        ]
+    )
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+import prisma
+
+logger = logging.getLogger(__name__)
+
+JOB_TIMEOUT = timedelta(minutes=10)
+
+
+class PeriodicJob:
+    """
+    Background task that runs ``job`` about every ``interval`` seconds on one worker at a time.
+
+    Every worker checks whether the job is due at startup and then every ``poll`` seconds. The check
+    takes a transaction-level advisory lock named after the job, so a worker that finds another one
+    running skips instead of waiting, and compares against the last run time stored in
+    MaintenanceRun, so the schedule survives restarts and deploys. The job runs inside the locking
+    transaction and is passed it; the run is recorded only if the job commits.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        job: Callable[[prisma.Prisma], Awaitable[None]],
+        interval: float,
+        poll: float = 300.0,
+    ):
+        self.name = name
+        self.job = job
+        self.interval = interval
+        self.poll = poll
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_if_due(self) -> bool:
+        """
+        Runs the job if no worker is running it and it has not run within ``interval`` seconds.
+
+        Returns:
+            bool: Whether the job ran.
+        """
+        async with prisma.get_client().tx(timeout=JOB_TIMEOUT) as transaction:
+            rows = await transaction.query_raw(
+                "SELECT pg_try_advisory_xact_lock(hashtext($1)) AS locked", self.name
+            )
+            if not rows[0]["locked"]:
+                return False
+            recent = await transaction.query_raw(
+                'SELECT 1 FROM "MaintenanceRun" WHERE "name" = $1 '
+                'AND "lastRunAt" > NOW() - make_interval(secs => $2::float)',
+                self.name,
+                self.interval,
+            )
+            if recent:
+                return False
+            await self.job(transaction)
+            await transaction.execute_raw(
+                'INSERT INTO "MaintenanceRun" ("name", "lastRunAt") VALUES ($1, NOW()) '
+                'ON CONFLICT ("name") DO UPDATE SET "lastRunAt" = NOW()',
+                self.name,
+            )
+        return True
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_if_due()
+            except Exception:
+                logger.exception("Failed to run %s", self.name)
+            await asyncio.sleep(self.poll)
@@ -0,0 +1,218 @@
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from os import getenv
+from typing import Deque, List, Optional, Tuple
+
+import bcrypt
+from fastapi import HTTPException
+
+BCRYPT_ROUNDS = int(getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_SIZE = int(getenv("HASH_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_LIMIT = int(getenv("HASH_QUEUE_LIMIT", str(HASH_POOL_SIZE * 8)))
+HASH_QUEUE_TIMEOUT = float(getenv("HASH_QUEUE_TIMEOUT", "2.0"))
+ACCOUNT_MAX_FAILURES = int(getenv("LOGIN_ACCOUNT_MAX_FAILURES", "5"))
+ACCOUNT_WINDOW_SECONDS = float(getenv("LOGIN_ACCOUNT_WINDOW_SECONDS", "900"))
+IP_MAX_FAILURES = int(getenv("LOGIN_IP_MAX_FAILURES", "20"))
+IP_WINDOW_SECONDS = float(getenv("LOGIN_IP_WINDOW_SECONDS", "300"))
+
+_BCRYPT_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_POOL_SIZE, thread_name_prefix="bcrypt")
+_hash_slots: Optional[asyncio.Semaphore] = None
+_dummy_hash: Optional[str] = None
+
+
+def _slots() -> asyncio.Semaphore:
+    global _hash_slots
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(HASH_QUEUE_LIMIT)
+    return _hash_slots
+
+
+async def _run_bounded(func, *args):
+    """
+    Runs a bcrypt call on the dedicated hashing threads, admitting at most HASH_QUEUE_LIMIT calls
+    at once so a burst of logins queues here instead of starving the event loop and the default
+    executor.
+
+    Raises:
+        HTTPException: 503 if no slot frees up within HASH_QUEUE_TIMEOUT seconds.
+    """
+    slots = _slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many logins in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, func, *args)
+    finally:
+        slots.release()
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)
+    ).decode("utf-8")
+
+
+def _verify(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        return False
+
+
+async def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    """
+    Hashes a password with the configured bcrypt cost on the bounded hashing pool.
+    """
+    return await _run_bounded(_hash, password, rounds)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    """
+    Checks a password against a bcrypt hash on the bounded hashing pool.
+    """
+    return await _run_bounded(_verify, password, hashed)
+
+
+async def reject_unknown_user(password: str) -> bool:
+    """
+    Checks a password against a throwaway hash at the configured cost, so a login for an account
+    that does not exist takes as long as a wrong password for one that does. Always returns False.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await hash_password(os.urandom(16).hex())
+    await verify_password(password, _dummy_hash)
+    return False
+
+
+async def hash_passwords(
+    passwords: List[str], rounds: int = BCRYPT_ROUNDS
+) -> List[str]:
+    """
+    Hashes a batch of passwords for bulk imports. Uses at most half of the hashing threads at a
+    time so logins keep being served while an import runs.
+    """
+    loop = asyncio.get_running_loop()
+    width = max(1, HASH_POOL_SIZE // 2)
+    hashes: List[str] = []
+    for start in range(0, len(passwords), width):
+        hashes += await asyncio.gather(
+            *(
+                loop.run_in_executor(_hash_pool, _hash, password, rounds)
+                for password in passwords[start : start + width]
+            )
+        )
+    return hashes
+
+
+def needs_rehash(hashed: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    """
+    Returns True when a stored hash was made with a different cost than the configured one.
+    """
+    match = _BCRYPT_COST.match(hashed)
+    return match is None or int(match.group(1)) != rounds
+
+
+class SlidingWindowLimiter:
+    """
+    Counts failures per key over a sliding time window, keeping at most ``max_keys`` keys and
+    evicting the least recently touched ones first so memory stays bounded during a flood.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = 50000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._events: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def _prune(self, key: str, now: float) -> Optional[Deque[float]]:
+        events = self._events.get(key)
+        if events is None:
+            return None
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return None
+        return events
+
+    def retry_after(self, key: str) -> float:
+        """
+        Returns seconds until ``key`` may try again, or 0 if it is under the limit.
+        """
+        now = time.monotonic()
+        events = self._prune(key, now)
+        if events is None or len(events) < self.limit:
+            return 0.0
+        return events[0] + self.window - now
+
+    def hit(self, key: str) -> None:
+        now = time.monotonic()
+        events = self._prune(key, now)
+        if events is None:
+            events = self._events[key] = deque()
+        events.append(now)
+        self._events.move_to_end(key)
+        while len(self._events) > self.max_keys:
+            self._events.popitem(last=False)
+
+    def reset(self, key: str) -> None:
+        self._events.pop(key, None)
+
+
+class LoginThrottle:
+    """
+    Per-account and per-IP failed-login limits, checked before any password hashing is done.
+    """
+
+    def __init__(
+        self,
+        account_limits: Tuple[int, float] = (
+            ACCOUNT_MAX_FAILURES,
+            ACCOUNT_WINDOW_SECONDS,
+        ),
+        ip_limits: Tuple[int, float] = (IP_MAX_FAILURES, IP_WINDOW_SECONDS),
+    ):
+        self.accounts = SlidingWindowLimiter(*account_limits)
+        self.ips = SlidingWindowLimiter(*ip_limits)
+
+    def check(self, account: str, ip: Optional[str]) -> None:
+        """
+        Raises:
+            HTTPException: 429 if the account or IP has too many recent failures.
+        """
+        wait = self.accounts.retry_after(account.lower())
+        if ip:
+            wait = max(wait, self.ips.retry_after(ip))
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many failed login attempts",
+                headers={"Retry-After": str(int(wait) + 1)},
+            )
+
+    def failed(self, account: str, ip: Optional[str]) -> None:
+        self.accounts.hit(account.lower())
+        if ip:
+            self.ips.hit(ip)
+
+    def succeeded(self, account: str) -> None:
+        self.accounts.reset(account.lower())
+
+
+login_throttle = LoginThrottle()
+
+
+def shutdown_hash_pool() -> None:
+    _hash_pool.shutdown(wait=False, cancel_futures=True)
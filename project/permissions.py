@@ -0,0 +1,286 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+from fastapi import Depends, HTTPException
+
+from project.auth import TokenClaims, authenticate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROLE_PERMISSIONS: Dict[prisma.enums.Role, List[str]] = {
+    prisma.enums.Role.Admin: [
+        "manage_roles",
+        "manage_users",
+        "manage_staff",
+        "view_staff",
+        "manage_payroll",
+        "manage_inventory",
+        "view_inventory",
+        "manage_orders",
+        "manage_schedules",
+        "view_reports",
+        "edit_profile",
+    ],
+    prisma.enums.Role.HR: [
+        "manage_roles",
+        "manage_staff",
+        "view_staff",
+        "manage_payroll",
+        "view_reports",
+        "edit_profile",
+    ],
+    prisma.enums.Role.Manager: [
+        "view_staff",
+        "manage_inventory",
+        "view_inventory",
+        "manage_orders",
+        "manage_schedules",
+        "view_reports",
+        "edit_profile",
+    ],
+    prisma.enums.Role.Accountant: [
+        "manage_payroll",
+        "view_inventory",
+        "view_reports",
+        "edit_profile",
+    ],
+    prisma.enums.Role.Staff: ["view_inventory", "manage_orders", "edit_profile"],
+    prisma.enums.Role.FieldWorker: ["view_inventory", "edit_profile"],
+}
+
+# Some role must always hold this, otherwise nobody could change role permissions again.
+ROLE_ADMIN_PERMISSION = "manage_roles"
+
+
+class PermissionStore:
+    """
+    In-memory copy of the role/permission tables, compiled to one int bitset per role.
+
+    Every permission name gets a bit, so checking whether a role holds a set of permissions is a
+    single AND against the role's mask. ``version`` changes on every reload so callers can cache
+    masks they compiled from permission names. The store is rebuilt from the database at
+    startup, after every role change made through this process, and periodically to pick up
+    changes made by other workers.
+    """
+
+    def __init__(self):
+        self.bits: Dict[str, int] = {}
+        self.masks: Dict[prisma.enums.Role, int] = {}
+        self.version = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def mask_for(self, names: List[str]) -> Optional[int]:
+        """
+        Returns the bitset for a list of permission names, or None if any name is unknown, since no
+        role can hold a permission that does not exist.
+        """
+        mask = 0
+        for name in names:
+            bit = self.bits.get(name)
+            if bit is None:
+                return None
+            mask |= bit
+        return mask
+
+    def permissions_of(self, role: prisma.enums.Role) -> List[str]:
+        mask = self.masks.get(role, 0)
+        return sorted(name for name, bit in self.bits.items() if mask & bit)
+
+    def allows(self, role: prisma.enums.Role, required: Optional[int]) -> bool:
+        if required is None:
+            return False
+        return self.masks.get(role, 0) & required == required
+
+    async def reload(self) -> None:
+        """
+        Rebuilds the bit assignments and role masks from the Permission and RolePermission tables.
+        """
+        async with self._lock:
+            permissions = await prisma.models.Permission.prisma().find_many(
+                order={"id": "asc"}
+            )
+            grants = await prisma.models.RolePermission.prisma().find_many()
+            bits = {
+                permission.name: 1 << position
+                for position, permission in enumerate(permissions)
+            }
+            names = {permission.id: permission.name for permission in permissions}
+            masks = {role: 0 for role in prisma.enums.Role}
+            for grant in grants:
+                masks[grant.role] |= bits[names[grant.permissionId]]
+            self.bits, self.masks = bits, masks
+            self.version += 1
+
+    async def ensure_defaults(self) -> None:
+        """
+        Seeds DEFAULT_ROLE_PERMISSIONS when no permissions exist yet, then loads the store.
+        """
+        if await prisma.models.Permission.prisma().count() == 0:
+            names = sorted(
+                {
+                    name
+                    for grants in DEFAULT_ROLE_PERMISSIONS.values()
+                    for name in grants
+                }
+            )
+            await prisma.models.Permission.prisma().create_many(
+                data=[{"name": name} for name in names], skip_duplicates=True
+            )
+            permissions = await prisma.models.Permission.prisma().find_many()
+            ids = {permission.name: permission.id for permission in permissions}
+            await prisma.models.RolePermission.prisma().create_many(
+                data=[
+                    {"role": role, "permissionId": ids[name]}
+                    for role, grants in DEFAULT_ROLE_PERMISSIONS.items()
+                    for name in grants
+                ],
+                skip_duplicates=True,
+            )
+        await self.reload()
+
+    async def grant(
+        self,
+        role: prisma.enums.Role,
+        names: List[str],
+        replace: bool = False,
+        caller_role: Optional[prisma.enums.Role] = None,
+        create: bool = False,
+    ) -> List[str]:
+        """
+        Grants permissions to a role and reloads the store. Changes are serialised across workers
+        so the check that some role still holds ROLE_ADMIN_PERMISSION cannot be raced.
+
+        Args:
+            role (prisma.enums.Role): Role to grant the permissions to.
+            names (List[str]): Permission names to grant.
+            replace (bool): Revoke the role's other permissions first.
+            caller_role (Optional[prisma.enums.Role]): Role of the user making the change, who may
+                not change their own role's permissions.
+            create (bool): Create permission names that do not exist yet instead of rejecting them.
+
+        Returns:
+            List[str]: The role's permissions after the change.
+
+        Raises:
+            HTTPException: 403 if ``role`` is the caller's own role, 400 if a name is unknown and
+                ``create`` is not set, 409 if no role would hold ROLE_ADMIN_PERMISSION afterwards.
+        """
+        if caller_role is not None and caller_role == role:
+            raise HTTPException(
+                status_code=403, detail="You cannot change your own role's permissions"
+            )
+        names = sorted({name.strip() for name in names if name.strip()})
+        async with prisma.get_client().tx() as transaction:
+            await transaction.query_raw(
+                "SELECT pg_advisory_xact_lock(hashtext('RolePermission'))"
+            )
+            if names and create:
+                await prisma.models.Permission.prisma(transaction).create_many(
+                    data=[{"name": name} for name in names], skip_duplicates=True
+                )
+            permissions = await prisma.models.Permission.prisma(transaction).find_many(
+                where={"name": {"in": names}}
+            )
+            unknown = set(names) - {permission.name for permission in permissions}
+            if unknown:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Unknown permissions: {}".format(", ".join(sorted(unknown))),
+                )
+            if replace:
+                await prisma.models.RolePermission.prisma(transaction).delete_many(
+                    where={"role": role}
+                )
+            if permissions:
+                await prisma.models.RolePermission.prisma(transaction).create_many(
+                    data=[
+                        {"role": role, "permissionId": permission.id}
+                        for permission in permissions
+                    ],
+                    skip_duplicates=True,
+                )
+            holders = await prisma.models.RolePermission.prisma(transaction).count(
+                where={"permission": {"is": {"name": ROLE_ADMIN_PERMISSION}}}
+            )
+            if not holders:
+                raise HTTPException(
+                    status_code=409,
+                    detail="At least one role must keep {}".format(
+                        ROLE_ADMIN_PERMISSION
+                    ),
+                )
+        await self.reload()
+        return self.permissions_of(role)
+
+    def start(self, interval: float = 60.0) -> None:
+        """
+        Starts a background task that reloads the store every ``interval`` seconds.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("Failed to reload role permissions")
+
+
+permission_store = PermissionStore()
+
+
+async def current_role(
+    claims: Optional[TokenClaims] = Depends(authenticate),
+) -> prisma.enums.Role:
+    """
+    Returns the role of the caller from their verified access token.
+
+    Raises:
+        HTTPException: 401 if the request has not been authenticated.
+    """
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return claims.role
+
+
+def require_permissions(*names: str) -> Callable:
+    """
+    Builds a FastAPI dependency that allows the request only if the caller's role holds every
+    named permission. The check is one bit test against the in-memory store; no query is made.
+
+    Args:
+        *names (str): Permission names the route requires.
+
+    Returns:
+        Callable: A dependency to use with ``Depends`` or a route's ``dependencies``.
+    """
+    required_names = list(names)
+    compiled: Dict[str, Optional[int]] = {"version": -1, "mask": None}
+
+    async def dependency(role: prisma.enums.Role = Depends(current_role)) -> None:
+        if compiled["version"] != permission_store.version:
+            compiled["mask"] = permission_store.mask_for(required_names)
+            compiled["version"] = permission_store.version
+        # A mask of None means a required permission does not exist, so nobody is allowed.
+        if compiled["mask"] is None or not permission_store.allows(
+            role, compiled["mask"]
+        ):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+
+    return dependency
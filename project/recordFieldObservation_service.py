@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+import project.fieldConditions
+
+
+class FieldObservationRequest(BaseModel):
+    """
+    A condition observed on a field, e.g. during a scouting walk.
+    """
+
+    condition: prisma.enums.FieldCondition
+    score: Optional[float] = None
+    note: Optional[str] = None
+    source: Optional[str] = None
+    observedAt: Optional[datetime] = None
+
+
+class FieldObservationResponse(BaseModel):
+    """
+    The stored observation and the field's current condition afterwards.
+    """
+
+    observationId: int
+    fieldId: int
+    observedAt: datetime
+    score: float
+    currentCondition: prisma.enums.FieldCondition
+
+
+async def recordFieldObservation(
+    fieldId: int, request: FieldObservationRequest
+) -> FieldObservationResponse:
+    """
+    Appends a condition observation to a field's history. Observations may be backdated; the
+    field's current condition only changes if no later observation exists.
+
+    Args:
+        fieldId (int): The observed field.
+        request (FieldObservationRequest): A condition observed on a field, e.g. during a scouting walk.
+
+    Returns:
+        FieldObservationResponse: The stored observation and the field's current condition afterwards.
+
+    Raises:
+        ValueError: If the field does not exist, the score is outside 0 to 1 or the observation is
+            dated in the future.
+
+    Example:
+        response = await recordFieldObservation(3, FieldObservationRequest(condition=prisma.enums.FieldCondition.Healthy, score=0.96, source="scouting"))
+        print(response)
+        > FieldObservationResponse(observationId=5120, fieldId=3, observedAt=datetime(2024, 5, 2, 14, 5), score=0.96, currentCondition='Healthy')
+    """
+    async with prisma.get_client().tx() as transaction:
+        field = await prisma.models.Field.prisma(transaction).find_unique(
+            where={"id": fieldId}
+        )
+        if field is None:
+            raise ValueError("No field found with ID {}".format(fieldId))
+        observation = await project.fieldConditions.record_observation(
+            transaction,
+            fieldId,
+            request.condition,
+            score=request.score,
+            source=request.source,
+            note=request.note,
+            observed_at=request.observedAt,
+        )
+        field = await prisma.models.Field.prisma(transaction).find_unique(
+            where={"id": fieldId}
+        )
+    return FieldObservationResponse(
+        observationId=observation.id,
+        fieldId=fieldId,
+        observedAt=observation.observedAt,
+        score=observation.score,
+        currentCondition=field.condition,
+    )
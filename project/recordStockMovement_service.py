@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+import project.stockLedger
+
+
+class StockMovementRequest(BaseModel):
+    """
+    A receipt, sale, adjustment or write-off of one inventory item.
+    """
+
+    kind: prisma.enums.MovementKind
+    quantity: int
+    occurredAt: Optional[datetime] = None
+    reference: Optional[str] = None
+    note: Optional[str] = None
+
+
+class StockMovementResponse(BaseModel):
+    """
+    The item's stock after the movement was recorded.
+    """
+
+    inventoryItemId: int
+    quantity: int
+    status: prisma.enums.InventoryStatus
+    version: int
+
+
+async def recordStockMovement(
+    itemId: int, request: StockMovementRequest
+) -> StockMovementResponse:
+    """
+    Appends a stock movement to the inventory ledger and updates the item's current quantity in the
+    same transaction. Movements are never edited or deleted; a mistake is corrected with an
+    adjustment. A movement dated in the past is allowed and is reflected in later "as of" reports.
+
+    Args:
+        itemId (int): The inventory item the movement belongs to.
+        request (StockMovementRequest): A receipt, sale, adjustment or write-off of one inventory item.
+
+    Returns:
+        StockMovementResponse: The item's stock after the movement was recorded.
+
+    Raises:
+        ValueError: If the item does not exist, the quantity does not fit the kind of movement, or the movement would take stock below zero.
+
+    Example:
+        response = await recordStockMovement(7, StockMovementRequest(kind="Receipt", quantity=200, reference="PO-1142"))
+        print(response)
+        > StockMovementResponse(inventoryItemId=7, quantity=260, status='InStock', version=12)
+    """
+    items = await project.stockLedger.record_movements(
+        [
+            project.stockLedger.StockMovementInput(
+                inventoryItemId=itemId, **request.model_dump()
+            )
+        ]
+    )
+    item = items[0]
+    return StockMovementResponse(
+        inventoryItemId=item.id,
+        quantity=item.quantity,
+        status=item.status,
+        version=item.version,
+    )
@@ -0,0 +1,418 @@
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import prisma
+import prisma.enums
+import prisma.errors
+import prisma.models
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class PunchEvent(BaseModel):
+    """
+    A single clock-in or clock-out from a kiosk. ``eventId`` is generated by the kiosk and reused on retries.
+    """
+
+    eventId: str
+    staffDetailsId: int
+    kind: prisma.enums.PunchKind
+    punchedAt: datetime
+    deviceId: Optional[str] = None
+
+
+class PunchBatchRequest(BaseModel):
+    """
+    A batch of punches uploaded by a kiosk.
+    """
+
+    punches: List[PunchEvent]
+
+
+class PunchBatchResponse(BaseModel):
+    """
+    How many punches of a batch were accepted for writing and how many were recognised as retries, and the event IDs of punches rejected because their staff member does not exist.
+    """
+
+    accepted: int
+    duplicates: int
+    rejected: List[str]
+    buffered: int
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def split_by_day(start: datetime, end: datetime) -> Iterable[Tuple[date, int]]:
+    """
+    Splits a shift into whole seconds worked per UTC day, so overnight shifts count on both days.
+    """
+    while start < end:
+        midnight = datetime.combine(
+            start.date() + timedelta(days=1), datetime.min.time(), timezone.utc
+        )
+        segment_end = min(end, midnight)
+        yield start.date(), int((segment_end - start).total_seconds())
+        start = segment_end
+
+
+def pair_punches(
+    punches: List[PunchEvent], clocked_in: Dict[int, Optional[datetime]]
+) -> Tuple[Dict[Tuple[int, date], int], Dict[int, Optional[datetime]]]:
+    """
+    Matches clock-ins with clock-outs per staff member, continuing from any shift that was left
+    open by an earlier batch.
+
+    A clock-out without an open shift and a second clock-in while one is open are kept as raw
+    punches but do not add hours; the later clock-in replaces the open one.
+
+    Args:
+        punches (List[PunchEvent]): New punches to fold in.
+        clocked_in (Dict[int, Optional[datetime]]): Open shift start per staff member before this batch.
+
+    Returns:
+        Tuple[Dict[Tuple[int, date], int], Dict[int, Optional[datetime]]]: Seconds worked per
+        (staff ID, day) and the open shift start per staff member after this batch.
+    """
+    worked: Dict[Tuple[int, date], int] = defaultdict(int)
+    open_shift = dict(clocked_in)
+    for punch in sorted(
+        punches, key=lambda p: (p.staffDetailsId, _as_utc(p.punchedAt))
+    ):
+        punched_at = _as_utc(punch.punchedAt)
+        if punch.kind == prisma.enums.PunchKind.ClockIn:
+            open_shift[punch.staffDetailsId] = punched_at
+            continue
+        started = open_shift.get(punch.staffDetailsId)
+        if started is None or started >= punched_at:
+            continue
+        for day, seconds in split_by_day(_as_utc(started), punched_at):
+            worked[(punch.staffDetailsId, day)] += seconds
+        open_shift[punch.staffDetailsId] = None
+    return worked, open_shift
+
+
+class PunchBuffer:
+    """
+    Collects kiosk punches in memory and writes them in bulk, either when ``max_batch`` punches
+    are waiting or every ``flush_interval`` seconds.
+
+    Retries are dropped three ways: against punches still waiting in the buffer, against a
+    bounded set of recently written event IDs, and finally against the unique ``eventId``
+    column with one ``IN`` query per flush. Each flush also folds the new punches into
+    ``StaffDailyHours`` so readers never rescan raw punches.
+
+    Punches for unknown staff members are rejected when they are added. If a batch still fails
+    to write, its punches are retried one by one: punches the database rejects as invalid are
+    logged and dropped so they cannot block the rest, and the others stay buffered.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        recent_size: int = 50000,
+    ):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.recent_size = recent_size
+        self._pending: Dict[str, PunchEvent] = {}
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._known_staff: Set[int] = set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def add(self, punches: List[PunchEvent]) -> Tuple[int, int, List[str]]:
+        """
+        Queues punches for writing and returns how many were accepted, how many were retries and
+        the event IDs of punches rejected because their staff member does not exist.
+        """
+        unknown = {
+            punch.staffDetailsId
+            for punch in punches
+            if punch.staffDetailsId not in self._known_staff
+        }
+        if unknown:
+            staff = await prisma.models.StaffDetails.prisma().find_many(
+                where={"id": {"in": sorted(unknown)}}
+            )
+            self._known_staff.update(record.id for record in staff)
+        accepted, duplicates, rejected = 0, 0, []
+        for punch in punches:
+            if punch.staffDetailsId not in self._known_staff:
+                rejected.append(punch.eventId)
+            elif punch.eventId in self._pending or punch.eventId in self._recent:
+                duplicates += 1
+            else:
+                self._pending[punch.eventId] = punch
+                accepted += 1
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        return accepted, duplicates, rejected
+
+    async def flush(self) -> int:
+        """
+        Writes every waiting punch in one transaction and updates the daily hours aggregate.
+
+        Returns:
+            int: Number of punches written. If the batch fails, punches are written one by one;
+            invalid ones are dropped and the rest are put back in the buffer if they still fail.
+        """
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            try:
+                written = await self._write(list(batch.values()))
+                done = list(batch)
+            except Exception:
+                logger.exception("Failed to write time punches; writing one by one")
+                written, done, retry = 0, [], {}
+                for event_id, punch in batch.items():
+                    try:
+                        written += await self._write([punch])
+                        done.append(event_id)
+                    except prisma.errors.DataError:
+                        logger.error(
+                            "Dropping time punch the database rejected: %s",
+                            punch.model_dump_json(),
+                        )
+                        done.append(event_id)
+                    except Exception:
+                        retry[event_id] = punch
+                if retry:
+                    logger.warning("Will retry %d time punches", len(retry))
+                    retry.update(self._pending)
+                    self._pending = retry
+            for event_id in done:
+                self._recent[event_id] = None
+            while len(self._recent) > self.recent_size:
+                self._recent.popitem(last=False)
+            return written
+
+    async def _write(self, punches: List[PunchEvent]) -> int:
+        async with prisma.get_client().tx() as transaction:
+            # Locking the staff rows serialises writers for the same staff across workers, so
+            # each sees the punches the others have committed before pairing.
+            staff = await prisma.models.StaffDetails.prisma(transaction).query_raw(
+                'SELECT * FROM "StaffDetails" WHERE id = ANY($1::int[]) '
+                "ORDER BY id FOR UPDATE",
+                sorted({punch.staffDetailsId for punch in punches}),
+            )
+            staff_ids = {record.id for record in staff}
+            for punch in punches:
+                if punch.staffDetailsId not in staff_ids:
+                    logger.error(
+                        "Dropping time punch for unknown staff member: %s",
+                        punch.model_dump_json(),
+                    )
+            existing = await prisma.models.TimePunch.prisma(transaction).find_many(
+                where={"eventId": {"in": [punch.eventId for punch in punches]}}
+            )
+            seen = {punch.eventId for punch in existing}
+            new_punches = [
+                punch
+                for punch in punches
+                if punch.eventId not in seen and punch.staffDetailsId in staff_ids
+            ]
+            if not new_punches:
+                return 0
+            persisted = await _load_overlapping_punches(transaction, new_punches)
+            await prisma.models.TimePunch.prisma(transaction).create_many(
+                data=[
+                    {
+                        "eventId": punch.eventId,
+                        "kind": punch.kind,
+                        "punchedAt": punch.punchedAt,
+                        "deviceId": punch.deviceId,
+                        "staffDetailsId": punch.staffDetailsId,
+                    }
+                    for punch in new_punches
+                ]
+            )
+            # Re-pair from the last persisted punch before the earliest new one, so a clock-out
+            # written before its clock-in still counts, and credit only the difference.
+            before, _ = pair_punches(persisted, {})
+            after, open_shift = pair_punches(persisted + new_punches, {})
+            worked = {
+                key: after.get(key, 0) - before.get(key, 0)
+                for key in after.keys() | before.keys()
+                if after.get(key, 0) != before.get(key, 0)
+            }
+            if worked:
+                await _add_worked_seconds(transaction, worked)
+            await _set_clocked_in(
+                transaction,
+                {
+                    staff_id: open_shift.get(staff_id)
+                    for staff_id in {punch.staffDetailsId for punch in new_punches}
+                },
+            )
+            return len(new_punches)
+
+    def start(self) -> None:
+        """
+        Starts the periodic background flush.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the periodic flush and writes anything still buffered.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+async def _load_overlapping_punches(
+    client: prisma.Prisma, punches: List[PunchEvent]
+) -> List[PunchEvent]:
+    """
+    Loads each staff member's persisted punches from the last one before their earliest new punch
+    onwards; pairing those decides every shift the new punches can change.
+    """
+    first: Dict[int, datetime] = {}
+    for punch in punches:
+        punched_at = _as_utc(punch.punchedAt)
+        if (
+            punch.staffDetailsId not in first
+            or punched_at < first[punch.staffDetailsId]
+        ):
+            first[punch.staffDetailsId] = punched_at
+    staff_ids = sorted(first)
+    rows = await prisma.models.TimePunch.prisma(client).query_raw(
+        'SELECT p.* FROM "TimePunch" p '
+        "JOIN unnest($1::int[], $2::timestamp[]) AS v(id, first) "
+        'ON p."staffDetailsId" = v.id '
+        'WHERE p."punchedAt" >= COALESCE((SELECT MAX(q."punchedAt") FROM "TimePunch" q '
+        'WHERE q."staffDetailsId" = v.id AND q."punchedAt" < v.first), v.first)',
+        staff_ids,
+        [first[staff_id].replace(tzinfo=None).isoformat() for staff_id in staff_ids],
+    )
+    return [
+        PunchEvent(
+            eventId=row.eventId,
+            staffDetailsId=row.staffDetailsId,
+            kind=row.kind,
+            punchedAt=row.punchedAt,
+            deviceId=row.deviceId,
+        )
+        for row in rows
+    ]
+
+
+async def _add_worked_seconds(
+    client: prisma.Prisma, worked: Dict[Tuple[int, date], int]
+) -> None:
+    values = []
+    params: list = []
+    for (staff_id, day), seconds in worked.items():
+        n = len(params)
+        values.append("(${}::int, ${}::date, ${}::int)".format(n + 1, n + 2, n + 3))
+        params.extend([staff_id, day.isoformat(), seconds])
+    await client.execute_raw(
+        'INSERT INTO "StaffDailyHours" ("staffDetailsId", "day", "workedSeconds") '
+        "VALUES {} "
+        'ON CONFLICT ("staffDetailsId", "day") DO UPDATE '
+        'SET "workedSeconds" = "StaffDailyHours"."workedSeconds" + EXCLUDED."workedSeconds"'.format(
+            ", ".join(values)
+        ),
+        *params,
+    )
+
+
+async def _set_clocked_in(
+    client: prisma.Prisma, open_shift: Dict[int, Optional[datetime]]
+) -> None:
+    values = []
+    params: list = []
+    for staff_id, started in open_shift.items():
+        n = len(params)
+        values.append("(${}::int, ${}::timestamp)".format(n + 1, n + 2))
+        params.extend(
+            [
+                staff_id,
+                _as_utc(started).replace(tzinfo=None).isoformat() if started else None,
+            ]
+        )
+    await client.execute_raw(
+        'UPDATE "StaffDetails" AS s SET "clockedInAt" = v.started '
+        "FROM (VALUES {}) AS v(id, started) WHERE s.id = v.id".format(
+            ", ".join(values)
+        ),
+        *params,
+    )
+
+
+async def load_worked_hours(
+    start: date, end: date, staff_ids: Optional[List[int]] = None
+) -> Dict[int, float]:
+    """
+    Sums worked hours per staff member over ``[start, end)`` from the daily aggregate.
+
+    Args:
+        start (date): First day to include.
+        end (date): Day after the last day to include.
+        staff_ids (Optional[List[int]]): Restrict to these staff members; all staff when omitted.
+
+    Returns:
+        Dict[int, float]: Hours worked keyed by staff details ID.
+    """
+    query = (
+        'SELECT "staffDetailsId", SUM("workedSeconds")::bigint AS seconds '
+        'FROM "StaffDailyHours" WHERE "day" >= $1::date AND "day" < $2::date'
+    )
+    params: list = [start.isoformat(), end.isoformat()]
+    if staff_ids is not None:
+        query += ' AND "staffDetailsId" = ANY($3::int[])'
+        params.append(staff_ids)
+    rows = await prisma.get_client().query_raw(
+        query + ' GROUP BY "staffDetailsId"', *params
+    )
+    return {row["staffDetailsId"]: int(row["seconds"]) / 3600 for row in rows}
+
+
+punch_buffer = PunchBuffer()
+
+
+async def recordTimePunches(request: PunchBatchRequest) -> PunchBatchResponse:
+    """
+    Accepts a batch of clock-in/out punches from a kiosk. Punches are buffered and written in bulk,
+    retried punches with a known ``eventId`` are ignored, punches for unknown staff members are
+    rejected, and worked hours per staff member per day are updated as each buffer is written.
+
+    Args:
+        request (PunchBatchRequest): A batch of punches uploaded by a kiosk.
+
+    Returns:
+        PunchBatchResponse: How many punches of a batch were accepted for writing and how many were recognised as retries.
+    """
+    accepted, duplicates, rejected = await punch_buffer.add(request.punches)
+    return PunchBatchResponse(
+        accepted=accepted,
+        duplicates=duplicates,
+        rejected=rejected,
+        buffered=len(punch_buffer),
+    )
@@ -1,42 +1,45 @@
-from datetime import datetime, timedelta
-from os import getenv
-
-import jwt
 from pydantic import BaseModel
 
+import project.auth
+import project.refreshTokens
+
+
+class AuthRefreshRequest(BaseModel):
+    """
+    The refresh token to exchange, sent in the body so it stays out of URLs and access logs.
+    """
+
+    refreshToken: str
+
 
 class AuthRefreshResponse(BaseModel):
     """
-    Model to return a new JWT after the previous token was validated. Ensures continuous user session without re-login.
+    Model to return a new JWT and the next refresh token after the previous refresh token was validated. Ensures continuous user session without re-login.
     """
 
     newToken: str
+    refreshToken: str
 
 
-def refreshSession(Authorization: str) -> AuthRefreshResponse:
+async def refreshSession(request: AuthRefreshRequest) -> AuthRefreshResponse:
     """
-    Refreshes the authentication session by issuing a new token. Requires a valid JWT in the request header. Helps maintain user session continuity safely.
+    Refreshes the authentication session by issuing a new access token. Requires the current refresh token of the session's
+    rotation family, which is exchanged for the next one. Presenting a refresh token that was already used revokes the whole
+    family, so a stolen token stops working as soon as either party uses it.
 
     Args:
-        Authorization (str): The JWT used for verifying the user's current session. This token should be included in the request headers.
+        request (AuthRefreshRequest): The refresh token returned by the last login or refresh.
 
     Returns:
-        AuthRefreshResponse: Model to return a new JWT after the previous token was validated. Ensures continuous user session without re-login.
+        AuthRefreshResponse: Model to return a new JWT and the next refresh token after the previous refresh token was validated.
 
     Raises:
-        Exception: If the token is invalid, expired, or nearing expiry.
+        HTTPException: If the refresh token is invalid, expired, revoked or reused.
     """
-    SECRET_KEY = getenv("JWT_SECRET_KEY", "")
-    try:
-        decoded_token = jwt.decode(Authorization, SECRET_KEY, algorithms=["HS256"])
-        new_jwt_payload = {
-            "user_id": decoded_token.get("user_id"),
-            "iat": datetime.utcnow(),
-            "exp": datetime.utcnow() + timedelta(days=1),
-        }
-        new_token = jwt.encode(new_jwt_payload, SECRET_KEY, algorithm="HS256")
-        return AuthRefreshResponse(newToken=new_token)
-    except jwt.ExpiredSignatureError:
-        raise Exception("The provided token has expired.")
-    except jwt.InvalidTokenError:
-        raise Exception("Invalid token provided.")
+    user_id, role, next_refresh_token = (
+        await project.refreshTokens.rotate_refresh_token(request.refreshToken)
+    )
+    return AuthRefreshResponse(
+        newToken=project.auth.issue_token(user_id, role),
+        refreshToken=next_refresh_token,
+    )
@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from os import getenv
+from typing import NamedTuple, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.models
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_TTL = timedelta(days=int(getenv("REFRESH_TOKEN_TTL_DAYS", "14")))
+PURGE_BATCH_SIZE = 1000
+
+
+class FamilyRecord(NamedTuple):
+    """
+    Cached state of one refresh token family.
+    """
+
+    user_id: int
+    role: prisma.enums.Role
+    current_hash: str
+    expires_at: float
+    revoked: bool
+
+
+def hash_token(secret: str) -> str:
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+def split_token(token: str) -> Tuple[str, str]:
+    """
+    Splits a refresh token into its family ID and secret.
+
+    Raises:
+        HTTPException: 401 if the token is malformed.
+    """
+    family_id, _, secret = token.partition(".")
+    if not family_id or not secret:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return family_id, secret
+
+
+class FamilyCache:
+    """
+    Bounded LRU of refresh token families with a per-entry TTL, so hot refreshes skip the lookup
+    query. The cache is only a read-through hint: rotation itself is a conditional update in the
+    database, so a stale entry can never let a reused token through.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, FamilyRecord]]" = OrderedDict()
+
+    def get(self, family_id: str) -> Optional[FamilyRecord]:
+        entry = self._entries.get(family_id)
+        if entry is None:
+            return None
+        cached_at, record = entry
+        if time.monotonic() - cached_at > self.ttl:
+            del self._entries[family_id]
+            return None
+        self._entries.move_to_end(family_id)
+        return record
+
+    def put(self, family_id: str, record: FamilyRecord) -> None:
+        self._entries[family_id] = (time.monotonic(), record)
+        self._entries.move_to_end(family_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, family_id: str) -> None:
+        self._entries.pop(family_id, None)
+
+
+family_cache = FamilyCache()
+
+
+async def _load_family(family_id: str) -> Optional[FamilyRecord]:
+    family = await prisma.models.RefreshTokenFamily.prisma().find_unique(
+        where={"id": family_id}, include={"user": True}
+    )
+    if family is None or family.user is None:
+        return None
+    record = FamilyRecord(
+        user_id=family.userId,
+        role=family.user.role,
+        current_hash=family.currentHash,
+        expires_at=family.expiresAt.timestamp(),
+        revoked=family.revokedAt is not None,
+    )
+    family_cache.put(family_id, record)
+    return record
+
+
+async def issue_refresh_token(user_id: int, role: prisma.enums.Role) -> str:
+    """
+    Starts a new refresh token family for a login and returns its first token.
+
+    Tokens are ``<family ID>.<secret>``; only the SHA-256 of the secret is stored, and each family
+    keeps just its current hash, so a device adds one row no matter how often it refreshes.
+    """
+    family_id = uuid.uuid4().hex
+    secret = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    expires_at = now + REFRESH_TOKEN_TTL
+    await prisma.models.RefreshTokenFamily.prisma().create(
+        data={
+            "id": family_id,
+            "currentHash": hash_token(secret),
+            "expiresAt": expires_at,
+            "rotatedAt": now,
+            "userId": user_id,
+        }
+    )
+    family_cache.put(
+        family_id,
+        FamilyRecord(user_id, role, hash_token(secret), expires_at.timestamp(), False),
+    )
+    return "{}.{}".format(family_id, secret)
+
+
+async def revoke_family(family_id: str) -> None:
+    await prisma.models.RefreshTokenFamily.prisma().update_many(
+        where={"id": family_id, "revokedAt": None},
+        data={"revokedAt": datetime.now(timezone.utc)},
+    )
+    family_cache.discard(family_id)
+
+
+async def rotate_refresh_token(token: str) -> Tuple[int, prisma.enums.Role, str]:
+    """
+    Exchanges a refresh token for the next one in its family.
+
+    Presenting a token that is not the family's current one means it was already used, so the
+    whole family is revoked and the caller has to log in again. The role is read from the user
+    row by the rotating update itself, so a role change applies from the next refresh even while
+    the family is cached.
+
+    Args:
+        token (str): The refresh token presented by the client.
+
+    Returns:
+        Tuple[int, prisma.enums.Role, str]: The user ID, their role and the new refresh token.
+
+    Raises:
+        HTTPException: 401 if the token is invalid, expired, revoked or reused.
+    """
+    family_id, secret = split_token(token)
+    presented_hash = hash_token(secret)
+    record = family_cache.get(family_id)
+    if record is None or not hmac.compare_digest(record.current_hash, presented_hash):
+        record = await _load_family(family_id)
+    if record is None or record.revoked:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    if record.expires_at <= time.time():
+        raise HTTPException(status_code=401, detail="Refresh token has expired")
+    if not hmac.compare_digest(record.current_hash, presented_hash):
+        await revoke_family(family_id)
+        logger.warning("Refresh token reuse detected for family %s", family_id)
+        raise HTTPException(status_code=401, detail="Refresh token reuse detected")
+    new_secret = secrets.token_urlsafe(32)
+    new_hash = hash_token(new_secret)
+    now = datetime.now(timezone.utc)
+    expires_at = now + REFRESH_TOKEN_TTL
+    rotated = await prisma.get_client().query_raw(
+        'UPDATE "RefreshTokenFamily" f SET "currentHash" = $3, "rotatedAt" = $4::timestamp, '
+        '"expiresAt" = $5::timestamp FROM "User" u '
+        'WHERE f.id = $1 AND f."currentHash" = $2 AND f."revokedAt" IS NULL '
+        'AND u.id = f."userId" RETURNING u."role"::text AS role',
+        family_id,
+        presented_hash,
+        new_hash,
+        now.replace(tzinfo=None).isoformat(),
+        expires_at.replace(tzinfo=None).isoformat(),
+    )
+    if not rotated:
+        await revoke_family(family_id)
+        logger.warning("Refresh token reuse detected for family %s", family_id)
+        raise HTTPException(status_code=401, detail="Refresh token reuse detected")
+    role = prisma.enums.Role(rotated[0]["role"])
+    family_cache.put(
+        family_id,
+        FamilyRecord(record.user_id, role, new_hash, expires_at.timestamp(), False),
+    )
+    return record.user_id, role, "{}.{}".format(family_id, new_secret)
+
+
+async def revoke_refresh_token(token: str, user_id: int) -> None:
+    """
+    Revokes the family of a refresh token presented at logout, after checking that the token is
+    the family's current one and belongs to the caller.
+
+    Raises:
+        HTTPException: 401 if the token is malformed, unknown, not current or owned by another user.
+    """
+    family_id, secret = split_token(token)
+    record = await _load_family(family_id)
+    if (
+        record is None
+        or record.user_id != user_id
+        or not hmac.compare_digest(record.current_hash, hash_token(secret))
+    ):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    await revoke_family(family_id)
+
+
+async def purge_expired_families(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """
+    Deletes expired or revoked families in batches so no single statement holds long locks.
+
+    Returns:
+        int: Number of families deleted.
+    """
+    client = prisma.get_client()
+    total = 0
+    while True:
+        deleted = await client.execute_raw(
+            'DELETE FROM "RefreshTokenFamily" WHERE id IN ('
+            'SELECT id FROM "RefreshTokenFamily" '
+            'WHERE "expiresAt" < NOW() OR "revokedAt" < NOW() - INTERVAL \'1 day\' '
+            "LIMIT $1)",
+            batch_size,
+        )
+        total += deleted
+        if deleted < batch_size:
+            return total
+        await asyncio.sleep(0)
+
+
+class FamilyPurger:
+    """
+    Background task that periodically purges expired refresh token families.
+    """
+
+    def __init__(self, interval: float = 3600.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                purged = await purge_expired_families()
+                if purged:
+                    logger.info("Purged %d expired refresh token families", purged)
+            except Exception:
+                logger.exception("Failed to purge refresh token families")
+
+
+family_purger = FamilyPurger()
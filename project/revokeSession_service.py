@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel
+
+import project.auth
+import project.refreshTokens
+
+
+class RevokeSessionRequest(BaseModel):
+    """
+    The session's refresh token, if the client has one, sent in the body so it stays out of URLs and access logs.
+    """
+
+    refreshToken: Optional[str] = None
+
+
+class RevokeSessionResponse(BaseModel):
+    """
+    Confirms that the caller's access token has been revoked.
+    """
+
+    success: bool
+    message: str
+
+
+async def revokeSession(
+    claims: project.auth.TokenClaims, request: Optional[RevokeSessionRequest] = None
+) -> RevokeSessionResponse:
+    """
+    Logs the caller out by revoking their current access token. The token ID is stored until the
+    token would have expired and is added to every worker's in-memory revocation set. When the
+    session's refresh token is given, its whole rotation family is revoked too, provided the token
+    is the family's current one and belongs to the caller.
+
+    Args:
+        claims (project.auth.TokenClaims): Verified claims of the caller's token.
+        request (Optional[RevokeSessionRequest]): The session's refresh token, if the client has one.
+
+    Returns:
+        RevokeSessionResponse: Confirms that the caller's access token has been revoked.
+
+    Raises:
+        HTTPException: 401 if the refresh token is invalid or belongs to another user.
+    """
+    if request is not None and request.refreshToken:
+        await project.refreshTokens.revoke_refresh_token(
+            request.refreshToken, claims.userId
+        )
+    await project.auth.revocation_list.revoke(
+        claims.jti, datetime.fromtimestamp(claims.exp, timezone.utc)
+    )
+    return RevokeSessionResponse(success=True, message="Session revoked.")
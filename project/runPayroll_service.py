@@ -0,0 +1,211 @@
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import prisma
+import prisma.models
+from pydantic import BaseModel
+
+import project.recordTimePunches_service
+
+DAYS_PER_YEAR = 365.0
+
+
+class PayrollRunResponse(BaseModel):
+    """
+    Totals of a completed payroll run for a pay period.
+    """
+
+    runId: int
+    periodStart: datetime
+    periodEnd: datetime
+    employeeCount: int
+    totalGross: float
+    totalWithholding: float
+    totalNet: float
+
+
+class TaxTable:
+    """
+    Progressive brackets for one tax code, precomputed so the tax on any income is a bisect plus
+    one multiply-add: ``base[i] + rate[i] * (income - threshold[i])``.
+    """
+
+    __slots__ = ("thresholds", "rates", "base")
+
+    def __init__(self, brackets: List[Tuple[float, float]]):
+        brackets = sorted(brackets)
+        if not brackets or brackets[0][0] > 0:
+            brackets.insert(0, (0.0, 0.0))
+        self.thresholds = array("d", [threshold for threshold, _ in brackets])
+        self.rates = array("d", [rate for _, rate in brackets])
+        self.base = array("d", [0.0])
+        for i in range(1, len(brackets)):
+            self.base.append(
+                self.base[i - 1]
+                + self.rates[i - 1] * (self.thresholds[i] - self.thresholds[i - 1])
+            )
+
+    def tax(self, incomes: List[float]) -> List[float]:
+        """
+        Computes the tax owed on each annual income in one pass.
+        """
+        thresholds, rates, base = self.thresholds, self.rates, self.base
+        owed = []
+        for income in incomes:
+            i = bisect_right(thresholds, income) - 1
+            owed.append(
+                base[i] + rates[i] * (income - thresholds[i]) if i >= 0 else 0.0
+            )
+        return owed
+
+
+async def compile_tax_tables() -> Dict[str, TaxTable]:
+    """
+    Loads every TaxRule once and compiles it into a TaxTable per tax code.
+    """
+    rules = await prisma.models.TaxRule.prisma().find_many()
+    brackets: Dict[str, List[Tuple[float, float]]] = defaultdict(list)
+    for rule in rules:
+        brackets[rule.taxCode].append((rule.threshold, rule.rate))
+    return {code: TaxTable(rows) for code, rows in brackets.items()}
+
+
+def compute_pay(
+    salaries: array,
+    hourly_pay: array,
+    tax_codes: List[str],
+    tables: Dict[str, TaxTable],
+    period_fraction: float,
+) -> Tuple[array, array, array]:
+    """
+    Computes gross, withholding and net pay column-wise for every employee in the run.
+
+    Employees are grouped by tax code so each compiled table is applied to its whole group at
+    once, then the results are scattered back into the output columns. Withholding is computed
+    on the period's gross pay annualised, so hourly earnings fall in the right bracket.
+
+    Args:
+        salaries (array): Annual salary per employee.
+        hourly_pay (array): Hourly earnings for the period per employee.
+        tax_codes (List[str]): Tax code per employee, aligned with ``salaries``.
+        tables (Dict[str, TaxTable]): Compiled tax tables keyed by tax code.
+        period_fraction (float): Fraction of the year covered by the pay period.
+
+    Returns:
+        Tuple[array, array, array]: Gross, withholding and net pay per employee, rounded to cents.
+    """
+    gross = array(
+        "d",
+        (
+            round(salary * period_fraction + hourly, 2)
+            for salary, hourly in zip(salaries, hourly_pay)
+        ),
+    )
+    withholding = array("d", bytes(8 * len(salaries)))
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for pos, code in enumerate(tax_codes):
+        groups[code].append(pos)
+    for code, positions in groups.items():
+        annual_tax = tables[code].tax(
+            [gross[pos] / period_fraction for pos in positions]
+        )
+        for pos, owed in zip(positions, annual_tax):
+            withholding[pos] = round(owed * period_fraction, 2)
+    net = array("d", (g - w for g, w in zip(gross, withholding)))
+    return gross, withholding, net
+
+
+async def runPayroll(periodStart: datetime, periodEnd: datetime) -> PayrollRunResponse:
+    """
+    Runs payroll for every staff member with a payroll record over the given pay period. Gross pay
+    is the salary prorated to the period plus hours from the time clock at the hourly rate, withholding comes from the compiled TaxRule brackets for
+    each employee's tax code, and all entries are written with one bulk insert. Running the same
+    period again replaces the earlier results instead of duplicating them.
+
+    Args:
+        periodStart (datetime): First day of the pay period.
+        periodEnd (datetime): Day after the last day of the pay period.
+
+    Returns:
+        PayrollRunResponse: Totals of a completed payroll run for a pay period.
+
+    Raises:
+        ValueError: If the period is empty or an employee has a tax code with no rules.
+    """
+    if periodEnd <= periodStart:
+        raise ValueError("periodEnd must be after periodStart")
+    period_fraction = (periodEnd - periodStart).total_seconds() / (
+        DAYS_PER_YEAR * 86400
+    )
+    tables = await compile_tax_tables()
+    payrolls = await prisma.models.Payroll.prisma().find_many(
+        order={"staffDetailsId": "asc"}
+    )
+    unknown_codes = sorted({p.taxCode for p in payrolls} - set(tables))
+    if unknown_codes:
+        raise ValueError("No tax rules for tax code(s): {}".format(unknown_codes))
+    staff_ids = [payroll.staffDetailsId for payroll in payrolls]
+    tax_codes = [payroll.taxCode for payroll in payrolls]
+    salaries = array("d", (payroll.salary for payroll in payrolls))
+    hours = await project.recordTimePunches_service.load_worked_hours(
+        periodStart.date(), periodEnd.date()
+    )
+    hourly_pay = array(
+        "d",
+        (
+            (payroll.hourlyRate or 0.0) * hours.get(payroll.staffDetailsId, 0.0)
+            for payroll in payrolls
+        ),
+    )
+    gross, withholding, net = compute_pay(
+        salaries, hourly_pay, tax_codes, tables, period_fraction
+    )
+    totals = {
+        "totalGross": round(sum(gross), 2),
+        "totalWithholding": round(sum(withholding), 2),
+        "totalNet": round(sum(net), 2),
+    }
+    async with prisma.get_client().tx() as transaction:
+        run = await prisma.models.PayrollRun.prisma(transaction).upsert(
+            where={
+                "periodStart_periodEnd": {
+                    "periodStart": periodStart,
+                    "periodEnd": periodEnd,
+                }
+            },
+            data={
+                "create": {
+                    "periodStart": periodStart,
+                    "periodEnd": periodEnd,
+                    **totals,
+                },
+                "update": totals,
+            },
+        )
+        await prisma.models.PayrollEntry.prisma(transaction).delete_many(
+            where={"payrollRunId": run.id}
+        )
+        if staff_ids:
+            await prisma.models.PayrollEntry.prisma(transaction).create_many(
+                data=[
+                    {
+                        "payrollRunId": run.id,
+                        "staffDetailsId": staff_ids[pos],
+                        "taxCode": tax_codes[pos],
+                        "grossPay": gross[pos],
+                        "withholding": withholding[pos],
+                        "netPay": round(net[pos], 2),
+                    }
+                    for pos in range(len(staff_ids))
+                ]
+            )
+    return PayrollRunResponse(
+        runId=run.id,
+        periodStart=periodStart,
+        periodEnd=periodEnd,
+        employeeCount=len(staff_ids),
+        **totals,
+    )
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import math
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.models
+
+logger = logging.getLogger(__name__)
+
+
+class GrowthCurve(NamedTuple):
+    """
+    Height of a tree by age in seasons: ``initial`` feet when planted, no growth during the
+    ``establishment`` seasons while roots settle, then ``rate`` feet per season.
+    """
+
+    initial: float
+    establishment: int
+    rate: float
+
+    def height(self, age: int) -> float:
+        return self.initial + self.rate * max(0, age - self.establishment)
+
+    def age_at(self, height: float) -> int:
+        """
+        Returns the first season, counted from planting, in which a tree is at least ``height``.
+        """
+        if height <= self.initial:
+            return 0
+        return self.establishment + math.ceil((height - self.initial) / self.rate)
+
+
+# Growth curves of common Christmas tree species, matched against the name of the sapling's
+# inventory item. Names matching none of them use DEFAULT_GROWTH.
+SPECIES_GROWTH: Dict[str, GrowthCurve] = {
+    "fraser": GrowthCurve(1.0, 2, 0.9),
+    "noble": GrowthCurve(1.0, 2, 0.8),
+    "balsam": GrowthCurve(1.0, 2, 1.0),
+    "douglas": GrowthCurve(1.0, 1, 1.1),
+    "spruce": GrowthCurve(1.0, 2, 1.0),
+    "scotch": GrowthCurve(1.0, 1, 1.3),
+    "pine": GrowthCurve(1.0, 1, 1.2),
+}
+DEFAULT_GROWTH = GrowthCurve(1.0, 2, 1.0)
+
+
+def growth_curve(species_name: str) -> GrowthCurve:
+    name = species_name.lower()
+    for keyword, curve in SPECIES_GROWTH.items():
+        if keyword in name:
+            return curve
+    return DEFAULT_GROWTH
+
+
+class CohortTable:
+    """
+    Per-worker copy of the SaplingCohort table: how many trees of each species, planted in which
+    year, stand in each field.
+
+    Cohorts are held column-wise in parallel typed arrays, so aggregate queries are tight loops over
+    a few compact buffers, and growth curves are evaluated once per species rather than once per
+    cohort. Schedule completions write changed cohorts through to the table; a background task
+    reloads it every ``interval`` seconds to pick up changes made by other workers.
+    """
+
+    def __init__(self):
+        self.field_ids = array("i")
+        self.species_ids = array("i")
+        self.planted_years = array("h")
+        self.counts = array("i")
+        self.positions: Dict[Tuple[int, int, int], int] = {}
+        self.species_names: Dict[int, str] = {}
+        self.loaded = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Cohorts written through while a reload is reading the table, replayed onto its result.
+        self._written: Optional[List[prisma.models.SaplingCohort]] = None
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def apply(self, cohorts: List[prisma.models.SaplingCohort]) -> None:
+        """
+        Inserts or updates cohorts written by a schedule completion.
+        """
+        if self._written is not None:
+            self._written.extend(cohorts)
+        self._apply(cohorts)
+
+    def _apply(self, cohorts: List[prisma.models.SaplingCohort]) -> None:
+        for cohort in cohorts:
+            key = (cohort.fieldId, cohort.inventoryItemId, cohort.plantedYear)
+            position = self.positions.get(key)
+            if position is None:
+                self.positions[key] = len(self.counts)
+                self.field_ids.append(cohort.fieldId)
+                self.species_ids.append(cohort.inventoryItemId)
+                self.planted_years.append(cohort.plantedYear)
+                self.counts.append(cohort.count)
+            else:
+                self.counts[position] = cohort.count
+
+    def curves(self) -> Dict[int, GrowthCurve]:
+        return {
+            species_id: growth_curve(name)
+            for species_id, name in self.species_names.items()
+        }
+
+    def reaching(
+        self,
+        height: float,
+        first_season: int,
+        last_season: int,
+        field_id: Optional[int] = None,
+        species_id: Optional[int] = None,
+    ) -> Tuple[int, List[int]]:
+        """
+        Counts trees by the season in which they first reach ``height``.
+
+        Returns:
+            Tuple[int, List[int]]: Trees already at that height before ``first_season``, and the
+            trees reaching it in each season from ``first_season`` to ``last_season``.
+        """
+        ages = {
+            species: curve.age_at(height) for species, curve in self.curves().items()
+        }
+        default_age = DEFAULT_GROWTH.age_at(height)
+        earlier = 0
+        by_season = [0] * (last_season - first_season + 1)
+        for field, species, planted, count in zip(
+            self.field_ids, self.species_ids, self.planted_years, self.counts
+        ):
+            if not count:
+                continue
+            if field_id is not None and field != field_id:
+                continue
+            if species_id is not None and species != species_id:
+                continue
+            season = planted + ages.get(species, default_age)
+            if season < first_season:
+                earlier += count
+            elif season <= last_season:
+                by_season[season - first_season] += count
+        return earlier, by_season
+
+    async def load(self) -> None:
+        """
+        Rebuilds the table from the database. Completions written through while the query runs may
+        have committed after it started reading, so they are replayed onto the result unless the
+        loaded row is newer.
+        """
+        async with self._lock:
+            self._written = []
+            try:
+                cohorts = await prisma.models.SaplingCohort.prisma().find_many(
+                    where={"count": {"gt": 0}},
+                    include={"inventoryItem": True},
+                    order={"id": "asc"},
+                )
+            finally:
+                written, self._written = self._written, None
+            loaded_at = {
+                (cohort.fieldId, cohort.inventoryItemId, cohort.plantedYear): (
+                    cohort.updatedAt
+                )
+                for cohort in cohorts
+            }
+            replayed = [
+                cohort
+                for cohort in written
+                if cohort.updatedAt
+                >= loaded_at.get(
+                    (cohort.fieldId, cohort.inventoryItemId, cohort.plantedYear),
+                    cohort.updatedAt,
+                )
+            ]
+            names = self.species_names
+            self.field_ids = array("i")
+            self.species_ids = array("i")
+            self.planted_years = array("h")
+            self.counts = array("i")
+            self.positions = {}
+            self.species_names = {
+                cohort.inventoryItemId: cohort.inventoryItem.name for cohort in cohorts
+            }
+            for cohort in replayed:
+                if cohort.inventoryItemId in names:
+                    self.species_names.setdefault(
+                        cohort.inventoryItemId, names[cohort.inventoryItemId]
+                    )
+            self._apply(cohorts)
+            self._apply(replayed)
+            self.loaded = True
+
+    def start(self, interval: float = 60.0) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Failed to refresh sapling cohorts")
+
+
+cohort_table = CohortTable()
+
+
+async def record_planting(
+    transaction: prisma.Prisma,
+    field_id: int,
+    species_id: int,
+    planted_year: int,
+    count: int,
+) -> List[prisma.models.SaplingCohort]:
+    """
+    Adds planted trees to their cohort inside the caller's transaction.
+
+    Raises:
+        ValueError: If the count is not positive or the item is not a sapling.
+    """
+    if count <= 0:
+        raise ValueError("treeCount must be positive")
+    # FOR SHARE keeps the item from being deleted until the planting commits.
+    species = await prisma.models.InventoryItem.prisma(transaction).query_first(
+        'SELECT * FROM "InventoryItem" WHERE id = $1::int AND "deletedAt" IS NULL FOR SHARE',
+        species_id,
+    )
+    if species is None or species.type != prisma.enums.InventoryType.Sapling:
+        raise ValueError("Inventory item {} is not a sapling".format(species_id))
+    cohort_table.species_names[species_id] = species.name
+    return await prisma.models.SaplingCohort.prisma(transaction).query_raw(
+        'INSERT INTO "SaplingCohort" ("fieldId", "inventoryItemId", "plantedYear", "count", '
+        '"updatedAt") VALUES ($1::int, $2::int, $3::int, $4::int, NOW()) '
+        'ON CONFLICT ("fieldId", "inventoryItemId", "plantedYear") DO UPDATE SET '
+        '"count" = "SaplingCohort"."count" + EXCLUDED."count", "updatedAt" = NOW() '
+        "RETURNING *",
+        field_id,
+        species_id,
+        planted_year,
+        count,
+    )
+
+
+async def record_harvest(
+    transaction: prisma.Prisma,
+    field_id: int,
+    species_id: int,
+    count: int,
+    planted_year: Optional[int] = None,
+) -> List[prisma.models.SaplingCohort]:
+    """
+    Removes harvested trees from a field inside the caller's transaction, from the given cohort or,
+    without ``planted_year``, from the oldest cohorts first.
+
+    Raises:
+        ValueError: If the count is not positive or the field holds fewer such trees.
+    """
+    if count <= 0:
+        raise ValueError("treeCount must be positive")
+    cohorts = await prisma.models.SaplingCohort.prisma(transaction).query_raw(
+        'SELECT * FROM "SaplingCohort" WHERE "fieldId" = $1::int '
+        'AND "inventoryItemId" = $2::int AND "count" > 0 '
+        'AND ($3::int IS NULL OR "plantedYear" = $3) '
+        'ORDER BY "plantedYear", id FOR UPDATE',
+        field_id,
+        species_id,
+        planted_year,
+    )
+    available = sum(cohort.count for cohort in cohorts)
+    if available < count:
+        raise ValueError(
+            "Field {} holds only {} such trees, cannot harvest {}".format(
+                field_id, available, count
+            )
+        )
+    ids: List[int] = []
+    taken: List[int] = []
+    remaining = count
+    for cohort in cohorts:
+        if not remaining:
+            break
+        take = min(cohort.count, remaining)
+        ids.append(cohort.id)
+        taken.append(take)
+        remaining -= take
+    return await prisma.models.SaplingCohort.prisma(transaction).query_raw(
+        'UPDATE "SaplingCohort" c SET "count" = c."count" - t.taken, "updatedAt" = NOW() '
+        "FROM unnest($1::int[], $2::int[]) AS t(id, taken) WHERE c.id = t.id RETURNING c.*",
+        ids,
+        taken,
+    )
@@ -0,0 +1,110 @@
+import heapq
+from typing import List, Optional
+
+import prisma
+import prisma.enums
+from pydantic import BaseModel
+
+import project.inventorySnapshot
+
+MAX_LIMIT = 100
+
+
+class InventorySearchHit(BaseModel):
+    """
+    An inventory item matching the search, with its relevance score.
+    """
+
+    id: int
+    name: str
+    type: prisma.enums.InventoryType
+    status: prisma.enums.InventoryStatus
+    quantity: int
+    score: float
+
+
+class InventorySearchResponse(BaseModel):
+    """
+    One page of inventory items matching the search, best matches first, and the total number of matches.
+    """
+
+    query: str
+    total: int
+    limit: int
+    offset: int
+    items: List[InventorySearchHit]
+
+
+async def searchInventory(
+    q: str,
+    type: Optional[prisma.enums.InventoryType] = None,
+    status: Optional[prisma.enums.InventoryStatus] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> InventorySearchResponse:
+    """
+    Searches inventory items by name for search boxes and typeahead. Every word of the query must
+    start a word of the item name, so "fraser 7ft" or "10-10-10 fert" find "Fraser Fir 7ft" and
+    "Fertilizer 10-10-10"; a word that starts nothing is matched by similarity instead, which
+    tolerates typos. Results are ranked by how completely the words match, then by shorter name.
+    The search runs against the worker's in-memory inventory snapshot and makes no query.
+
+    Args:
+        q (str): The text typed by the user.
+        type (Optional[prisma.enums.InventoryType]): Only return items of this type.
+        status (Optional[prisma.enums.InventoryStatus]): Only return items with this stock status.
+        limit (int): Maximum number of items to return, at most MAX_LIMIT.
+        offset (int): Number of ranked items to skip, for paging.
+
+    Returns:
+        InventorySearchResponse: One page of inventory items matching the search, best matches first, and the total number of matches.
+
+    Raises:
+        ValueError: If ``limit`` is not between 1 and MAX_LIMIT or ``offset`` is negative.
+
+    Example:
+        response = await searchInventory("fraser 7", limit=5)
+        print(response.items[0])
+        > InventorySearchHit(id=12, name='Fraser Fir 7ft', type='Sapling', status='InStock', quantity=340, score=6.17)
+    """
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError("limit must be between 1 and {}".format(MAX_LIMIT))
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    snapshot = project.inventorySnapshot.inventory_snapshot
+    if not snapshot.loaded:
+        await snapshot.load()
+    candidates = None
+    if type is not None or status is not None:
+        candidates = [row.id for row in snapshot.find(type=type, status=status)]
+    matches = snapshot.names.search(q, candidates)
+    rows = {
+        item_id: snapshot.rows[snapshot.positions[item_id]] for _, item_id in matches
+    }
+    ranked = heapq.nsmallest(
+        offset + limit,
+        matches,
+        key=lambda match: (
+            -match[0],
+            len(rows[match[1]].name),
+            rows[match[1]].name,
+            match[1],
+        ),
+    )
+    return InventorySearchResponse(
+        query=q,
+        total=len(matches),
+        limit=limit,
+        offset=offset,
+        items=[
+            InventorySearchHit(
+                id=item_id,
+                name=rows[item_id].name,
+                type=rows[item_id].type,
+                status=rows[item_id].status,
+                quantity=rows[item_id].quantity,
+                score=round(score, 3),
+            )
+            for score, item_id in ranked[offset:]
+        ],
+    )
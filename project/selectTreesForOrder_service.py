@@ -0,0 +1,89 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+import project.fieldGrid
+
+
+class TreeSelectionRequest(BaseModel):
+    """
+    How many trees to pick for an order, which trees qualify, and the tag to reserve them with.
+    """
+
+    count: int
+    tag: int
+    minHeight: int
+    maxHeight: Optional[int] = None
+    inventoryItemId: Optional[int] = None
+
+
+class TreePosition(BaseModel):
+    """
+    Row and position of a tree in its field.
+    """
+
+    row: int
+    column: int
+
+
+class TreeSelectionResponse(BaseModel):
+    """
+    Trees reserved for the order, in row order, and the grid version after reserving them.
+    """
+
+    requested: int
+    selected: int
+    trees: List[TreePosition]
+    version: int
+
+
+async def selectTreesForOrder(
+    fieldId: int, request: TreeSelectionRequest
+) -> TreeSelectionResponse:
+    """
+    Picks healthy, untagged trees in the requested height range for an order and reserves them by
+    setting their tag, so no other order picks the same trees. Trees are taken row by row, which
+    keeps the cutting crew's walk short. If fewer trees qualify than requested, all of them are
+    reserved and ``selected`` says how many.
+
+    Args:
+        fieldId (int): The field to pick trees from.
+        request (TreeSelectionRequest): How many trees to pick for an order, which trees qualify, and the tag to reserve them with.
+
+    Returns:
+        TreeSelectionResponse: Trees reserved for the order, in row order, and the grid version after reserving them.
+
+    Raises:
+        ValueError: If the field has no tree grid, the count is not positive or the tag is not 1-255.
+        HTTPException: 409 if concurrent updates kept conflicting with this one.
+
+    Example:
+        response = await selectTreesForOrder(2, TreeSelectionRequest(count=2, tag=17, minHeight=6, maxHeight=7))
+        print(response)
+        > TreeSelectionResponse(requested=2, selected=2, trees=[TreePosition(row=0, column=12), TreePosition(row=0, column=13)], version=16)
+    """
+    if request.count <= 0:
+        raise ValueError("count must be positive")
+    if not 1 <= request.tag <= 255:
+        raise ValueError("tag must be between 1 and 255")
+
+    def change(grid: project.fieldGrid.TreeGrid) -> List[TreePosition]:
+        mask = grid.mask(
+            statuses=[project.fieldGrid.TreeStatus.Healthy],
+            species_id=request.inventoryItemId,
+            min_height=request.minHeight,
+            max_height=request.maxHeight,
+            tags=[0],
+        )
+        picked = grid.positions(mask, limit=request.count)
+        for index in picked:
+            grid.tag[index] = request.tag
+        return [
+            TreePosition(row=index // grid.columns, column=index % grid.columns)
+            for index in picked
+        ]
+
+    trees, version = await project.fieldGrid.grid_store.modify(fieldId, change)
+    return TreeSelectionResponse(
+        requested=request.count, selected=len(trees), trees=trees, version=version
+    )
@@ -12,11 +12,18 @@ import project.addInventoryItem_service
 import project.addStaff_service
 import project.addSupplier_service
 import project.addSupplyChainItem_service
+import project.adjustStockCounts_service
+import project.auth
 import project.authenticateUser_service
+import project.autoAssignCrew_service
+import project.bulkDeleteInventoryItems_service
+import project.completeSchedule_service
 import project.createCustomer_service
 import project.createCustomReport_service
 import project.createFarmLayout_service
+import project.createFieldGrid_service
 import project.createOrder_service
+import project.createReview_service
 import project.createRole_service
 import project.createSalesRecord_service
 import project.createSchedule_service
@@ -31,9 +38,18 @@ import project.deleteSchedule_service
 import project.deleteStaff_service
 import project.deleteSupplyChainItem_service
 import project.deleteUser_service
+import project.exportPayrollRun_service
+import project.fieldConditions
+import project.fieldLocator
+import project.findNearbyFields_service
+import project.findSickClusters_service
+import project.getCohortForecast_service
 import project.getCustomer_service
 import project.getFarmLayouts_service
+import project.getFieldConditionHistory_service
+import project.getFieldConditionTrends_service
 import project.getFieldDetails_service
+import project.getFieldGrid_service
 import project.getFinancialReports_service
 import project.getInventory_service
 import project.getInventoryItemDetails_service
@@ -44,19 +60,47 @@ import project.getSalesData_service
 import project.getSalesTrends_service
 import project.getScheduleById_service
 import project.getSchedules_service
+import project.getStaffCoverage_service
 import project.getStaffDetails_service
+import project.getStaffDirectory_service
+import project.getStaffScorecards_service
+import project.getStockAsOf_service
 import project.getSuppliers_service
 import project.getSupplyChainItems_service
 import project.getUser_service
+import project.importStaff_service
+import project.inventorySnapshot
+import project.issueStreamToken_service
 import project.listCustomers_service
 import project.listOrders_service
 import project.listRoles_service
+import project.listSaplingCohorts_service
 import project.listStaff_service
+import project.listStaffReviews_service
+import project.listStaffSchedules_service
+import project.listStockMovements_service
 import project.listUsers_service
+import project.locateField_service
+import project.passwordHashing
+import project.permissions
+import project.recordFieldObservation_service
+import project.recordStockMovement_service
+import project.recordTimePunches_service
 import project.refreshSession_service
+import project.refreshTokens
+import project.revokeSession_service
+import project.runPayroll_service
+import project.saplingCohorts
+import project.searchInventory_service
+import project.selectTreesForOrder_service
+import project.setFieldBoundary_service
+import project.setReorderThresholds_service
+import project.stockLedger
+import project.streamEvents_service
 import project.updateCustomer_service
 import project.updateFarmLayout_service
 import project.updateFieldDetails_service
+import project.updateFieldGridRegion_service
 import project.updateInventoryItem_service
 import project.updateOrder_service
 import project.updateRole_service
@@ -66,9 +110,9 @@ import project.updateStaff_service
 import project.updateSupplier_service
 import project.updateSupplyChainItem_service
 import project.updateUser_service
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from prisma import Prisma
 
 logger = logging.getLogger(__name__)
@@ -79,19 +123,51 @@ db_client = Prisma(auto_register=True)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await db_client.connect()
+    await project.permissions.permission_store.ensure_defaults()
+    project.permissions.permission_store.start()
+    await project.auth.revocation_list.load()
+    project.auth.revocation_list.start()
+    project.refreshTokens.family_purger.start()
+    project.recordTimePunches_service.punch_buffer.start()
+    await project.stockLedger.normalize_statuses()
+    await project.inventorySnapshot.inventory_snapshot.load()
+    project.inventorySnapshot.inventory_snapshot.start()
+    await project.stockLedger.ensure_opening_balances()
+    project.stockLedger.ledger_maintainer.start()
+    await project.saplingCohorts.cohort_table.load()
+    project.saplingCohorts.cohort_table.start()
+    await project.fieldLocator.field_locator.load()
+    project.fieldLocator.field_locator.start()
+    project.fieldConditions.observation_rollup.start()
+    project.getStaffScorecards_service.scorecard_rollover.start()
     yield
+    await project.getStaffScorecards_service.scorecard_rollover.stop()
+    await project.fieldConditions.observation_rollup.stop()
+    await project.fieldLocator.field_locator.stop()
+    await project.saplingCohorts.cohort_table.stop()
+    await project.stockLedger.ledger_maintainer.stop()
+    await project.inventorySnapshot.inventory_snapshot.stop()
+    await project.recordTimePunches_service.punch_buffer.stop()
+    await project.permissions.permission_store.stop()
+    await project.auth.revocation_list.stop()
+    await project.refreshTokens.family_purger.stop()
     await db_client.disconnect()
+    project.autoAssignCrew_service.shutdown_solver_pool()
+    project.passwordHashing.shutdown_hash_pool()
 
 
 app = FastAPI(
     title="tets",
     lifespan=lifespan,
+    dependencies=[Depends(project.auth.authenticate)],
     description="build this hristmastreefarm Inventory Management - Provides tools to manage tree stock, track inventory levels, and update statuses, including items like fertilizer, dirt, saplings, hoses, trucks, harvesters, lights, etc. Sales Tracking - Track sales data, analyze trends, and integrate with QuickBooks for financial management. Scheduling - Manage planting, harvesting, and delivery schedules. Customer Management - Maintain customer records, preferences, and order history integrated with Quickbooks. Order Management - Streamline order processing, from placement to delivery, integrated with QuickBooks for invoicing. Supply Chain Management - Oversees the supply chain from seedling purchase to delivery of trees. Reporting and Analytics - Generate detailed reports and analytics to support business decisions, directly linked with QuickBooks for accurate financial reporting. Mapping and Field Management - Map farm layouts, manage field assignments and track conditions of specific areas. Health Management - Monitor the health of the trees and schedule treatments. Staff Roles Management - Define roles, responsibilities, and permissions for all staff members. Staff Scheduling - Manage schedules for staff operations, ensuring coverage and efficiency. Staff Performance Management - Evaluate staff performance, set objectives, and provide feedback. Payroll Management - Automate payroll calculations, adhere to tax policies, and integrate with QuickBooks. QuickBooks Integration - Integrate seamlessly across all financial aspects of the app to ensure comprehensive financial management.",
 )
 
 
 @app.delete(
-    "/users/{userId}", response_model=project.deleteUser_service.DeleteUserResponse
+    "/users/{userId}",
+    response_model=project.deleteUser_service.DeleteUserResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_users"))],
 )
 async def api_delete_deleteUser(
     userId: int,
@@ -163,7 +239,11 @@ async def api_post_addSupplier(
         )
 
 
-@app.post("/api/staff", response_model=project.addStaff_service.AddStaffResponse)
+@app.post(
+    "/api/staff",
+    response_model=project.addStaff_service.AddStaffResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_staff"))],
+)
 async def api_post_addStaff(
     firstName: str,
     lastName: str,
@@ -191,7 +271,11 @@ async def api_post_addStaff(
         )
 
 
-@app.get("/api/roles", response_model=project.listRoles_service.GetRolesResponse)
+@app.get(
+    "/api/roles",
+    response_model=project.listRoles_service.GetRolesResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_roles"))],
+)
 async def api_get_listRoles(
     request: project.listRoles_service.GetRolesRequest,
 ) -> project.listRoles_service.GetRolesResponse | Response:
@@ -403,14 +487,16 @@ async def api_delete_deleteFarmLayout(
     "/auth/refresh", response_model=project.refreshSession_service.AuthRefreshResponse
 )
 async def api_post_refreshSession(
-    Authorization: str,
+    request: project.refreshSession_service.AuthRefreshRequest,
 ) -> project.refreshSession_service.AuthRefreshResponse | Response:
     """
-    Refreshes the authentication session by issuing a new token. Requires a valid JWT in the request header. Helps maintain user session continuity safely.
+    Refreshes the authentication session by exchanging the current refresh token for a new access token and the next refresh token. Reusing an old refresh token revokes the session.
     """
     try:
-        res = project.refreshSession_service.refreshSession(Authorization)
+        res = await project.refreshSession_service.refreshSession(request)
         return res
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -477,16 +563,27 @@ async def api_get_getFarmLayouts(
         )
 
 
-@app.post("/api/roles", response_model=project.createRole_service.CreateRoleResponse)
+@app.post(
+    "/api/roles",
+    response_model=project.createRole_service.CreateRoleResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_roles"))],
+)
 async def api_post_createRole(
-    role_name: str, permissions: str
+    role_name: str,
+    permissions: str,
+    createPermissions: bool = False,
+    caller_role: prisma.enums.Role = Depends(project.permissions.current_role),
 ) -> project.createRole_service.CreateRoleResponse | Response:
     """
-    Creates a new staff role with specific permissions. Facilitates dynamic role creation based on organizational needs, controlled by Admin and HR.
+    Creates a new staff role with specific permissions. Facilitates dynamic role creation based on organizational needs, controlled by Admin and HR. Unknown permission names are rejected unless createPermissions is set, and callers cannot grant to their own role.
     """
     try:
-        res = project.createRole_service.createRole(role_name, permissions)
+        res = await project.createRole_service.createRole(
+            role_name, permissions, caller_role, createPermissions
+        )
         return res
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -501,16 +598,19 @@ async def api_post_createRole(
 @app.get(
     "/reports/inventory",
     response_model=project.getInventoryReports_service.InventoryReportResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
 )
 async def api_get_getInventoryReports(
-    type: Optional[prisma.enums.InventoryType],
-    status: Optional[prisma.enums.InventoryStatus],
+    type: Optional[prisma.enums.InventoryType] = None,
+    status: Optional[prisma.enums.InventoryStatus] = None,
 ) -> project.getInventoryReports_service.InventoryReportResponse | Response:
     """
     Generates detailed inventory reports which provide insights into stock levels, usage trends, and reordering necessities. This report utilizes data from the Inventory Management module to offer real-time tracking and projections. Expected response is a structured JSON with inventory items categorized and quantified, helping in making informed stocking decisions.
     """
     try:
-        res = project.getInventoryReports_service.getInventoryReports(type, status)
+        res = await project.getInventoryReports_service.getInventoryReports(
+            type, status
+        )
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -555,14 +655,18 @@ async def api_put_updateOrder(
     "/orders/{orderId}", response_model=project.deleteOrder_service.DeleteOrderResponse
 )
 async def api_delete_deleteOrder(
-    orderId: int, confirmation: bool
+    orderId: int, confirmation: bool, expectedVersion: Optional[int] = None
 ) -> project.deleteOrder_service.DeleteOrderResponse | Response:
     """
     Deletes an existing order. This will release the reserved inventory back to the Inventory Management system and update the financial records in QuickBooks to reflect the cancellation. This action requires confirmation from an authorized user.
     """
     try:
-        res = await project.deleteOrder_service.deleteOrder(orderId, confirmation)
+        res = await project.deleteOrder_service.deleteOrder(
+            orderId, confirmation, expectedVersion
+        )
         return res
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -575,7 +679,9 @@ async def api_delete_deleteOrder(
 
 
 @app.delete(
-    "/api/staff/{id}", response_model=project.deleteStaff_service.DeleteStaffResponse
+    "/api/staff/{id}",
+    response_model=project.deleteStaff_service.DeleteStaffResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_staff"))],
 )
 async def api_delete_deleteStaff(
     id: int,
@@ -597,7 +703,11 @@ async def api_delete_deleteStaff(
         )
 
 
-@app.post("/users", response_model=project.createUser_service.CreateUserResponse)
+@app.post(
+    "/users",
+    response_model=project.createUser_service.CreateUserResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_users"))],
+)
 async def api_post_createUser(
     username: str, email: str, password: str
 ) -> project.createUser_service.CreateUserResponse | Response:
@@ -645,17 +755,22 @@ async def api_get_listCustomers(
 
 
 @app.delete(
-    "/api/roles/{id}", response_model=project.deleteRole_service.DeleteRoleResponse
+    "/api/roles/{id}",
+    response_model=project.deleteRole_service.DeleteRoleResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_roles"))],
 )
 async def api_delete_deleteRole(
-    id: int,
+    id: str,
+    caller_role: prisma.enums.Role = Depends(project.permissions.current_role),
 ) -> project.deleteRole_service.DeleteRoleResponse | Response:
     """
-    Removes a set role from the system, maintaining clean and up-to-date role management. Access limited to Admin and HR for security reasons.
+    Removes a set role from the system, maintaining clean and up-to-date role management. Access limited to Admin and HR for security reasons. Callers cannot delete their own role or the last role holding manage_roles.
     """
     try:
-        res = await project.deleteRole_service.deleteRole(id)
+        res = await project.deleteRole_service.deleteRole(id, caller_role)
         return res
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -747,17 +862,18 @@ async def api_put_updateInventoryItem(
 )
 async def api_patch_updateFieldDetails(
     fieldId: int,
-    name: Optional[str],
-    areaSize: Optional[float],
-    mapUrl: Optional[str],
-    condition: Optional[prisma.enums.FieldCondition],
+    name: Optional[str] = None,
+    areaSize: Optional[float] = None,
+    mapUrl: Optional[str] = None,
+    condition: Optional[prisma.enums.FieldCondition] = None,
+    note: Optional[str] = None,
 ) -> project.updateFieldDetails_service.UpdateFieldResponse | Response:
     """
     Updates specific attributes of a field, targeted with fieldId. This could include changes in crop types, planting dates or updating area conditions. This endpoint ensures the field data is up-to-date for operational efficiency.
     """
     try:
-        res = project.updateFieldDetails_service.updateFieldDetails(
-            fieldId, name, areaSize, mapUrl, condition
+        res = await project.updateFieldDetails_service.updateFieldDetails(
+            fieldId, name, areaSize, mapUrl, condition, note
         )
         return res
     except Exception as e:
@@ -785,7 +901,7 @@ async def api_post_createFarmLayout(
     Creates a new farm layout. Accepts layout data including dimensions, paths, and designated field areas. This function uses GIS data formats for high accuracy and interacts with a database to store layout details.
     """
     try:
-        res = project.createFarmLayout_service.createFarmLayout(
+        res = await project.createFarmLayout_service.createFarmLayout(
             layout_name, dimensions, paths, fields
         )
         return res
@@ -907,7 +1023,7 @@ async def api_delete_deleteInventoryItem(
     itemId: int,
 ) -> project.deleteInventoryItem_service.DeleteInventoryItemResponse | Response:
     """
-    Deletes an item from inventory when it is no longer available or needed. This endpoint needs the item ID. A successful deletion will be confirmed along with an updated list of remaining inventory items.
+    Deletes an item from inventory when it is no longer available or needed. This endpoint needs the item ID. A successful deletion is confirmed with the deleted ID and the new inventory version token.
     """
     try:
         res = await project.deleteInventoryItem_service.deleteInventoryItem(itemId)
@@ -1029,14 +1145,18 @@ async def api_get_listUsers(
     response_model=project.deleteSchedule_service.DeleteScheduleResponse,
 )
 async def api_delete_deleteSchedule(
-    scheduleId: int,
+    scheduleId: int, expectedVersion: Optional[int] = None
 ) -> project.deleteSchedule_service.DeleteScheduleResponse | Response:
     """
     Deletes a schedule identified by the scheduleId. This action removes the schedule from the system and updates related resource allocations and field statuses accordingly.
     """
     try:
-        res = await project.deleteSchedule_service.deleteSchedule(scheduleId)
+        res = await project.deleteSchedule_service.deleteSchedule(
+            scheduleId, expectedVersion
+        )
         return res
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -1283,16 +1403,18 @@ async def api_post_createSchedule(
 
 @app.post("/auth/login", response_model=project.authenticateUser_service.LoginResponse)
 async def api_post_authenticateUser(
-    username: str, password: str
+    username: str, password: str, request: Request
 ) -> project.authenticateUser_service.LoginResponse | Response:
     """
     Handles user authentication. Expects username and password in the request body. Returns a JSON Web Token (JWT) for session handling on successful authentication, along with user role and ID for role-based access throughout the app.
     """
     try:
         res = await project.authenticateUser_service.authenticateUser(
-            username, password
+            username, password, request.client.host if request.client else None
         )
         return res
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -1309,16 +1431,22 @@ async def api_post_authenticateUser(
     response_model=project.updateSupplyChainItem_service.UpdateSupplyChainItemResponse,
 )
 async def api_put_updateSupplyChainItem(
-    itemId: int, quantity: int, supplierName: str, expectedDelivery: datetime
+    itemId: int,
+    quantity: int,
+    supplierName: str,
+    expectedDelivery: datetime,
+    expectedVersion: Optional[int] = None,
 ) -> project.updateSupplyChainItem_service.UpdateSupplyChainItemResponse | Response:
     """
     Updates the details of an existing supply chain item. This can include changes to quantity, supplier information, and expected delivery dates. It is crucial for maintaining accurate and up-to-date information on the supplies necessary for farm operations. Changes here are reflected in the Inventory Management system for seamless stock updates.
     """
     try:
         res = await project.updateSupplyChainItem_service.updateSupplyChainItem(
-            itemId, quantity, supplierName, expectedDelivery
+            itemId, quantity, supplierName, expectedDelivery, expectedVersion
         )
         return res
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -1452,17 +1580,25 @@ async def api_get_getScheduleById(
 
 
 @app.patch(
-    "/api/roles/{id}", response_model=project.updateRole_service.RoleUpdateResponse
+    "/api/roles/{id}",
+    response_model=project.updateRole_service.RoleUpdateResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_roles"))],
 )
 async def api_patch_updateRole(
-    id: str, new_permissions: List[str]
+    id: str,
+    new_permissions: List[str],
+    caller_role: prisma.enums.Role = Depends(project.permissions.current_role),
 ) -> project.updateRole_service.RoleUpdateResponse | Response:
     """
-    Updates the permissions associated with a specific role. Ensures role adaptability to evolving organizational policies, with changes authenticated and limited to Admin and HR.
+    Updates the permissions associated with a specific role. Ensures role adaptability to evolving organizational policies, with changes authenticated and limited to Admin and HR. Callers cannot change their own role, unknown permissions are rejected and some role must keep manage_roles.
     """
     try:
-        res = await project.updateRole_service.updateRole(id, new_permissions)
+        res = await project.updateRole_service.updateRole(
+            id, new_permissions, caller_role
+        )
         return res
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -1522,7 +1658,9 @@ async def api_get_getFieldDetails(
 
 
 @app.put(
-    "/api/staff/{id}", response_model=project.updateStaff_service.StaffUpdateResponse
+    "/api/staff/{id}",
+    response_model=project.updateStaff_service.StaffUpdateResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_staff"))],
 )
 async def api_put_updateStaff(
     id: int,
@@ -1549,3 +1687,965 @@ async def api_put_updateStaff(
             status_code=500,
             media_type="application/json",
         )
+
+
+@app.post(
+    "/api/staff/coverage",
+    response_model=project.getStaffCoverage_service.StaffCoverageResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_schedules"))],
+)
+async def api_post_getStaffCoverage(
+    request: project.getStaffCoverage_service.StaffCoverageRequest,
+) -> project.getStaffCoverage_service.StaffCoverageResponse | Response:
+    """
+    Computes under- and over-staffed slots over a date range by comparing required crew sizes per activity, field and time slot against assigned schedules.
+    """
+    try:
+        res = await project.getStaffCoverage_service.getStaffCoverage(request)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/staff/auto-assign",
+    response_model=project.autoAssignCrew_service.AutoAssignResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_schedules"))],
+)
+async def api_post_autoAssignCrew(
+    request: project.autoAssignCrew_service.AutoAssignRequest,
+) -> project.autoAssignCrew_service.AutoAssignResponse | Response:
+    """
+    Automatically assigns available staff to open planting, harvesting and delivery slots based on their roles and existing schedules, then saves the chosen assignments in one bulk insert. The solver time budget must be between 50 and 5000 ms.
+    """
+    try:
+        res = await project.autoAssignCrew_service.autoAssignCrew(request)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/payroll/runs",
+    response_model=project.runPayroll_service.PayrollRunResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_payroll"))],
+)
+async def api_post_runPayroll(
+    periodStart: datetime, periodEnd: datetime
+) -> project.runPayroll_service.PayrollRunResponse | Response:
+    """
+    Computes gross pay, withholding and net pay for all staff with payroll records over a pay period and stores the results. Re-running the same period replaces the previous results.
+    """
+    try:
+        res = await project.runPayroll_service.runPayroll(periodStart, periodEnd)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/payroll/runs/{runId}/export",
+    dependencies=[Depends(project.permissions.require_permissions("manage_payroll"))],
+)
+async def api_get_exportPayrollRun(runId: int) -> Response:
+    """
+    Streams the entries of a payroll run as a CSV file for import into QuickBooks or a spreadsheet.
+    """
+    try:
+        rows = await project.exportPayrollRun_service.exportPayrollRun(runId)
+        return StreamingResponse(
+            rows,
+            media_type="text/csv",
+            headers={
+                "Content-Disposition": 'attachment; filename="payroll-run-{}.csv"'.format(
+                    runId
+                )
+            },
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/time-clock/punches",
+    response_model=project.recordTimePunches_service.PunchBatchResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_schedules"))],
+)
+async def api_post_recordTimePunches(
+    request: project.recordTimePunches_service.PunchBatchRequest,
+) -> project.recordTimePunches_service.PunchBatchResponse | Response:
+    """
+    Accepts a batch of clock-in and clock-out punches from a time clock kiosk. Retried punches are ignored and worked hours per staff member per day are kept up to date for payroll.
+    """
+    try:
+        res = await project.recordTimePunches_service.recordTimePunches(request)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/staff-directory",
+    response_model=project.getStaffDirectory_service.StaffDirectoryResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_staff"))],
+)
+async def api_get_getStaffDirectory(
+    roles: Optional[List[prisma.enums.Role]] = Query(None),
+    cursor: Optional[int] = None,
+    limit: int = 50,
+) -> project.getStaffDirectory_service.StaffDirectoryResponse | Response:
+    """
+    Lists staff IDs, names, roles and phone numbers for the HR directory, optionally filtered by role and paginated with a cursor.
+    """
+    try:
+        res = await project.getStaffDirectory_service.getStaffDirectory(
+            roles, cursor, limit
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/staff/{id}/schedules",
+    response_model=project.listStaffSchedules_service.StaffSchedulesResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_staff"))],
+)
+async def api_get_listStaffSchedules(
+    id: int,
+    fromDate: Optional[datetime] = None,
+    toDate: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+) -> project.listStaffSchedules_service.StaffSchedulesResponse | Response:
+    """
+    Lists the schedules of a staff member, newest first, with optional date filters and cursor pagination.
+    """
+    try:
+        res = await project.listStaffSchedules_service.listStaffSchedules(
+            id, fromDate, toDate, cursor, limit
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/staff/{id}/reviews",
+    response_model=project.listStaffReviews_service.StaffReviewsResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_staff"))],
+)
+async def api_get_listStaffReviews(
+    id: int,
+    fromDate: Optional[datetime] = None,
+    toDate: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+) -> project.listStaffReviews_service.StaffReviewsResponse | Response:
+    """
+    Lists the performance reviews of a staff member, newest first, with optional date filters and cursor pagination.
+    """
+    try:
+        res = await project.listStaffReviews_service.listStaffReviews(
+            id, fromDate, toDate, cursor, limit
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/staff/{id}/reviews",
+    response_model=project.createReview_service.CreateReviewResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_staff"))],
+)
+async def api_post_createReview(
+    id: int, request: project.createReview_service.CreateReviewRequest
+) -> project.createReview_service.CreateReviewResponse | Response:
+    """
+    Records a performance review for a staff member with a score for each objective, and updates the staff member's performance scorecards.
+    """
+    try:
+        res = await project.createReview_service.createReview(id, request)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/schedules/{scheduleId}/complete",
+    response_model=project.completeSchedule_service.CompleteScheduleResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_schedules"))],
+)
+async def api_post_completeSchedule(
+    scheduleId: int,
+    completedAt: Optional[datetime] = None,
+    inventoryItemId: Optional[int] = None,
+    treeCount: Optional[int] = None,
+    plantedYear: Optional[int] = None,
+) -> project.completeSchedule_service.CompleteScheduleResponse | Response:
+    """
+    Marks a planting, harvesting or delivery activity as completed and counts it towards the assigned staff member's performance scorecards. Plantings and harvests given a tree count update the field's sapling cohorts.
+    """
+    try:
+        res = await project.completeSchedule_service.completeSchedule(
+            scheduleId, completedAt, inventoryItemId, treeCount, plantedYear
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/staff-scorecards",
+    response_model=project.getStaffScorecards_service.StaffScorecardsResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_staff"))],
+)
+async def api_get_getStaffScorecards(
+    windowDays: int = 30, sortBy: str = "averageScore", limit: int = 500
+) -> project.getStaffScorecards_service.StaffScorecardsResponse | Response:
+    """
+    Ranks all staff by rolling 30, 90 or 365-day performance metrics from the precomputed scorecards, for the manager dashboard. Reads only; the scorecards are kept current by the write path and a periodic day rollover.
+    """
+    try:
+        res = await project.getStaffScorecards_service.getStaffScorecards(
+            windowDays, sortBy, limit
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/auth/logout", response_model=project.revokeSession_service.RevokeSessionResponse
+)
+async def api_post_revokeSession(
+    request: Optional[project.revokeSession_service.RevokeSessionRequest] = None,
+    claims: project.auth.TokenClaims = Depends(project.auth.authenticate),
+) -> project.revokeSession_service.RevokeSessionResponse | Response:
+    """
+    Logs the caller out by revoking their current access token and, if given, the session's refresh token family.
+    """
+    try:
+        res = await project.revokeSession_service.revokeSession(claims, request)
+        return res
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/staff/import",
+    response_model=project.importStaff_service.ImportStaffResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_staff"))],
+)
+async def api_post_importStaff(
+    request: Request,
+) -> project.importStaff_service.ImportStaffResponse | Response:
+    """
+    Imports staff members from a CSV request body (text/csv), creating their user accounts, profiles and staff records in batches. Rows that fail validation or use an email already in the system are reported individually; the rest are imported.
+    """
+    try:
+        res = await project.importStaff_service.importStaff(request.stream())
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/inventory/bulk-delete",
+    response_model=project.bulkDeleteInventoryItems_service.BulkDeleteInventoryResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_inventory"))],
+)
+async def api_post_bulkDeleteInventoryItems(
+    request: project.bulkDeleteInventoryItems_service.BulkDeleteInventoryRequest,
+) -> project.bulkDeleteInventoryItems_service.BulkDeleteInventoryResponse | Response:
+    """
+    Deletes many inventory items in one transaction and returns only the IDs that were deleted, the items that could not be deleted and why, and the new inventory version token. Deleted items keep their transaction and stock history.
+    """
+    try:
+        res = await project.bulkDeleteInventoryItems_service.bulkDeleteInventoryItems(
+            request
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/inventory/{itemId}/movements",
+    response_model=project.recordStockMovement_service.StockMovementResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_inventory"))],
+)
+async def api_post_recordStockMovement(
+    itemId: int, request: project.recordStockMovement_service.StockMovementRequest
+) -> project.recordStockMovement_service.StockMovementResponse | Response:
+    """
+    Records a receipt, sale, adjustment or write-off of an inventory item in the stock ledger and updates its current quantity in the same transaction.
+    """
+    try:
+        res = await project.recordStockMovement_service.recordStockMovement(
+            itemId, request
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/inventory/{itemId}/movements",
+    response_model=project.listStockMovements_service.StockMovementsResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_listStockMovements(
+    itemId: int, fromDate: Optional[datetime] = None, toDate: Optional[datetime] = None
+) -> project.listStockMovements_service.StockMovementsResponse | Response:
+    """
+    Lists the stock movements of an inventory item between two dates with the opening quantity, the quantity after each movement and the closing quantity.
+    """
+    try:
+        res = await project.listStockMovements_service.listStockMovements(
+            itemId, fromDate, toDate
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/inventory-ledger/as-of",
+    response_model=project.getStockAsOf_service.StockAsOfResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_getStockAsOf(
+    asOf: datetime, itemIds: Optional[List[int]] = Query(None)
+) -> project.getStockAsOf_service.StockAsOfResponse | Response:
+    """
+    Reports the quantity of each inventory item at a past date and time, reconstructed from the nearest stock ledger snapshot and the movements after it.
+    """
+    try:
+        res = await project.getStockAsOf_service.getStockAsOf(asOf, itemIds)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/inventory/reorder-thresholds",
+    response_model=project.setReorderThresholds_service.ReorderThresholdsResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_inventory"))],
+)
+async def api_post_setReorderThresholds(
+    request: project.setReorderThresholds_service.ReorderThresholdsRequest,
+) -> project.setReorderThresholds_service.ReorderThresholdsResponse | Response:
+    """
+    Sets reorder thresholds for inventory items and re-derives their stock status in the same write.
+    """
+    try:
+        res = await project.setReorderThresholds_service.setReorderThresholds(request)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get("/events")
+async def api_get_streamEvents(
+    request: Request,
+    topics: List[str] = Query(...),
+    token: Optional[str] = Query(None),
+    role: prisma.enums.Role = Depends(project.permissions.current_role),
+) -> Response:
+    """
+    Streams inventory status transitions, order cancellations and schedule changes as Server-Sent Events, so dashboards can update in real time instead of polling.
+    Browser EventSource clients pass a stream token from POST /events/token as ``token`` instead of an Authorization header.
+    Inventory events reach subscribers on every worker; orders.* and schedules.* events only reach subscribers connected to the worker that handled the write.
+    """
+    try:
+        frames = await project.streamEvents_service.streamEvents(
+            topics,
+            role,
+            request.is_disconnected,
+            request.headers.get("Last-Event-ID"),
+        )
+        return StreamingResponse(
+            frames,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/inventory-search",
+    response_model=project.searchInventory_service.InventorySearchResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_searchInventory(
+    q: str,
+    type: Optional[prisma.enums.InventoryType] = None,
+    status: Optional[prisma.enums.InventoryStatus] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> project.searchInventory_service.InventorySearchResponse | Response:
+    """
+    Searches inventory items by name, matching each typed word as a prefix and tolerating typos. Results are ranked and paginated, and are served from memory for typeahead.
+    """
+    try:
+        res = await project.searchInventory_service.searchInventory(
+            q, type, status, limit, offset
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/inventory/stock-counts",
+    response_model=project.adjustStockCounts_service.StockCountResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_inventory"))],
+)
+async def api_post_adjustStockCounts(
+    request: project.adjustStockCounts_service.StockCountRequest,
+) -> project.adjustStockCounts_service.StockCountResponse | Response:
+    """
+    Posts the results of a physical stock count in one transaction, recording each difference as a ledger adjustment and updating quantities and statuses together.
+    """
+    try:
+        res = await project.adjustStockCounts_service.adjustStockCounts(request)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/sapling-cohorts",
+    response_model=project.listSaplingCohorts_service.SaplingCohortsResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_listSaplingCohorts(
+    fieldId: Optional[int] = None, inventoryItemId: Optional[int] = None
+) -> project.listSaplingCohorts_service.SaplingCohortsResponse | Response:
+    """
+    Lists how many trees of each species and planting year stand in each field, with their estimated height this season.
+    """
+    try:
+        res = await project.listSaplingCohorts_service.listSaplingCohorts(
+            fieldId, inventoryItemId
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/sapling-cohorts/forecast",
+    response_model=project.getCohortForecast_service.CohortForecastResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_getCohortForecast(
+    heightFt: float = 6.0,
+    fromSeason: Optional[int] = None,
+    toSeason: Optional[int] = None,
+    fieldId: Optional[int] = None,
+    inventoryItemId: Optional[int] = None,
+) -> project.getCohortForecast_service.CohortForecastResponse | Response:
+    """
+    Forecasts how many trees reach a target height in each season, from the sapling cohorts and their species' growth curves.
+    """
+    try:
+        res = await project.getCohortForecast_service.getCohortForecast(
+            heightFt, fromSeason, toSeason, fieldId, inventoryItemId
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/fields/{fieldId}/grid",
+    response_model=project.createFieldGrid_service.CreateFieldGridResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_inventory"))],
+)
+async def api_post_createFieldGrid(
+    fieldId: int, request: project.createFieldGrid_service.CreateFieldGridRequest
+) -> project.createFieldGrid_service.CreateFieldGridResponse | Response:
+    """
+    Creates the row/position tree grid of a field, optionally planted with one species throughout.
+    """
+    try:
+        res = await project.createFieldGrid_service.createFieldGrid(fieldId, request)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/fields/{fieldId}/grid",
+    response_model=project.getFieldGrid_service.FieldGridSummary,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_getFieldGrid(
+    fieldId: int, readyHeight: int = 6, inventoryItemId: Optional[int] = None
+) -> project.getFieldGrid_service.FieldGridSummary | Response:
+    """
+    Summarises a field's tree grid by status, species and height class, with the number of harvest-ready trees.
+    """
+    try:
+        res = await project.getFieldGrid_service.getFieldGrid(
+            fieldId, readyHeight, inventoryItemId
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/fields/{fieldId}/grid/sick-clusters",
+    response_model=project.findSickClusters_service.SickClustersResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_findSickClusters(
+    fieldId: int, minSize: int = 3, limit: int = 50
+) -> project.findSickClusters_service.SickClustersResponse | Response:
+    """
+    Finds clusters of touching sick trees in a field's grid, largest first.
+    """
+    try:
+        res = await project.findSickClusters_service.findSickClusters(
+            fieldId, minSize, limit
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/fields/{fieldId}/grid/regions",
+    response_model=project.updateFieldGridRegion_service.GridRegionUpdateResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_inventory"))],
+)
+async def api_post_updateFieldGridRegion(
+    fieldId: int, request: project.updateFieldGridRegion_service.GridRegionUpdate
+) -> project.updateFieldGridRegion_service.GridRegionUpdateResponse | Response:
+    """
+    Sets status, species, height class or tag for a rectangle of a field's tree grid, optionally only where trees are in given statuses.
+    """
+    try:
+        res = await project.updateFieldGridRegion_service.updateFieldGridRegion(
+            fieldId, request
+        )
+        return res
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/fields/{fieldId}/grid/selections",
+    response_model=project.selectTreesForOrder_service.TreeSelectionResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_orders"))],
+)
+async def api_post_selectTreesForOrder(
+    fieldId: int, request: project.selectTreesForOrder_service.TreeSelectionRequest
+) -> project.selectTreesForOrder_service.TreeSelectionResponse | Response:
+    """
+    Picks and reserves healthy trees in a height range for an order, row by row.
+    """
+    try:
+        res = await project.selectTreesForOrder_service.selectTreesForOrder(
+            fieldId, request
+        )
+        return res
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.put(
+    "/api/fields/{fieldId}/boundary",
+    response_model=project.setFieldBoundary_service.FieldBoundaryResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_inventory"))],
+)
+async def api_put_setFieldBoundary(
+    fieldId: int, request: project.setFieldBoundary_service.FieldBoundaryRequest
+) -> project.setFieldBoundary_service.FieldBoundaryResponse | Response:
+    """
+    Replaces the boundary polygon of a field and recomputes its area. GPS lookups use the new shape straight away.
+    """
+    try:
+        res = await project.setFieldBoundary_service.setFieldBoundary(fieldId, request)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/field-locator/point",
+    response_model=project.locateField_service.LocateFieldResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_locateField(
+    lat: float, lon: float
+) -> project.locateField_service.LocateFieldResponse | Response:
+    """
+    Returns the field a GPS position lies in, answered from the in-memory field index.
+    """
+    try:
+        res = await project.locateField_service.locateField(lat, lon)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/field-locator/nearby",
+    response_model=project.locateField_service.LocateFieldResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_findNearbyFields(
+    lat: float, lon: float, radiusM: Optional[float] = None, limit: int = 10
+) -> project.locateField_service.LocateFieldResponse | Response:
+    """
+    Returns the fields nearest to a GPS position, closest first, optionally only those within radiusM metres.
+    """
+    try:
+        res = await project.findNearbyFields_service.findNearbyFields(
+            lat, lon, radiusM, limit
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/api/fields/{fieldId}/observations",
+    response_model=project.recordFieldObservation_service.FieldObservationResponse,
+    dependencies=[Depends(project.permissions.require_permissions("manage_inventory"))],
+)
+async def api_post_recordFieldObservation(
+    fieldId: int,
+    request: project.recordFieldObservation_service.FieldObservationRequest,
+) -> project.recordFieldObservation_service.FieldObservationResponse | Response:
+    """
+    Appends a condition observation to a field's history, e.g. from a scouting walk. Backdated observations are accepted.
+    """
+    try:
+        res = await project.recordFieldObservation_service.recordFieldObservation(
+            fieldId, request
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/fields/{fieldId}/condition-history",
+    response_model=project.getFieldConditionHistory_service.FieldConditionHistoryResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_getFieldConditionHistory(
+    fieldId: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: str = "day",
+) -> project.getFieldConditionHistory_service.FieldConditionHistoryResponse | Response:
+    """
+    Returns a field's condition history bucketed by day, week, month or year. Older ranges are served from daily rollups.
+    """
+    try:
+        res = await project.getFieldConditionHistory_service.getFieldConditionHistory(
+            fieldId, start, end, bucket
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/api/field-condition-trends",
+    response_model=project.getFieldConditionTrends_service.FieldConditionTrendsResponse,
+    dependencies=[Depends(project.permissions.require_permissions("view_inventory"))],
+)
+async def api_get_getFieldConditionTrends(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: str = "month",
+) -> project.getFieldConditionTrends_service.FieldConditionTrendsResponse | Response:
+    """
+    Returns the condition history of every field in one query, for multi-year health trend charts.
+    """
+    try:
+        res = await project.getFieldConditionTrends_service.getFieldConditionTrends(
+            start, end, bucket
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/events/token",
+    response_model=project.issueStreamToken_service.StreamTokenResponse,
+)
+async def api_post_issueStreamToken(
+    claims: project.auth.TokenClaims = Depends(project.auth.authenticate),
+) -> project.issueStreamToken_service.StreamTokenResponse | Response:
+    """
+    Issues a short-lived token for opening the event stream from a browser EventSource, which cannot set an Authorization header.
+    """
+    try:
+        res = await project.issueStreamToken_service.issueStreamToken(claims)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
@@ -0,0 +1,63 @@
+from typing import List
+
+import prisma
+import prisma.models
+from pydantic import BaseModel
+
+import project.fieldLocator
+
+
+class FieldBoundaryRequest(BaseModel):
+    """
+    New boundary polygon of a field, and whether to recompute its area from it.
+    """
+
+    boundary: List[project.fieldLocator.GeoPoint]
+    updateArea: bool = True
+
+
+class FieldBoundaryResponse(BaseModel):
+    """
+    The field's boundary after the update, with its area in acres.
+    """
+
+    fieldId: int
+    areaSize: float
+    points: int
+
+
+async def setFieldBoundary(
+    fieldId: int, request: FieldBoundaryRequest
+) -> FieldBoundaryResponse:
+    """
+    Replaces the boundary polygon of a field, e.g. after a survey or when a block is split, and
+    rebuilds the worker's field locator so GPS lookups use the new shape straight away.
+
+    Args:
+        fieldId (int): The field whose boundary to set.
+        request (FieldBoundaryRequest): New boundary polygon of a field, and whether to recompute its area from it.
+
+    Returns:
+        FieldBoundaryResponse: The field's boundary after the update, with its area in acres.
+
+    Raises:
+        ValueError: If the field does not exist or the boundary is invalid.
+
+    Example:
+        response = await setFieldBoundary(12, FieldBoundaryRequest(boundary=[GeoPoint(lat=35.501, lon=-82.502), GeoPoint(lat=35.501, lon=-82.498), GeoPoint(lat=35.504, lon=-82.498)]))
+        print(response)
+        > FieldBoundaryResponse(fieldId=12, areaSize=13.4, points=3)
+    """
+    lats = [point.lat for point in request.boundary]
+    lons = [point.lon for point in request.boundary]
+    project.fieldLocator.validate_boundary(lats, lons)
+    data = {"boundaryLats": lats, "boundaryLons": lons}
+    if request.updateArea:
+        data["areaSize"] = round(project.fieldLocator.polygon_area_acres(lats, lons), 2)
+    field = await prisma.models.Field.prisma().update(where={"id": fieldId}, data=data)
+    if field is None:
+        raise ValueError("No field found with ID {}".format(fieldId))
+    await project.fieldLocator.field_locator.load()
+    return FieldBoundaryResponse(
+        fieldId=field.id, areaSize=field.areaSize, points=len(lats)
+    )
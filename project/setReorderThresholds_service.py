@@ -0,0 +1,83 @@
+from typing import List
+
+import prisma
+import prisma.enums
+from pydantic import BaseModel
+
+import project.stockLedger
+
+
+class ReorderThreshold(BaseModel):
+    """
+    Reorder threshold for one inventory item.
+    """
+
+    inventoryItemId: int
+    threshold: int
+
+
+class ReorderThresholdsRequest(BaseModel):
+    """
+    Reorder thresholds to set, one per inventory item.
+    """
+
+    thresholds: List[ReorderThreshold]
+
+
+class ItemStockStatus(BaseModel):
+    """
+    Stock status of an inventory item after its threshold changed.
+    """
+
+    inventoryItemId: int
+    quantity: int
+    reorderThreshold: int
+    status: prisma.enums.InventoryStatus
+
+
+class ReorderThresholdsResponse(BaseModel):
+    """
+    Items whose thresholds were set, with their re-derived status.
+    """
+
+    items: List[ItemStockStatus]
+
+
+async def setReorderThresholds(
+    request: ReorderThresholdsRequest,
+) -> ReorderThresholdsResponse:
+    """
+    Sets the reorder threshold of one or more inventory items. An item is LowStock once its quantity
+    is at or below its threshold and OutOfStock at zero; the status is recomputed in the same
+    statement that stores the thresholds, so it can no longer drift from the quantity.
+
+    Args:
+        request (ReorderThresholdsRequest): Reorder thresholds to set, one per inventory item.
+
+    Returns:
+        ReorderThresholdsResponse: Items whose thresholds were set, with their re-derived status.
+
+    Raises:
+        ValueError: If no thresholds are given or a threshold is negative.
+
+    Example:
+        response = await setReorderThresholds(ReorderThresholdsRequest(thresholds=[ReorderThreshold(inventoryItemId=3, threshold=50)]))
+        print(response)
+        > ReorderThresholdsResponse(items=[ItemStockStatus(inventoryItemId=3, quantity=42, reorderThreshold=50, status='LowStock')])
+    """
+    if not request.thresholds:
+        raise ValueError("thresholds must not be empty")
+    items = await project.stockLedger.set_reorder_thresholds(
+        {entry.inventoryItemId: entry.threshold for entry in request.thresholds}
+    )
+    return ReorderThresholdsResponse(
+        items=[
+            ItemStockStatus(
+                inventoryItemId=item.id,
+                quantity=item.quantity,
+                reorderThreshold=item.reorderThreshold,
+                status=item.status,
+            )
+            for item in sorted(items, key=lambda item: item.id)
+        ]
+    )
@@ -0,0 +1,440 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.models
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+import project.inventorySnapshot
+import project.inventoryVersion
+import project.maintenance
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_RETENTION = timedelta(days=30)
+
+INBOUND_KINDS = {prisma.enums.MovementKind.Receipt}
+OUTBOUND_KINDS = {prisma.enums.MovementKind.Sale, prisma.enums.MovementKind.WriteOff}
+
+# Status of an item holding quantity "q" with reorder threshold "t". Every statement that changes
+# either one sets the status from this expression in the same write.
+STATUS_EXPRESSION = (
+    "(CASE WHEN {q} <= 0 THEN 'OutOfStock' "
+    "WHEN {q} <= {t} THEN 'LowStock' "
+    "ELSE 'InStock' END)::\"InventoryStatus\""
+)
+
+
+class StockMovementInput(BaseModel):
+    """
+    One stock movement to record. ``quantity`` is the amount received, sold or written off, or the
+    signed change for an adjustment.
+    """
+
+    inventoryItemId: int
+    kind: prisma.enums.MovementKind
+    quantity: int
+    occurredAt: Optional[datetime] = None
+    reference: Optional[str] = None
+    note: Optional[str] = None
+
+
+def signed_delta(kind: prisma.enums.MovementKind, quantity: int) -> int:
+    """
+    Converts a movement's quantity into its signed effect on stock.
+
+    Raises:
+        ValueError: If the quantity does not fit the kind of movement.
+    """
+    if kind in INBOUND_KINDS or kind in OUTBOUND_KINDS:
+        if quantity <= 0:
+            raise ValueError("{} quantity must be positive".format(kind.value))
+        return quantity if kind in INBOUND_KINDS else -quantity
+    if quantity == 0:
+        raise ValueError("Adjustment quantity must not be zero")
+    return quantity
+
+
+def as_utc(value: datetime) -> datetime:
+    """
+    Treats naive datetimes as UTC and converts aware ones to UTC.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _naive_utc(value: Optional[datetime]) -> str:
+    value = as_utc(value or datetime.now(timezone.utc))
+    return value.replace(tzinfo=None).isoformat()
+
+
+async def apply_movements(
+    transaction: prisma.Prisma, movements: List[StockMovementInput]
+) -> List[prisma.models.InventoryItem]:
+    """
+    Appends movements to the ledger and moves the current-quantity projection on InventoryItem by
+    the same amounts, inside the caller's transaction. Snapshots taken after a backdated movement no
+    longer hold and are dropped so the next snapshot run rebuilds them. Updating the items takes the
+    lock ``take_snapshots`` waits on, so a snapshot either includes these movements or is taken
+    after the delete below can see it.
+
+    Returns:
+        List[prisma.models.InventoryItem]: The items whose quantity changed, as written.
+
+    Raises:
+        ValueError: If an item does not exist or a movement would take its quantity below zero.
+    """
+    item_ids = [movement.inventoryItemId for movement in movements]
+    deltas = [signed_delta(movement.kind, movement.quantity) for movement in movements]
+    occurred = [_naive_utc(movement.occurredAt) for movement in movements]
+    await transaction.execute_raw(
+        'INSERT INTO "StockMovement" ("inventoryItemId", "kind", "delta", "occurredAt", '
+        '"reference", "note") SELECT * FROM unnest($1::int[], $2::"MovementKind"[], '
+        "$3::int[], $4::timestamp[], $5::text[], $6::text[])",
+        item_ids,
+        [movement.kind.value for movement in movements],
+        deltas,
+        occurred,
+        [movement.reference for movement in movements],
+        [movement.note for movement in movements],
+    )
+    items = await prisma.models.InventoryItem.prisma(transaction).query_raw(
+        'UPDATE "InventoryItem" i SET "quantity" = i."quantity" + d.total, '
+        '"version" = i."version" + 1, "status" = {} '
+        "FROM (SELECT item, SUM(delta)::int AS total "
+        "FROM unnest($1::int[], $2::int[]) AS m(item, delta) GROUP BY item) d "
+        'WHERE i.id = d.item AND i."deletedAt" IS NULL RETURNING i.*'.format(
+            STATUS_EXPRESSION.format(
+                q='i."quantity" + d.total', t='i."reorderThreshold"'
+            )
+        ),
+        item_ids,
+        deltas,
+    )
+    missing = set(item_ids) - {item.id for item in items}
+    if missing:
+        raise ValueError("Inventory items not found: {}".format(sorted(missing)))
+    negative = sorted(item.id for item in items if item.quantity < 0)
+    if negative:
+        raise ValueError(
+            "Movements would take stock below zero for items {}".format(negative)
+        )
+    await transaction.execute_raw(
+        'DELETE FROM "StockSnapshot" s USING unnest($1::int[], $2::timestamp[]) AS m(item, at) '
+        'WHERE s."inventoryItemId" = m.item AND s."takenAt" >= m.at',
+        item_ids,
+        occurred,
+    )
+    return items
+
+
+async def record_movements(
+    movements: List[StockMovementInput],
+) -> List[prisma.models.InventoryItem]:
+    """
+    Records movements in one transaction, advances the inventory version token and writes the new
+    quantities through to the in-memory inventory snapshot.
+    """
+    async with prisma.get_client().tx() as transaction:
+        items = await apply_movements(transaction, movements)
+        version = await project.inventoryVersion.bump_inventory_version(transaction)
+    _write_through(items, version)
+    return items
+
+
+async def set_quantity(
+    item_id: int,
+    quantity: int,
+    reference: Optional[str] = None,
+    note: Optional[str] = None,
+    expected_version: Optional[int] = None,
+) -> Optional[prisma.models.InventoryItem]:
+    """
+    Brings an item to a counted quantity by recording the difference as an adjustment, rather than
+    overwriting the quantity and losing the history.
+
+    Returns:
+        Optional[prisma.models.InventoryItem]: The item after the change, or None if it does not exist.
+
+    Raises:
+        HTTPException: 409 if ``expected_version`` is given and the item has changed since.
+    """
+    if quantity < 0:
+        raise ValueError("quantity must not be negative")
+    async with prisma.get_client().tx() as transaction:
+        item = await prisma.models.InventoryItem.prisma(transaction).query_first(
+            'SELECT * FROM "InventoryItem" WHERE id = $1::int AND "deletedAt" IS NULL '
+            "FOR UPDATE",
+            item_id,
+        )
+        if item is None:
+            return None
+        if expected_version is not None and item.version != expected_version:
+            raise HTTPException(
+                status_code=409,
+                detail="InventoryItem {} was changed by another request (version {}, expected {})".format(
+                    item_id, item.version, expected_version
+                ),
+            )
+        if item.quantity == quantity:
+            return item
+        items = await apply_movements(
+            transaction,
+            [
+                StockMovementInput(
+                    inventoryItemId=item_id,
+                    kind=prisma.enums.MovementKind.Adjustment,
+                    quantity=quantity - item.quantity,
+                    reference=reference,
+                    note=note,
+                )
+            ],
+        )
+        version = await project.inventoryVersion.bump_inventory_version(transaction)
+    _write_through(items, version)
+    return items[0]
+
+
+async def set_quantities(
+    counts: Dict[int, Tuple[int, Optional[str]]], reference: Optional[str] = None
+) -> Tuple[Dict[int, dict], List[prisma.models.InventoryItem]]:
+    """
+    Brings many items to counted quantities in one transaction, recording each difference as an
+    adjustment. ``counts`` maps item IDs to their counted quantity and the reason for the change.
+    The items are locked in ID order so concurrent counts cannot deadlock.
+
+    Returns:
+        Tuple[Dict[int, dict], List[prisma.models.InventoryItem]]: The quantity and status of every
+        counted item before the count, and the items that changed, as written.
+
+    Raises:
+        ValueError: If an item does not exist or a counted quantity is negative.
+    """
+    if any(quantity < 0 for quantity, _ in counts.values()):
+        raise ValueError("Counted quantities must not be negative")
+    async with prisma.get_client().tx() as transaction:
+        rows = await transaction.query_raw(
+            'SELECT id, "quantity", "status" FROM "InventoryItem" '
+            'WHERE id = ANY($1::int[]) AND "deletedAt" IS NULL ORDER BY id FOR UPDATE',
+            sorted(counts),
+        )
+        before = {row["id"]: row for row in rows}
+        missing = set(counts) - set(before)
+        if missing:
+            raise ValueError("Inventory items not found: {}".format(sorted(missing)))
+        movements = [
+            StockMovementInput(
+                inventoryItemId=item_id,
+                kind=prisma.enums.MovementKind.Adjustment,
+                quantity=quantity - before[item_id]["quantity"],
+                reference=reference,
+                note=reason,
+            )
+            for item_id, (quantity, reason) in counts.items()
+            if quantity != before[item_id]["quantity"]
+        ]
+        if not movements:
+            return before, []
+        items = await apply_movements(transaction, movements)
+        version = await project.inventoryVersion.bump_inventory_version(transaction)
+    _write_through(items, version)
+    return before, items
+
+
+def _write_through(items: List[prisma.models.InventoryItem], version: int) -> None:
+    snapshot = project.inventorySnapshot.inventory_snapshot
+    for item in items:
+        snapshot.upsert(item)
+    snapshot.advance(version)
+
+
+_AS_OF_QUERY = (
+    'SELECT i.id, (COALESCE(s."quantity", 0) + COALESCE(m.total, 0))::int AS quantity '
+    'FROM "InventoryItem" i '
+    "LEFT JOIN LATERAL ("
+    'SELECT "takenAt", "quantity" FROM "StockSnapshot" '
+    'WHERE "inventoryItemId" = i.id AND "takenAt" <= $1::timestamp '
+    'ORDER BY "takenAt" DESC LIMIT 1) s ON TRUE '
+    "LEFT JOIN LATERAL ("
+    'SELECT SUM("delta") AS total FROM "StockMovement" '
+    'WHERE "inventoryItemId" = i.id AND "occurredAt" <= $1::timestamp '
+    'AND (s."takenAt" IS NULL OR "occurredAt" > s."takenAt")) m ON TRUE '
+    "WHERE $2::int[] IS NULL OR i.id = ANY($2::int[])"
+)
+
+
+async def quantities_as_of(
+    as_of: datetime, item_ids: Optional[List[int]] = None
+) -> Dict[int, int]:
+    """
+    Returns each item's quantity at ``as_of`` from its nearest earlier snapshot plus the movements
+    recorded after it, so only a short tail of the ledger is read.
+
+    Args:
+        as_of (datetime): Point in time to report; movements at exactly this time are included.
+        item_ids (Optional[List[int]]): Only these items; the whole catalogue when omitted.
+
+    Returns:
+        Dict[int, int]: Quantity by inventory item ID.
+    """
+    rows = await prisma.get_client().query_raw(
+        _AS_OF_QUERY, _naive_utc(as_of), item_ids
+    )
+    return {row["id"]: row["quantity"] for row in rows}
+
+
+async def ensure_opening_balances() -> int:
+    """
+    Gives items that predate the ledger an opening adjustment equal to their current quantity, so
+    the ledger and the projection agree from the start.
+
+    Returns:
+        int: Number of opening balances recorded.
+    """
+    async with prisma.get_client().tx() as transaction:
+        # Workers start together; the lock keeps two of them from both seeding an item.
+        await transaction.query_raw(
+            "SELECT pg_advisory_xact_lock(hashtext('StockMovement'))"
+        )
+        return await transaction.execute_raw(
+            'INSERT INTO "StockMovement" ("inventoryItemId", "kind", "delta", "note") '
+            "SELECT i.id, 'Adjustment', i.\"quantity\", 'Opening balance' "
+            'FROM "InventoryItem" i WHERE i."quantity" <> 0 AND i."deletedAt" IS NULL '
+            "AND NOT EXISTS ("
+            'SELECT 1 FROM "StockMovement" m WHERE m."inventoryItemId" = i.id)'
+        )
+
+
+async def set_reorder_thresholds(
+    thresholds: Dict[int, int],
+) -> List[prisma.models.InventoryItem]:
+    """
+    Sets reorder thresholds for many items in one statement, re-deriving their status in the same
+    write, and writes the result through to the inventory snapshot.
+
+    Returns:
+        List[prisma.models.InventoryItem]: The updated items; IDs that do not exist are skipped.
+    """
+    if any(threshold < 0 for threshold in thresholds.values()):
+        raise ValueError("Reorder thresholds must not be negative")
+    async with prisma.get_client().tx() as transaction:
+        items = await prisma.models.InventoryItem.prisma(transaction).query_raw(
+            'UPDATE "InventoryItem" i SET "reorderThreshold" = d.threshold, '
+            '"version" = i."version" + 1, "status" = {} '
+            "FROM unnest($1::int[], $2::int[]) AS d(item, threshold) "
+            'WHERE i.id = d.item AND i."deletedAt" IS NULL RETURNING i.*'.format(
+                STATUS_EXPRESSION.format(q='i."quantity"', t="d.threshold")
+            ),
+            list(thresholds),
+            list(thresholds.values()),
+        )
+        version = await project.inventoryVersion.bump_inventory_version(transaction)
+    _write_through(items, version)
+    return items
+
+
+async def normalize_statuses() -> int:
+    """
+    Brings every item's status in line with its quantity and threshold. Items that were marked
+    LowStock by hand before thresholds existed keep that status by getting their current quantity
+    as threshold.
+
+    Returns:
+        int: Number of items whose status changed.
+    """
+    async with prisma.get_client().tx() as transaction:
+        await transaction.execute_raw(
+            'UPDATE "InventoryItem" SET "reorderThreshold" = "quantity" '
+            'WHERE "status" = \'LowStock\' AND "reorderThreshold" = 0 AND "quantity" > 0 '
+            'AND "deletedAt" IS NULL'
+        )
+        changed = await transaction.execute_raw(
+            'UPDATE "InventoryItem" i SET "version" = i."version" + 1, "status" = {0} '
+            'WHERE i."deletedAt" IS NULL AND i."status" <> {0}'.format(
+                STATUS_EXPRESSION.format(q='i."quantity"', t='i."reorderThreshold"')
+            )
+        )
+        if changed:
+            await project.inventoryVersion.bump_inventory_version(transaction)
+    return changed
+
+
+async def take_snapshots(
+    taken_at: Optional[datetime] = None, client: Optional[prisma.Prisma] = None
+) -> int:
+    """
+    Stores every item's quantity at ``taken_at``, computed from the previous snapshot and the
+    movements since, in one statement, inside ``client``'s transaction or a new one.
+
+    Returns:
+        int: Number of snapshots written.
+    """
+    if client is None:
+        async with prisma.get_client().tx() as transaction:
+            return await take_snapshots(taken_at, transaction)
+    # SHARE mode waits for transactions that are moving stock to commit and holds off new ones
+    # until this transaction ends. A movement that is still in flight therefore updates its item
+    # only after this snapshot is committed, and its snapshot delete in apply_movements then sees
+    # and drops the snapshot instead of the snapshot silently leaving the movement out.
+    await client.execute_raw('LOCK TABLE "InventoryItem" IN SHARE MODE')
+    return await client.execute_raw(
+        'INSERT INTO "StockSnapshot" ("inventoryItemId", "takenAt", "quantity") '
+        "SELECT q.id, $1::timestamp, q.quantity FROM ({}) AS q "
+        'JOIN "InventoryItem" i ON i.id = q.id AND i."deletedAt" IS NULL '
+        'ON CONFLICT ("inventoryItemId", "takenAt") DO NOTHING'.format(_AS_OF_QUERY),
+        _naive_utc(taken_at),
+        None,
+    )
+
+
+async def compact_snapshots(
+    retention: timedelta = SNAPSHOT_RETENTION, client: Optional[prisma.Prisma] = None
+) -> int:
+    """
+    Thins out snapshots older than ``retention`` to the last one of each month per item. Movements
+    are never deleted; older "as of" queries just read a longer tail from the monthly snapshot.
+
+    Returns:
+        int: Number of snapshots deleted.
+    """
+    return await (client or prisma.get_client()).execute_raw(
+        'DELETE FROM "StockSnapshot" s WHERE s."takenAt" < $1::timestamp AND EXISTS ('
+        'SELECT 1 FROM "StockSnapshot" t WHERE t."inventoryItemId" = s."inventoryItemId" '
+        "AND date_trunc('month', t.\"takenAt\") = date_trunc('month', s.\"takenAt\") "
+        'AND t."takenAt" > s."takenAt")',
+        _naive_utc(datetime.now(timezone.utc) - retention),
+    )
+
+
+async def find_projection_drift() -> List[int]:
+    """
+    Returns the IDs of items whose stored quantity differs from what the ledger adds up to.
+    """
+    ledger = await quantities_as_of(datetime.now(timezone.utc))
+    items = await prisma.models.InventoryItem.prisma().find_many(
+        where={"deletedAt": None}
+    )
+    return sorted(item.id for item in items if ledger.get(item.id) != item.quantity)
+
+
+async def maintain_ledger(transaction: prisma.Prisma) -> None:
+    """
+    Compacts old snapshots, checks the quantity projection against the ledger and snapshots the
+    ledger. The snapshot goes last because it blocks stock changes until the transaction ends.
+    """
+    compacted = await compact_snapshots(client=transaction)
+    if compacted:
+        logger.info("Compacted %d stock snapshots", compacted)
+    drift = await find_projection_drift()
+    if drift:
+        logger.warning("Stock quantities disagree with the ledger for items %s", drift)
+    await take_snapshots(client=transaction)
+
+
+ledger_maintainer = project.maintenance.PeriodicJob(
+    "stock-ledger", maintain_ledger, interval=86400.0
+)
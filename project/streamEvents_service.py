@@ -0,0 +1,121 @@
+import json
+import weakref
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import prisma
+import prisma.enums
+from fastapi import HTTPException
+
+import project.eventStream
+import project.permissions
+
+KEEPALIVE_SECONDS = 15.0
+
+# Permission needed to subscribe to each topic; None means any signed-in user.
+TOPIC_PERMISSIONS: Dict[str, Optional[str]] = {
+    "inventory": "view_inventory",
+    "orders": "manage_orders",
+    "schedules": None,
+}
+
+
+def _resync_frame(topics: List[str]) -> str:
+    return "event: resync\ndata: {}\n\n".format(json.dumps(topics))
+
+
+async def streamEvents(
+    topics: List[str],
+    role: prisma.enums.Role,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    lastEventId: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    Streams change events as Server-Sent Events so dashboards can update as things happen instead
+    of polling ``/inventory`` and ``/orders``. Events are ``inventory.status`` for stock status
+    transitions, ``orders.cancelled`` and ``schedules.created``/``completed``/``deleted``. A
+    ``resync`` event lists topics on which the client missed events, because it fell too far behind
+    or reconnected with an unknown ``Last-Event-ID``; the client should reload those resources.
+
+    Inventory transitions are seen by every worker through the inventory snapshot refresh, but
+    ``orders.*`` and ``schedules.*`` events are published in-process, so they only reach
+    subscribers connected to the worker that handled the write.
+
+    Args:
+        topics (List[str]): Topics to subscribe to: inventory, orders and/or schedules.
+        role (prisma.enums.Role): Role of the caller, checked against each topic's permission.
+        is_disconnected (Callable[[], Awaitable[bool]]): Reports whether the client has gone away.
+        lastEventId (Optional[str]): The ``Last-Event-ID`` header sent by a reconnecting client.
+
+    Returns:
+        AsyncIterator[str]: SSE frames, with a comment line every KEEPALIVE_SECONDS when idle.
+
+    Raises:
+        ValueError: If no topic or an unknown topic is requested.
+        HTTPException: 403 if the caller may not read one of the topics, 503 if the worker already
+            serves MAX_SUBSCRIBERS streams.
+
+    Example:
+        stream = await streamEvents(["inventory"], prisma.enums.Role.Manager, request.is_disconnected)
+        print(await stream.__anext__())
+        > id: 3f9c02ab-41
+        > event: inventory.status
+        > data: {"inventoryItemId":7,"name":"Fraser Fir","type":"Sapling","from":"InStock","to":"LowStock","quantity":180}
+    """
+    topics = sorted(set(topics))
+    if not topics:
+        raise ValueError("At least one topic is required")
+    unknown = [topic for topic in topics if topic not in TOPIC_PERMISSIONS]
+    if unknown:
+        raise ValueError("Unknown topics: {}".format(", ".join(unknown)))
+    store = project.permissions.permission_store
+    required = [TOPIC_PERMISSIONS[t] for t in topics if TOPIC_PERMISSIONS[t]]
+    if required:
+        mask = store.mask_for(required)
+        if mask is None or not store.allows(role, mask):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+    broker = project.eventStream.broker
+    if broker.subscribers >= project.eventStream.MAX_SUBSCRIBERS:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many event streams",
+            headers={"Retry-After": str(int(KEEPALIVE_SECONDS))},
+        )
+    cursor = broker.cursor_from(lastEventId)
+    # The slot is taken here, with no await since the check, so streams opened at the same moment
+    # cannot all pass it. It is given back once, when the stream ends or, if the response never
+    # starts iterating it, when the stream is garbage collected.
+    broker.subscribers += 1
+    slot = {"held": True}
+
+    def release() -> None:
+        if slot["held"]:
+            slot["held"] = False
+            broker.subscribers -= 1
+
+    async def frames() -> AsyncIterator[str]:
+        nonlocal cursor
+        try:
+            yield "retry: 3000\n\n"
+            if cursor is None:
+                cursor = broker.seq
+                yield _resync_frame(topics)
+            while True:
+                if cursor == broker.seq:
+                    await broker.wait(KEEPALIVE_SECONDS)
+                if cursor == broker.seq:
+                    if await is_disconnected():
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                events, missed = broker.read(topics, cursor)
+                cursor = broker.seq
+                if missed:
+                    yield _resync_frame(missed)
+                if events:
+                    yield "".join(events)
+        finally:
+            release()
+
+    stream = frames()
+    weakref.finalize(stream, release)
+    return stream
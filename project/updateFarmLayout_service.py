@@ -2,9 +2,13 @@ from enum import Enum
 from typing import Any, Dict, Optional
 
 import prisma
+import prisma.enums
 import prisma.models
 from pydantic import BaseModel
 
+import project.fieldConditions
+import project.fieldLocator
+
 
 class UpdateFarmLayoutResponse(BaseModel):
     """
@@ -52,9 +56,19 @@ async def updateFarmLayout(
     if condition is not None:
         update_data["condition"] = condition
     try:
-        updated_field = await prisma.models.Field.prisma().update(
-            where={"id": layoutId}, data=update_data
-        )  # TODO(autogpt): "Field" is not exported from module "prisma.models". reportPrivateImportUsage
+        async with prisma.get_client().tx() as transaction:
+            updated_field = await prisma.models.Field.prisma(transaction).update(
+                where={"id": layoutId}, data=update_data
+            )
+            if updated_field is not None and condition is not None:
+                await project.fieldConditions.record_observation(
+                    transaction,
+                    layoutId,
+                    prisma.enums.FieldCondition(condition.value),
+                    source="farm-layout",
+                )
+        if name is not None:
+            await project.fieldLocator.field_locator.load()
         updated_fields = {
             key: getattr(updated_field, key, None) for key in update_data.keys()
         }
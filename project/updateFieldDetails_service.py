@@ -0,0 +1,81 @@
+from typing import Any, Dict, Optional
+
+import prisma
+import prisma.enums
+import prisma.models
+from pydantic import BaseModel
+
+import project.fieldConditions
+import project.fieldLocator
+
+
+class UpdateFieldResponse(BaseModel):
+    """
+    The field's attributes after the update, limited to those that were changed.
+    """
+
+    fieldId: int
+    updatedFields: Dict[str, Any]
+    success: bool
+
+
+async def updateFieldDetails(
+    fieldId: int,
+    name: Optional[str] = None,
+    areaSize: Optional[float] = None,
+    mapUrl: Optional[str] = None,
+    condition: Optional[prisma.enums.FieldCondition] = None,
+    note: Optional[str] = None,
+) -> UpdateFieldResponse:
+    """
+    Updates specific attributes of a field. A new condition is appended to the field's condition
+    history in the same transaction rather than just overwriting the current one, so health trends
+    can be charted later.
+
+    Args:
+        fieldId (int): The field to update.
+        name (Optional[str]): New name of the field.
+        areaSize (Optional[float]): New size of the field in acres.
+        mapUrl (Optional[str]): New URL of the field's map.
+        condition (Optional[prisma.enums.FieldCondition]): Condition of the field as observed now.
+        note (Optional[str]): Remark kept with the condition observation, e.g. what was seen.
+
+    Returns:
+        UpdateFieldResponse: The field's attributes after the update, limited to those that were changed.
+
+    Raises:
+        ValueError: If the field does not exist.
+
+    Example:
+        response = await updateFieldDetails(3, condition=prisma.enums.FieldCondition.NeedsAttention, note="Needle cast on the east rows")
+        print(response)
+        > UpdateFieldResponse(fieldId=3, updatedFields={'condition': 'NeedsAttention'}, success=True)
+    """
+    update_data: Dict[str, Any] = {}
+    if name is not None:
+        update_data["name"] = name
+    if areaSize is not None:
+        update_data["areaSize"] = areaSize
+    if mapUrl is not None:
+        update_data["mapUrl"] = mapUrl
+    async with prisma.get_client().tx() as transaction:
+        field = await prisma.models.Field.prisma(transaction).update(
+            where={"id": fieldId}, data=update_data
+        )
+        if field is None:
+            raise ValueError("No field found with ID {}".format(fieldId))
+        if condition is not None:
+            await project.fieldConditions.record_observation(
+                transaction, fieldId, condition, source="field-update", note=note
+            )
+            field = await prisma.models.Field.prisma(transaction).find_unique(
+                where={"id": fieldId}
+            )
+    if name is not None:
+        await project.fieldLocator.field_locator.load()
+    updated_fields = {key: getattr(field, key) for key in update_data}
+    if condition is not None:
+        updated_fields["condition"] = field.condition
+    return UpdateFieldResponse(
+        fieldId=fieldId, updatedFields=updated_fields, success=True
+    )
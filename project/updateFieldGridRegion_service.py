@@ -0,0 +1,97 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+import project.fieldGrid
+
+
+class GridRegionUpdate(BaseModel):
+    """
+    A rectangle of grid positions, inclusive, and the values to set on them. Statuses are 0 Empty, 1 Healthy, 2 Sick, 3 Dead and 4 Harvested.
+    """
+
+    firstRow: int
+    lastRow: int
+    firstColumn: int
+    lastColumn: int
+    status: Optional[project.fieldGrid.TreeStatus] = None
+    inventoryItemId: Optional[int] = None
+    heightClass: Optional[int] = None
+    tag: Optional[int] = None
+    onlyStatuses: Optional[List[project.fieldGrid.TreeStatus]] = None
+
+
+class GridRegionUpdateResponse(BaseModel):
+    """
+    Number of positions updated and the grid version after the update.
+    """
+
+    updated: int
+    version: int
+
+
+async def updateFieldGridRegion(
+    fieldId: int, request: GridRegionUpdate
+) -> GridRegionUpdateResponse:
+    """
+    Updates a rectangle of a field's tree grid in one write, e.g. after replanting a block, marking
+    a blight outbreak, or moving a section to the next height class at the end of the season. With
+    ``onlyStatuses`` only positions currently in one of those statuses change, so "mark the healthy
+    trees of rows 10-20 as height 7" leaves dead and empty positions alone.
+
+    Args:
+        fieldId (int): The field whose grid to update.
+        request (GridRegionUpdate): A rectangle of grid positions, inclusive, and the values to set on them.
+
+    Returns:
+        GridRegionUpdateResponse: Number of positions updated and the grid version after the update.
+
+    Raises:
+        ValueError: If the field has no tree grid, nothing is to be set, the rectangle lies outside
+            the grid, a height class or tag is not 0-255 or the inventory item is not a sapling.
+        HTTPException: 409 if concurrent updates kept conflicting with this one.
+
+    Example:
+        response = await updateFieldGridRegion(2, GridRegionUpdate(firstRow=10, lastRow=20, firstColumn=0, lastColumn=399, status=2))
+        print(response)
+        > GridRegionUpdateResponse(updated=4400, version=15)
+    """
+    if all(
+        value is None
+        for value in (
+            request.status,
+            request.inventoryItemId,
+            request.heightClass,
+            request.tag,
+        )
+    ):
+        raise ValueError("Nothing to update")
+    for name, value in (("heightClass", request.heightClass), ("tag", request.tag)):
+        if value is not None and not 0 <= value <= 255:
+            raise ValueError("{} must be between 0 and 255".format(name))
+    if request.inventoryItemId is not None:
+        await project.fieldGrid.check_sapling(request.inventoryItemId)
+
+    def change(grid: project.fieldGrid.TreeGrid) -> int:
+        values = {}
+        if request.status is not None:
+            values["status"] = request.status
+        if request.inventoryItemId is not None:
+            values["species_index"] = grid.species_slot(
+                request.inventoryItemId, add=True
+            )
+        if request.heightClass is not None:
+            values["height"] = request.heightClass
+        if request.tag is not None:
+            values["tag"] = request.tag
+        return grid.update_region(
+            request.firstRow,
+            request.lastRow,
+            request.firstColumn,
+            request.lastColumn,
+            values,
+            request.onlyStatuses,
+        )
+
+    updated, version = await project.fieldGrid.grid_store.modify(fieldId, change)
+    return GridRegionUpdateResponse(updated=updated, version=version)
@@ -2,9 +2,10 @@ from typing import List
 
 import prisma
 import prisma.enums
-import prisma.models
 from pydantic import BaseModel
 
+from project.permissions import permission_store
+
 
 class RoleUpdateResponse(BaseModel):
     """
@@ -16,40 +17,38 @@ class RoleUpdateResponse(BaseModel):
     updated_permissions: List[str]
 
 
-async def updateRole(id: str, new_permissions: List[str]) -> RoleUpdateResponse:
+async def updateRole(
+    id: str, new_permissions: List[str], caller_role: prisma.enums.Role
+) -> RoleUpdateResponse:
     """
     Updates the permissions associated with a specific role. This function is critical for ensuring that role
-    permissions remain aligned with evolving organizational policies. The changes are scoped and authenticated
-    ensuring only roles like Admin and HR can update permissions.
+    permissions remain aligned with evolving organizational policies. The role's permission set is replaced
+    and the in-memory permission store is reloaded. Callers cannot change their own role, only existing
+    permissions can be assigned, and some role must keep manage_roles.
 
     Args:
-        id (str): Unique identifier of the role for which permissions are being updated.
+        id (str): Name of the role for which permissions are being updated, e.g. 'Manager'.
         new_permissions (List[str]): New set of permissions to be assigned to the role.
+        caller_role (prisma.enums.Role): Role of the user making the change.
 
     Returns:
         RoleUpdateResponse: Response model confirming the update of a role's permissions. This includes the role
                             affected and the new permissions assigned to the role to ensure transparency.
 
+    Raises:
+        HTTPException: 403 for the caller's own role, 400 for unknown permissions, 409 if no role would keep manage_roles.
+
     Example:
-        await updateRole('5', ['EditInventory', 'ManageOrders'])
-        > RoleUpdateResponse(success=True, updated_role_id='5', updated_permissions=['EditInventory', 'ManageOrders'])
+        await updateRole('Manager', ['manage_inventory', 'manage_orders'], prisma.enums.Role.Admin)
+        > RoleUpdateResponse(success=True, updated_role_id='Manager', updated_permissions=['manage_inventory', 'manage_orders'])
     """
-    try:
-        user = await prisma.models.User.prisma().find_unique(
-            where={"id": int(id)}, include={"role": True}
-        )
-        if user and user.role in [prisma.enums.Role.Admin, prisma.enums.Role.HR]:
-            updated_user = await prisma.models.User.prisma().update(
-                {"where": {"id": int(id)}, "data": {"role": new_permissions[0]}}
-            )  # TODO(autogpt): Argument missing for parameter "where". reportCallIssue
-            return RoleUpdateResponse(
-                success=True, updated_role_id=id, updated_permissions=new_permissions
-            )
-        else:
-            return RoleUpdateResponse(
-                success=False, updated_role_id=id, updated_permissions=[]
-            )
-    except Exception as e:
+    if id not in prisma.enums.Role.__members__:
         return RoleUpdateResponse(
             success=False, updated_role_id=id, updated_permissions=[]
         )
+    granted = await permission_store.grant(
+        prisma.enums.Role(id), new_permissions, replace=True, caller_role=caller_role
+    )
+    return RoleUpdateResponse(
+        success=True, updated_role_id=id, updated_permissions=granted
+    )
@@ -23,7 +23,7 @@ class StaffUpdateResponse(BaseModel):
 
     successful: bool
     message: str
-    updated_staff_details: StaffDetails
+    updated_staff_details: Optional[StaffDetails] = None
 
 
 class Role(Enum):
@@ -40,7 +40,9 @@ async def updateStaff(
 ) -> StaffUpdateResponse:
     """
     Updates the details of an existing staff member. Only Admin and HR can edit roles and permissions,
-    while self-update is limited to personal information by the staff themselves.
+    while self-update is limited to personal information by the staff themselves; the route enforces
+    this through the manage_staff permission. The user and profile are updated and the result read
+    back in a single statement.
 
     Args:
         id (int): The ID of the staff member to update. This is used to identify the record in the database.
@@ -53,35 +55,22 @@ async def updateStaff(
     Returns:
         StaffUpdateResponse: Returns updated details of the staff member after successful edit. Includes any system-generated messages or acknowledgments.
     """
-    current_user = await prisma.models.User.prisma().find_unique(
-        where={"id": "CURRENT_USER_ID"}
+    updated_user = await prisma.models.User.prisma().query_first(
+        "WITH updated_profile AS ("
+        'UPDATE "Profile" SET "firstName" = $4::text, "lastName" = $5::text, '
+        '"phone" = $6::text WHERE "userId" = $1::int RETURNING id) '
+        'UPDATE "User" SET "email" = $2::text, "role" = $3::"Role" '
+        "WHERE id = $1::int RETURNING *",
+        id,
+        email,
+        role.value,
+        firstName,
+        lastName,
+        phone,
     )
-    if not current_user or current_user.role not in [Role.Admin, Role.HR]:
-        return StaffUpdateResponse(
-            successful=False,
-            message="Unauthorized to change the role.",
-            updated_staff_details=None,
-        )
-    target_user = await prisma.models.User.prisma().find_unique(where={"id": id})
-    if not target_user:
-        return StaffUpdateResponse(
-            successful=False,
-            message="No staff member found with given ID.",
-            updated_staff_details=None,
-        )
-    await prisma.models.User.prisma().update(
-        where={"id": id}, data={"email": email, "role": role}
-    )
-    await prisma.models.Profile.prisma().update(
-        where={"userId": id},
-        data={"firstName": firstName, "lastName": lastName, "phone": phone},
-    )
-    updated_user = await prisma.models.User.prisma().find_unique(where={"id": id})
     if updated_user is None:
         return StaffUpdateResponse(
-            successful=False,
-            message="Failed to fetch updated user details.",
-            updated_staff_details=None,
+            successful=False, message="No staff member found with given ID."
         )
     staff_details = StaffDetails(
         id=updated_user.id, userId=updated_user.id, user=updated_user
@@ -2,6 +2,8 @@ import prisma
 import prisma.models
 from pydantic import BaseModel
 
+import project.writeHelpers
+
 
 class UpdateSupplierResponse(BaseModel):
     """
@@ -34,12 +36,8 @@ async def updateSupplier(
     Returns:
         UpdateSupplierResponse: Response model providing confirmation and updated details of the supplier
     """
-    customer_record = await prisma.models.Customer.prisma().find_unique(
-        where={"id": supplierId}
-    )
-    if customer_record is None:
-        raise ValueError("Supplier with this id does not exist.")
-    updated_customer = await prisma.models.Customer.prisma().update(
+    updated_customer = await project.writeHelpers.update_returning(
+        prisma.models.Customer,
         where={"id": supplierId},
         data={
             "name": name,
@@ -48,6 +46,6 @@ async def updateSupplier(
             "address": address,
         },
     )
-    return UpdateSupplierResponse(
-        supplierId=supplierId, updated=True if updated_customer else False
-    )
+    if updated_customer is None:
+        raise ValueError("Supplier with this id does not exist.")
+    return UpdateSupplierResponse(supplierId=supplierId, updated=True)
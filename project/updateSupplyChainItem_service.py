@@ -1,9 +1,13 @@
 from datetime import datetime
+from typing import Optional
 
 import prisma
 import prisma.models
+from fastapi import HTTPException
 from pydantic import BaseModel
 
+import project.stockLedger
+
 
 class UpdateSupplyChainItemResponse(BaseModel):
     """
@@ -11,48 +15,54 @@ class UpdateSupplyChainItemResponse(BaseModel):
     """
 
     success: bool
-    updatedItem: prisma.models.InventoryItem
+    updatedItem: Optional[prisma.models.InventoryItem] = None
     message: str
 
 
 async def updateSupplyChainItem(
-    itemId: int, quantity: int, supplierName: str, expectedDelivery: datetime
+    itemId: int,
+    quantity: int,
+    supplierName: str,
+    expectedDelivery: datetime,
+    expectedVersion: Optional[int] = None,
 ) -> UpdateSupplyChainItemResponse:
     """
-    Updates the details of an existing supply chain item. This can include changes to quantity, supplier information, and expected delivery dates. It is crucial for maintaining accurate and up-to-date information on the supplies necessary for farm operations. Changes here are reflected in the Inventory Management system for seamless stock updates.
+    Updates the details of an existing supply chain item. This can include changes to quantity, supplier information, and expected delivery dates. A quantity change is recorded in the stock ledger as an adjustment referencing the supplier; the item's name is left unchanged. It is crucial for maintaining accurate and up-to-date information on the supplies necessary for farm operations. Changes here are reflected in the Inventory Management system for seamless stock updates.
 
     Args:
         itemId (int): The unique identifier of the inventory item being updated.
         quantity (int): The new quantity of the item in the inventory.
         supplierName (str): The name of the supplier for this item.
         expectedDelivery (datetime): The expected delivery date of the item from the supplier.
+        expectedVersion (Optional[int]): Version of the item the caller last read; the update is refused if the item has changed since.
 
     Returns:
         UpdateSupplyChainItemResponse: This model outlines the result of the update operation on a supply chain item and includes the new state of the item.
+
+    Raises:
+        HTTPException: 409 if ``expectedVersion`` is given and the item has been changed since.
     """
     try:
-        inventory_item = await prisma.models.InventoryItem.prisma().find_unique(
-            where={"id": itemId}, include={"transactions": True}
+        updated_inventory_item = await project.stockLedger.set_quantity(
+            itemId,
+            quantity,
+            reference=supplierName,
+            note="Expected delivery {}".format(expectedDelivery.date().isoformat()),
+            expected_version=expectedVersion,
         )
-        if inventory_item is None:
+        if updated_inventory_item is None:
             return UpdateSupplyChainItemResponse(
                 success=False,
                 updatedItem=None,
                 message="No item found with the given ID.",
             )
-        updated_inventory_item = await prisma.models.InventoryItem.prisma().update(
-            where={"id": itemId},
-            data={
-                "quantity": quantity,
-                "name": supplierName,
-                "status": "InStock" if quantity > 0 else "OutOfStock",
-            },
-        )
         return UpdateSupplyChainItemResponse(
             success=True,
             updatedItem=updated_inventory_item,
             message="Item successfully updated.",
         )
+    except HTTPException:
+        raise
     except Exception as e:
         return UpdateSupplyChainItemResponse(
             success=False, updatedItem=None, message=f"Error updating item: {str(e)}"
@@ -0,0 +1,150 @@
+import enum
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+import prisma
+from fastapi import HTTPException
+
+VERSIONED_MODELS = {"Order", "InventoryItem", "Schedule"}
+
+Model = TypeVar("Model")
+
+
+def sql_param(value: Any, position: int) -> Tuple[str, Any]:
+    """
+    Returns the ``$n`` placeholder, with a cast matching the value's type, and the value in the form
+    the raw query expects. Enum values must be prisma enum members so the cast names their type.
+    """
+    if isinstance(value, enum.Enum):
+        return '${}::"{}"'.format(position, type(value).__name__), value.value
+    if isinstance(value, bool):
+        return "${}::boolean".format(position), value
+    if isinstance(value, int):
+        return "${}::int".format(position), value
+    if isinstance(value, float):
+        return "${}::float8".format(position), value
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return "${}::timestamp".format(position), value.isoformat()
+    if isinstance(value, date):
+        return "${}::date".format(position), value.isoformat()
+    if isinstance(value, str):
+        return "${}::text".format(position), value
+    raise TypeError("Unsupported value for a raw write: {!r}".format(value))
+
+
+def where_clause(where: Dict[str, Any], params: List[Any]) -> str:
+    """
+    Builds an ``AND`` of column conditions, appending their values to ``params``. A value of
+    ``{"not": x}`` negates the condition and ``None`` compares with ``IS NULL``.
+    """
+    conditions = []
+    for column, value in where.items():
+        negate = isinstance(value, dict) and "not" in value
+        if negate:
+            value = value["not"]
+        if value is None:
+            conditions.append('"{}" IS {}NULL'.format(column, "NOT " if negate else ""))
+            continue
+        placeholder, value = sql_param(value, len(params) + 1)
+        params.append(value)
+        conditions.append(
+            '"{}" {} {}'.format(column, "<>" if negate else "=", placeholder)
+        )
+    return " AND ".join(conditions) or "TRUE"
+
+
+async def update_returning(
+    model: Type[Model],
+    where: Dict[str, Any],
+    data: Dict[str, Any],
+    client: Optional[prisma.Prisma] = None,
+) -> Optional[Model]:
+    """
+    Updates the row matching ``where`` in a single ``UPDATE ... RETURNING`` statement, so there is
+    no separate read before the write and no window for another request to change the row in
+    between. Versioned models get their ``version`` incremented by the same statement; put the
+    version the caller read into ``where`` to make the write conditional on it.
+
+    Args:
+        model (Type[Model]): The prisma model to update, e.g. ``prisma.models.Order``.
+        where (Dict[str, Any]): Column conditions that must all hold, see ``where_clause``.
+        data (Dict[str, Any]): Columns to set.
+        client (Optional[prisma.Prisma]): Transaction to write with; the default client otherwise.
+
+    Returns:
+        Optional[Model]: The updated row, or None if no row matched.
+    """
+    params: List[Any] = []
+    assignments = []
+    for column, value in data.items():
+        if value is None:
+            assignments.append('"{}" = NULL'.format(column))
+            continue
+        placeholder, value = sql_param(value, len(params) + 1)
+        params.append(value)
+        assignments.append('"{}" = {}'.format(column, placeholder))
+    if model.__name__ in VERSIONED_MODELS:
+        assignments.append('"version" = "version" + 1')
+    conditions = where_clause(where, params)
+    return await model.prisma(client).query_first(
+        'UPDATE "{}" SET {} WHERE {} RETURNING *'.format(
+            model.__name__, ", ".join(assignments), conditions
+        ),
+        *params,
+    )
+
+
+async def delete_returning(
+    model: Type[Model],
+    where: Dict[str, Any],
+    client: Optional[prisma.Prisma] = None,
+) -> Optional[Model]:
+    """
+    Deletes the row matching ``where`` in a single ``DELETE ... RETURNING`` statement.
+
+    Args:
+        model (Type[Model]): The prisma model to delete from.
+        where (Dict[str, Any]): Column conditions that must all hold, see ``where_clause``.
+        client (Optional[prisma.Prisma]): Transaction to write with; the default client otherwise.
+
+    Returns:
+        Optional[Model]: The deleted row, or None if no row matched.
+    """
+    params: List[Any] = []
+    conditions = where_clause(where, params)
+    return await model.prisma(client).query_first(
+        'DELETE FROM "{}" WHERE {} RETURNING *'.format(model.__name__, conditions),
+        *params,
+    )
+
+
+async def explain_miss(
+    model: Type[Model],
+    id: int,
+    expected_version: Optional[int] = None,
+    client: Optional[prisma.Prisma] = None,
+) -> Optional[Model]:
+    """
+    Tells apart the reasons a conditional write matched no row. Only called on that failure path,
+    so successful writes stay at one round-trip.
+
+    Returns:
+        Optional[Model]: None if the row does not exist; otherwise the row as it is now, meaning
+            some other condition of the write did not hold.
+
+    Raises:
+        HTTPException: 409 if the row's version is no longer ``expected_version``.
+    """
+    row = await model.prisma(client).find_unique(where={"id": id})
+    if row is None:
+        return None
+    if expected_version is not None and row.version != expected_version:
+        raise HTTPException(
+            status_code=409,
+            detail="{} {} was changed by another request (version {}, expected {})".format(
+                model.__name__, id, row.version, expected_version
+            ),
+        )
+    return row